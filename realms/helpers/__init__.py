@@ -17,5 +17,6 @@ from .async_jobs import *
 from .data_units import *
 from .etree import *
 from .ip_helpers import *
+from .metrics_store import *
 from .pretty_time import *
 from .settings import *
@@ -14,27 +14,162 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import threading
+import time
 import traceback
-from dataclasses import dataclass
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
 
 from gi.repository import GLib
 
+# Queue for jobs that are not bound to any connection
+DEFAULT_JOB_QUEUE = "default"
 
-def asyncJob(f: callable, args: any, cb: callable):
+
+@dataclass
+class JobQueueStats:
+    """Counters for one job queue. Times are in seconds."""
+
+    pending: int = 0
+    running: int = 0
+    completed: int = 0
+    total_wait: float = 0
+    total_run: float = 0
+
+    def avgWait(self) -> float:
+        """Average time a job waited in the queue before running."""
+        return self.total_wait / self.completed if self.completed else 0
+
+    def avgRun(self) -> float:
+        """Average time a job took to run."""
+        return self.total_run / self.completed if self.completed else 0
+
+
+class JobPool:
+    """Bounded pool of worker threads shared by all asynchronous jobs. Jobs are
+    queued per key, i.e. per connection, and the queues are served round-robin
+    with a limit of running jobs per queue. The last free worker is reserved
+    for queues that aren't running anything. That way slow hypervisors can't
+    starve the jobs of any other connection.
+    """
+
+    IDLE_TIMEOUT = 30
+
+    def __init__(self, max_workers: int, max_per_queue: int):
+        self.max_workers = max_workers
+        self.max_per_queue = max_per_queue
+
+        self.__cond__ = threading.Condition()
+        self.__queues__ = OrderedDict()  # Dict from key to deque of jobs
+        self.__stats__ = {}  # Dict from key to JobQueueStats
+        self.__workers__ = 0
+        self.__idle__ = 0  # Waiting workers that weren't woken up yet
+        self.__running__ = 0  # Jobs running in all queues
+
+    def submit(self, key: str, f: callable) -> None:
+        """Queue a job.
+
+        Args:
+            key (str): Queue to put the job into
+            f (callable): Job, called without arguments
+        """
+        with self.__cond__:
+            self.__queues__.setdefault(key, deque()).append((time.monotonic(), f))
+            self.__stats__.setdefault(key, JobQueueStats()).pending += 1
+
+            if not self.__wakeWorker__() and self.__workers__ < self.max_workers:
+                self.__workers__ += 1
+                thread = threading.Thread(target=self.__work__, daemon=True)
+                thread.start()
+
+    def getStats(self) -> dict[str, JobQueueStats]:
+        """Get a copy of the counters of all queues."""
+        with self.__cond__:
+            return {key: replace(stats) for key, stats in self.__stats__.items()}
+
+    def __wakeWorker__(self) -> bool:
+        """Wake up a waiting worker, must be called with the lock held.
+        Each worker is only counted once, so that jobs submitted before
+        it ran still get workers of their own."""
+        if self.__idle__ <= 0:
+            return False
+        self.__idle__ -= 1
+        self.__cond__.notify()
+        return True
+
+    def __takeJob__(self):
+        """Take the next runnable job, must be called with the lock held."""
+        # Only queues that aren't running anything may take the last worker
+        reserved = self.__running__ >= self.max_workers - 1
+        for key, queue in self.__queues__.items():
+            stats = self.__stats__[key]
+            if reserved and stats.running > 0:
+                continue
+            if queue and stats.running < self.max_per_queue:
+                # Serve the other queues first next time
+                self.__queues__.move_to_end(key)
+                queued, f = queue.popleft()
+                stats.pending -= 1
+                stats.running += 1
+                self.__running__ += 1
+                stats.total_wait += time.monotonic() - queued
+                return key, f
+        return None
+
+    def __work__(self):
+        while True:
+            with self.__cond__:
+                job = self.__takeJob__()
+                while job is None:
+                    self.__idle__ += 1
+                    woken = self.__cond__.wait(self.IDLE_TIMEOUT)
+                    if not woken:
+                        self.__idle__ = max(0, self.__idle__ - 1)
+                    job = self.__takeJob__()
+                    if job is None and not woken:
+                        self.__workers__ -= 1
+                        return
+
+            key, f = job
+            start = time.monotonic()
+            try:
+                f()
+            except Exception:
+                traceback.print_exc()
+
+            with self.__cond__:
+                stats = self.__stats__[key]
+                stats.running -= 1
+                stats.completed += 1
+                self.__running__ -= 1
+                stats.total_run += time.monotonic() - start
+                # Jobs might have been held back by the limits
+                self.__wakeWorker__()
+
+
+__job_pool__ = JobPool(max_workers=8, max_per_queue=4)
+
+
+def getJobStats() -> dict[str, JobQueueStats]:
+    """Get queue depth and latency counters of all job queues."""
+    return __job_pool__.getStats()
+
+
+def asyncJob(f: callable, args: any, cb: callable, queue: str = DEFAULT_JOB_QUEUE):
     """Generic job that runs asynchronously and then calls back with the result
 
     Args:
         f (callable): Function to run asynchronously
         args (any): Arguments for f
         cb (callable): Callback, will be called with results from f
+        queue (str, optional): Job queue, i.e. the connection's URL.
+            Defaults to DEFAULT_JOB_QUEUE.
     """
 
-    def __run__(args):
+    def __run__():
         ret = f(*args)
         GLib.idle_add(cb, ret)
 
-    thread = threading.Thread(target=__run__, args=[args], daemon=True)
-    thread.start()
+    __job_pool__.submit(queue, __run__)
 
 
 @dataclass
@@ -43,7 +178,13 @@ class ResultWrapper:
     failed: bool
 
 
-def failableAsyncJob(f: callable, args: any, except_cb: callable, finally_cb: callable):
+def failableAsyncJob(
+    f: callable,
+    args: any,
+    except_cb: callable,
+    finally_cb: callable,
+    queue: str = DEFAULT_JOB_QUEUE,
+):
     """Generic job that runs asynchronously and calls back upon failure, then calls back
     again with a ResultWrapper as argument
 
@@ -52,13 +193,15 @@ def failableAsyncJob(f: callable, args: any, except_cb: callable, finally_cb: ca
         args (any): Arguments for f
         except_cb (callable): Callback on failure, called with exception
         finally_cb (callable): Final callback with ResultWrapper for data
+        queue (str, optional): Job queue, i.e. the connection's URL.
+            Defaults to DEFAULT_JOB_QUEUE.
     """
 
     def __onExcept__(e: Exception):
         except_cb(e)
         finally_cb(ResultWrapper(None, True))
 
-    def __run__(args):
+    def __run__():
         try:
             res = f(*args)
             GLib.idle_add(finally_cb, ResultWrapper(res, False))
@@ -66,25 +209,36 @@ def failableAsyncJob(f: callable, args: any, except_cb: callable, finally_cb: ca
             traceback.print_exc()
             GLib.idle_add(__onExcept__, e)
 
-    thread = threading.Thread(target=__run__, args=[args], daemon=True)
-    thread.start()
+    __job_pool__.submit(queue, __run__)
 
 
 class RepeatJob:
-    def __init__(self, f: callable, args: any, cb: callable, interval: int):
-        """Job that spawns after interval a thread to run a job, then calls back
-        with the result to the main thread.
+    def __init__(
+        self,
+        f: callable,
+        args: any,
+        cb: callable,
+        interval: int,
+        queue: str = DEFAULT_JOB_QUEUE,
+    ):
+        """Job that queues a job after interval, then calls back
+        with the result to the main thread. A new run is skipped while
+        the last one is still running.
 
         Args:
             f (callable): Function to run asynchronously
             args (any): Arguments for f
             cb (callable): Callback, will be called with results from f
             interval (int): Seconds at which to repeat task
+            queue (str, optional): Job queue, i.e. the connection's URL.
+                Defaults to DEFAULT_JOB_QUEUE.
         """
         self.f = f
         self.args = args
         self.cb = cb
+        self.queue = queue
         self.stop_flag = threading.Event()
+        self.running_flag = threading.Event()
 
         GLib.timeout_add(interval * 1000, self.__onTimeout__)
         self.__onTimeout__()
@@ -93,13 +247,17 @@ class RepeatJob:
         if self.stop_flag.is_set():
             self.stop_flag.clear()
             return False  # Cancel timeout
-        thread = threading.Thread(target=self.__run__, args=[self.args], daemon=True)
-        thread.start()
+        if not self.running_flag.is_set():
+            self.running_flag.set()
+            __job_pool__.submit(self.queue, self.__run__)
         return True
 
-    def __run__(self, args):
-        ret = self.f(*args)
-        GLib.idle_add(self.cb, ret)
+    def __run__(self):
+        try:
+            ret = self.f(*self.args)
+            GLib.idle_add(self.cb, ret)
+        finally:
+            self.running_flag.clear()
 
     def trigger(self):
         """Trigger execution of this job."""
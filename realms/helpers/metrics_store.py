@@ -0,0 +1,402 @@
+# Realms, a libadwaita libvirt client.
+# Copyright (C) 2025
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""On-disk store for metric time series, i.e. the performance graphs' data.
+
+Every metric of an object is stored in one memory-mapped file, holding one
+ring of fixed-size records per rollup resolution. The slot of a sample is
+derived from its time, so writing is a single in-place update and reading a
+time window needs no index. The file size is fixed by the retention of each
+rollup, which bounds the disk usage per metric. Each record keeps the number
+of samples it averages, so a bucket can be continued after reopening the file.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import traceback
+from collections import OrderedDict
+
+from .async_jobs import asyncJob, failableAsyncJob
+from .settings import Settings
+
+# Default retention in seconds per rollup resolution in seconds
+DEFAULT_METRICS_RETENTION = {1: 3600, 60: 86400, 3600: 2592000}
+# Default limit of the whole store's size in bytes
+DEFAULT_METRICS_MAX_SIZE = 256 * 1024 * 1024
+# Seconds between size checks while no new metric files are created
+PRUNE_INTERVAL = 600
+# Job queue of the writes, so they don't hold back other jobs
+METRICS_JOB_QUEUE = "metrics"
+
+__MAGIC__ = b"RMTS"
+__VERSION__ = 2
+__HEADER__ = struct.Struct("<4sII")  # Magic, version, number of rollups
+__ROLLUP_HEADER__ = struct.Struct("<II")  # Resolution, capacity
+__RECORD__ = struct.Struct("<ddd")  # Timestamp, average, number of samples
+
+
+class MetricsFile:
+    """One memory-mapped metric file. Not thread safe on its own, the
+    MetricsStore serializes all access."""
+
+    def __init__(self, path: str, rollups: list[tuple[int, int]]):
+        """Open or create a metric file.
+
+        Args:
+            path (str): Path of the file
+            rollups (list[tuple[int, int]]): (resolution, capacity) per rollup
+        """
+        self.path = path
+        self.rollups = rollups
+
+        # Offset of the first record of each rollup
+        self.offsets = []
+        offset = __HEADER__.size + __ROLLUP_HEADER__.size * len(rollups)
+        for _, capacity in rollups:
+            self.offsets.append(offset)
+            offset += __RECORD__.size * capacity
+        size = offset
+
+        # If the file was newly created, or reset
+        self.created = False
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if os.fstat(fd).st_size != size or not self.__checkHeader__(fd):
+                # New file, or the retention settings changed
+                self.created = True
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+                self.map = mmap.mmap(fd, size)
+                self.__writeHeader__()
+            else:
+                self.map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+    def __checkHeader__(self, fd: int) -> bool:
+        """If the file was written with the same layout."""
+        header = os.pread(
+            fd, __HEADER__.size + __ROLLUP_HEADER__.size * len(self.rollups), 0
+        )
+        expected = __HEADER__.pack(__MAGIC__, __VERSION__, len(self.rollups))
+        for rollup in self.rollups:
+            expected += __ROLLUP_HEADER__.pack(*rollup)
+        return header == expected
+
+    def __writeHeader__(self):
+        __HEADER__.pack_into(self.map, 0, __MAGIC__, __VERSION__, len(self.rollups))
+        offset = __HEADER__.size
+        for rollup in self.rollups:
+            __ROLLUP_HEADER__.pack_into(self.map, offset, *rollup)
+            offset += __ROLLUP_HEADER__.size
+
+    def push(self, timestamp: float, value: float):
+        """Add a sample to all rollups. The slot of the current bucket
+        always holds the average of the samples so far, together with
+        their number.
+
+        Args:
+            timestamp (float): Unix time of the sample
+            value (float): Value
+        """
+        for i, (resolution, capacity) in enumerate(self.rollups):
+            bucket = int(timestamp // resolution)
+            bucket_time = float(bucket * resolution)
+
+            offset = self.offsets[i] + (bucket % capacity) * __RECORD__.size
+            stored_time, average, count = __RECORD__.unpack_from(self.map, offset)
+            if stored_time != bucket_time:
+                # Slot still holds an older lap of the ring
+                average, count = 0.0, 0
+            count += 1
+            average += (value - average) / count
+            __RECORD__.pack_into(self.map, offset, bucket_time, average, count)
+
+    def query(self, rollup: int, start: float, end: float) -> list[tuple]:
+        """Read the stored values of a rollup between start and end.
+
+        Args:
+            rollup (int): Index of the rollup
+            start (float): Unix time
+            end (float): Unix time
+
+        Returns:
+            list[tuple]: (timestamp, value) pairs, oldest first. Buckets without
+                samples are left out.
+        """
+        resolution, capacity = self.rollups[rollup]
+        first = int(start // resolution)
+        last = int(end // resolution)
+        first = max(first, last - capacity + 1)
+
+        results = []
+        for bucket in range(first, last + 1):
+            offset = self.offsets[rollup] + (bucket % capacity) * __RECORD__.size
+            timestamp, value, _ = __RECORD__.unpack_from(self.map, offset)
+            # Slots still holding an older lap of the ring are skipped
+            if timestamp == bucket * resolution:
+                results.append((timestamp, value))
+        return results
+
+    def close(self):
+        self.map.close()
+
+
+class MetricsStore:
+    """Store of all metric files, organized per connection, object and
+    metric. Files are opened lazily and only a limited number is kept
+    mapped at the same time.
+
+    Pushed samples are averaged in memory over the finest rollup's
+    resolution. Only finished averages are written, by a background job,
+    so the main loop never touches the files when pushing.
+    """
+
+    # Mappings don't keep a file descriptor open, so this only bounds the
+    # number of mappings. It is well above the metric files of a few hundred
+    # domains, so flushes don't keep remapping the same files.
+    MAX_OPEN_FILES = 4096
+
+    def __init__(self, path: str):
+        """Create store. Retention and size limits are read from the settings
+        keys "metrics-retention" and "metrics-max-size".
+
+        Args:
+            path (str): Directory of the store
+        """
+        self.path = path
+
+        retention = Settings.get("metrics-retention") or DEFAULT_METRICS_RETENTION
+        # (resolution, capacity) per rollup, finest first
+        self.rollups = sorted(
+            (int(resolution), max(1, int(seconds) // int(resolution)))
+            for resolution, seconds in retention.items()
+        )
+        self.max_size = Settings.get("metrics-max-size") or DEFAULT_METRICS_MAX_SIZE
+
+        self.__lock__ = threading.Lock()
+        self.__files__ = OrderedDict()  # Dict from path to open MetricsFile
+
+        # Dict from path to (bucket, total, count) of the finest rollup
+        self.__pending__ = {}
+        self.__outbox__ = []  # Finished (path, timestamp, value) to write
+        self.__swept_bucket__ = 0  # Newest bucket pending was checked at
+        self.__flushing__ = False
+        self.__last_prune__ = time.monotonic()
+
+    def __filePath__(self, url: str, key: str, metric: str) -> str:
+        """Path of a metric file."""
+        conn_dir = hashlib.sha1(url.encode()).hexdigest()[:16]
+        metric = re.sub(r"[^\w.-]", "_", metric)
+        return os.path.join(self.path, conn_dir, key, metric)
+
+    def __getFile__(self, path: str) -> MetricsFile:
+        """Get an open MetricsFile, must be called with the lock held."""
+        metrics_file = self.__files__.get(path)
+        if metrics_file is not None:
+            self.__files__.move_to_end(path)
+            return metrics_file
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        metrics_file = MetricsFile(path, self.rollups)
+        self.__files__[path] = metrics_file
+        if len(self.__files__) > self.MAX_OPEN_FILES:
+            _, oldest = self.__files__.popitem(last=False)
+            oldest.close()
+        return metrics_file
+
+    def push(self, url: str, key: str, values: dict[str, float], timestamp=None):
+        """Store a sample of several metrics of one object. Must be called
+        from the main thread.
+
+        Args:
+            url (str): Connection URL
+            key (str): Object the metrics belong to, i.e. a domain UUID or "host"
+            values (dict[str, float]): Dict from metric name to value
+            timestamp (float, optional): Unix time, defaults to now
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        resolution = self.rollups[0][0]
+        bucket = int(timestamp // resolution)
+
+        for metric, value in values.items():
+            path = self.__filePath__(url, key, metric)
+            current, total, count = self.__pending__.get(path, (None, 0.0, 0))
+            if current != bucket:
+                if count > 0:
+                    self.__outbox__.append(
+                        (path, float(current * resolution), total / count)
+                    )
+                total, count = 0.0, 0
+            self.__pending__[path] = (bucket, total + value, count + 1)
+
+        # Write the finished buckets of objects that weren't pushed since
+        if bucket > self.__swept_bucket__:
+            self.__swept_bucket__ = bucket
+            for path, (current, total, count) in list(self.__pending__.items()):
+                if current < bucket:
+                    self.__outbox__.append(
+                        (path, float(current * resolution), total / count)
+                    )
+                    del self.__pending__[path]
+
+        self.__scheduleFlush__()
+
+    def __scheduleFlush__(self):
+        """Hand the finished averages to a background job, only one runs
+        at a time."""
+        if self.__outbox__ and not self.__flushing__:
+            self.__flushing__ = True
+            outbox = self.__outbox__
+            self.__outbox__ = []
+            failableAsyncJob(
+                self.__flush__,
+                [outbox],
+                lambda _: None,
+                self.__onFlushed__,
+                queue=METRICS_JOB_QUEUE,
+            )
+
+    def __flush__(self, outbox: list[tuple]):
+        """Write finished averages, runs in a worker."""
+        created = False
+        with self.__lock__:
+            for path, timestamp, value in outbox:
+                try:
+                    metrics_file = self.__getFile__(path)
+                    created = created or metrics_file.created
+                    metrics_file.created = False
+                    metrics_file.push(timestamp, value)
+                except OSError:
+                    traceback.print_exc()
+
+        # Enforce the size limit when the store grew, and now and then
+        # for the retention
+        if created or time.monotonic() - self.__last_prune__ > PRUNE_INTERVAL:
+            self.__last_prune__ = time.monotonic()
+            self.prune()
+
+    def __onFlushed__(self, *_):
+        self.__flushing__ = False
+        self.__scheduleFlush__()
+
+    def query(
+        self, url: str, key: str, metric: str, start: float, end: float = None
+    ) -> list[tuple]:
+        """Get the values of a metric in a time window, from the finest
+        rollup that still covers the whole window.
+
+        Args:
+            url (str): Connection URL
+            key (str): Object the metric belongs to
+            metric (str): Metric name
+            start (float): Unix time
+            end (float, optional): Unix time, defaults to now
+
+        Returns:
+            list[tuple]: (timestamp, value) pairs, oldest first
+        """
+        if end is None:
+            end = time.time()
+        path = self.__filePath__(url, key, metric)
+        if not os.path.exists(path):
+            return []
+
+        with self.__lock__:
+            return self.__getFile__(path).query(
+                self.__pickRollup__(start, end), start, end
+            )
+
+    def getResolution(self, start: float, end: float = None) -> int:
+        """Get the resolution of the values query returns for a time window.
+
+        Args:
+            start (float): Unix time
+            end (float, optional): Unix time, defaults to now
+
+        Returns:
+            int: Resolution in seconds
+        """
+        if end is None:
+            end = time.time()
+        return self.rollups[self.__pickRollup__(start, end)][0]
+
+    def __pickRollup__(self, start: float, end: float) -> int:
+        """Index of the finest rollup that still covers the whole window."""
+        for i, (resolution, capacity) in enumerate(self.rollups):
+            if start >= end - resolution * capacity:
+                return i
+        return len(self.rollups) - 1
+
+    def prune(self):
+        """Delete metric files that weren't written during the longest
+        retention, then the least recently written ones until the store is
+        below its maximum size."""
+        max_age = max(resolution * capacity for resolution, capacity in self.rollups)
+        now = time.time()
+
+        files = []
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        with self.__lock__:
+            for mtime, size, path in files:
+                if mtime >= now - max_age and total <= self.max_size:
+                    break
+                metrics_file = self.__files__.pop(path, None)
+                if metrics_file is not None:
+                    metrics_file.close()
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    traceback.print_exc()
+
+    def close(self):
+        """Unmap all open files."""
+        with self.__lock__:
+            for metrics_file in self.__files__.values():
+                metrics_file.close()
+            self.__files__.clear()
+
+
+__metrics_store__ = None
+
+
+def getMetricsStore() -> MetricsStore:
+    """Get the metrics store, it is created on first use."""
+    global __metrics_store__
+    if __metrics_store__ is None:
+        __metrics_store__ = MetricsStore(
+            os.path.join(os.path.expanduser("~"), ".cache", "realms", "metrics")
+        )
+        # Enforce the retention of data from earlier sessions
+        asyncJob(__metrics_store__.prune, [], lambda *_: None, queue=METRICS_JOB_QUEUE)
+    return __metrics_store__
@@ -18,6 +18,8 @@ from .connection import *
 from .constants import *
 from .domain import *
 from .domain_capabilities import *
+from .domain_record import *
+from .domain_stats import *
 from .driver_capabilities import *
 from .event_manager import *
 from .network import *
@@ -25,4 +27,6 @@ from .node_dev import NodeDev
 from .pool import *
 from .pool_capabilities import *
 from .secret import *
+from .transfer_manager import *
 from .volume import *
+from .volume_transfer import *
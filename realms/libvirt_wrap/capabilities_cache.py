@@ -0,0 +1,74 @@
+# Realms, a libadwaita libvirt client.
+# Copyright (C) 2025
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""On-disk cache of capabilities XML. Capabilities only change when the
+host is upgraded, so they are cached per URL and versions."""
+
+import glob
+import hashlib
+import os
+import traceback
+
+CAPABILITIES_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "realms", "capabilities"
+)
+
+
+def __hashText__(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def getCachedCapabilities(url: str, versions: str, kind: str, fetch: callable) -> str:
+    """Get capabilities XML from the cache, or fetch and cache it.
+
+    Args:
+        url (str): Connection URL
+        versions (str): Hypervisor and libvirt version of the host, the
+            cache is invalid when they change
+        kind (str): Which capabilities, i.e. "driver"
+        fetch (callable): Fetches the XML from the host
+
+    Returns:
+        str: Capabilities XML
+    """
+    # The version hash follows a "." which a kind never contains, so the
+    # prefix of one kind doesn't match files of a longer kind like
+    # "domain-<key hash>"
+    prefix = os.path.join(CAPABILITIES_CACHE_DIR, f"{ __hashText__(url) }-{ kind }.")
+    path = prefix + __hashText__(versions) + ".xml"
+
+    try:
+        with open(path, "r") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    except OSError:
+        traceback.print_exc()
+
+    xml = fetch()
+
+    try:
+        os.makedirs(CAPABILITIES_CACHE_DIR, exist_ok=True)
+        # Capabilities of older versions won't be needed again
+        for old_path in glob.glob(glob.escape(prefix) + "*.xml"):
+            os.remove(old_path)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(xml)
+        os.replace(tmp_path, path)
+    except OSError:
+        traceback.print_exc()
+
+    return xml
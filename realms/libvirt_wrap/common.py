@@ -13,6 +13,8 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import xml.etree.ElementTree as ET
+
 import libvirt
 
 from .constants import *
@@ -37,6 +39,10 @@ def printEvent(conn, obj, type_id, event_id, detail_id):
             print(
                 "Connection failed to connect", conn, obj, type_id, event_id, detail_id
             )
+        elif event_id == CONNECTION_EVENT_RECONNECTING:
+            print("Connection reconnecting", conn, obj, type_id, event_id, detail_id)
+        elif event_id == CONNECTION_EVENT_RECONNECTED:
+            print("Connection reconnected", conn, obj, type_id, event_id, detail_id)
         else:
             raise ValueError(
                 "This should not be reached - unknown generic connection event_id"
@@ -178,3 +184,39 @@ def libvirtVersionToString(version: int) -> str:
     minor = int(((version - release) % 1000000) / 1000)
     major = int((version - minor * 1000 - release) / 1000000)
     return f"{major}.{minor}.{release}"
+
+
+def isConnectionLostError(code: int, domain: int) -> bool:
+    """If a libvirt error means that the connection to the hypervisor is gone.
+
+    Args:
+        code (int): Error code, libvirt.VIR_ERR_*
+        domain (int): Where the error came from, libvirt.VIR_FROM_*
+
+    Returns:
+        bool: True if the connection was lost
+    """
+    if code in (libvirt.VIR_ERR_NO_CONNECT, libvirt.VIR_ERR_INVALID_CONN):
+        return True
+    # I.e. "Cannot recv data" or "client socket is closed"
+    return domain == libvirt.VIR_FROM_RPC and code in (
+        libvirt.VIR_ERR_SYSTEM_ERROR,
+        libvirt.VIR_ERR_INTERNAL_ERROR,
+        libvirt.VIR_ERR_RPC,
+    )
+
+
+def networkDisplayName(network: libvirt.virNetwork) -> str:
+    """Get the title of a network, or its name if it has none. This
+    fetches the network's XML, so call it from a job if possible.
+
+    Args:
+        network (libvirt.virNetwork): Network
+
+    Returns:
+        str: Title to show
+    """
+    title_xml = ET.fromstring(network.XMLDesc()).find("title")
+    if title_xml is not None and title_xml.text is not None:
+        return title_xml.text
+    return network.name()
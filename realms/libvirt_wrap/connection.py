@@ -14,19 +14,30 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 import atexit
+import heapq
+import threading
+import time
 import traceback
+import weakref
 import xml.etree.ElementTree as ET
 
 import libvirt
 from gi.repository import GLib
 
-from realms.helpers import Settings, asyncJob
-from realms.libvirt_wrap.common import libvirtVersionToString
+from realms.helpers import ResultWrapper, Settings, asyncJob, failableAsyncJob
+from realms.libvirt_wrap.common import (
+    isConnectionLostError,
+    libvirtVersionToString,
+    networkDisplayName,
+)
 
+from .capabilities_cache import getCachedCapabilities
 from .constants import *
-from .domain_capabilities import DomainCapabilities
+from .domain_capabilities import DomainCapabilities, DomainCapabilitiesCache
+from .domain_record import RECORD_STATS, DomainRecord, recordFromStats
+from .domain_stats import StatsCollector
 from .driver_capabilities import DriverCapabilities
-from .event_manager import EventManager
+from .event_manager import EventCoalescer, EventManager
 from .node_dev import NodeDev
 from .pool_capabilities import PoolCapabilities
 
@@ -37,6 +48,208 @@ class OperationUnsupportedException(Exception):
     pass
 
 
+# Seconds between keepalive messages, and how many may go unanswered
+# before libvirt closes the connection.
+KEEPALIVE_INTERVAL = 5
+KEEPALIVE_COUNT = 3
+
+# Backoff of reconnection attempts in seconds, and how often to try before
+# giving up and disconnecting.
+RECONNECT_INITIAL_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+RECONNECT_MAX_ATTEMPTS = 8
+
+# Seconds until a connection attempt is given up, and how many
+# connections are opened at the same time on startup.
+CONNECT_TIMEOUT = 20
+CONNECT_MAX_RUNNING = 8
+
+# Milliseconds within which lifecycle events of one object are merged
+EVENT_COALESCE_INTERVAL = 50
+
+# All connection wrappers, to notify them of connection errors
+__connections__ = weakref.WeakSet()
+
+
+def __onLibvirtError__(_, error: tuple):
+    """Global libvirt error handler, may be called from any thread.
+    libvirt doesn't tell which connection an error belongs to, so all
+    connections check their state once a connection-lost error is seen."""
+    code, domain = error[0], error[1]
+    if isConnectionLostError(code, domain):
+        for connection in list(__connections__):
+            GLib.idle_add(connection.checkAlive)
+
+
+libvirt.registerErrorHandler(__onLibvirtError__, None)
+
+
+def getLastUsed(url: str) -> float:
+    """When the connection with the given URL was last connected.
+
+    Args:
+        url (str): Connection URL
+
+    Returns:
+        float: Unix time, 0 if never
+    """
+    last_used = Settings.get("connections-last-used") or {}
+    return last_used.get(url, 0)
+
+
+def setLastUsed(url: str) -> None:
+    """Remember that the connection with the given URL was connected now.
+
+    Args:
+        url (str): Connection URL
+    """
+    last_used = Settings.get("connections-last-used") or {}
+    last_used[url] = time.time()
+    Settings.put("connections-last-used", last_used)
+
+
+class ConnectQueue:
+    """Opens queued connections with a bounded number of attempts running at
+    the same time. Waiting connections are started most recently used first,
+    so the connection that is probably needed first comes up first.
+    """
+
+    def __init__(self, max_running: int):
+        self.max_running = max_running
+        self.running = 0
+
+        self.__waiting__ = []  # Heap of (-last used, sequence, connection)
+        self.__sequence__ = 0
+        self.__scheduled__ = False
+
+    def submit(self, connection) -> None:
+        """Queue a connection to be opened.
+
+        Args:
+            connection (Connection): Connection in CONNECTION_STATE_CONNECTING
+        """
+        heapq.heappush(
+            self.__waiting__,
+            (-getLastUsed(connection.url), self.__sequence__, connection),
+        )
+        self.__sequence__ += 1
+
+        # Start from an idle callback, so all connections submitted at once
+        # (i.e. on startup) are sorted before any is started.
+        if not self.__scheduled__:
+            self.__scheduled__ = True
+            GLib.idle_add(self.__startNext__)
+
+    def remove(self, connection) -> None:
+        """Drop a connection that is still waiting, i.e. because it was
+        disconnected or deleted in the meantime.
+
+        Args:
+            connection (Connection): Waiting connection
+        """
+        waiting = [e for e in self.__waiting__ if e[2] is not connection]
+        if len(waiting) != len(self.__waiting__):
+            heapq.heapify(waiting)
+            self.__waiting__ = waiting
+
+    def __startNext__(self):
+        self.__scheduled__ = False
+        while self.running < self.max_running and self.__waiting__:
+            _, _, connection = heapq.heappop(self.__waiting__)
+            if connection.getState() != CONNECTION_STATE_CONNECTING:
+                continue  # Cancelled in the meantime
+            self.running += 1
+            connection.__startConnect__(self.__onDone__)
+        return False
+
+    def __onDone__(self):
+        self.running -= 1
+        self.__startNext__()
+
+
+__connect_queue__ = ConnectQueue(CONNECT_MAX_RUNNING)
+
+
+class ReconnectSupervisor:
+    """Tries to reopen a connection that was lost, waiting exponentially
+    longer between the attempts."""
+
+    def __init__(
+        self, connection, initial_delay: int, max_delay: int, max_attempts: int
+    ):
+        """Create supervisor, it is idle until started.
+
+        Args:
+            connection (Connection): Connection wrapper
+            initial_delay (int): Seconds before the first attempt
+            max_delay (int): Maximum seconds between attempts
+            max_attempts (int): Attempts before giving up
+        """
+        self.connection = connection
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+
+        self.attempt = 0
+        self.delay = initial_delay
+        self.__timeout__ = None
+        self.__generation__ = 0  # To ignore results of cancelled attempts
+
+    def start(self) -> None:
+        """Start reconnecting."""
+        self.cancel()
+        self.attempt = 0
+        self.delay = self.initial_delay
+        self.__schedule__()
+
+    def cancel(self) -> None:
+        """Stop reconnecting, a running attempt will be discarded."""
+        self.__generation__ += 1
+        self.attempt = 0
+        if self.__timeout__ is not None:
+            GLib.source_remove(self.__timeout__)
+            self.__timeout__ = None
+
+    def __schedule__(self):
+        self.__timeout__ = GLib.timeout_add_seconds(self.delay, self.__onTimeout__)
+
+    def __onTimeout__(self):
+        self.__timeout__ = None
+        self.attempt += 1
+        generation = self.__generation__
+        print(f"Reconnecting to { self.connection.url }, attempt { self.attempt }")
+
+        def onResult(res: ResultWrapper):
+            if generation != self.__generation__:
+                # Cancelled in the meantime
+                if not res.failed:
+                    res.data[0].close()
+                return
+
+            if not res.failed:
+                self.attempt = 0
+                self.connection.__onReconnected__(*res.data)
+            elif self.attempt >= self.max_attempts:
+                self.attempt = 0
+                self.connection.__onReconnectFailed__()
+            else:
+                self.delay = min(self.delay * 2, self.max_delay)
+                self.__schedule__()
+
+        def run():
+            try:
+                res = ResultWrapper(self.connection.__reopen__(), False)
+            except Exception:
+                traceback.print_exc()
+                res = ResultWrapper(None, True)
+            GLib.idle_add(onResult, res)
+
+        # Not a pooled job, like the initial connect: an unreachable host
+        # would hold a worker of the job pool until the TCP/SSH timeout
+        threading.Thread(target=run, daemon=True).start()
+        return False
+
+
 class Connection(EventManager):
     def __init__(self, conn_settings: dict):
         super().__init__()
@@ -53,12 +266,27 @@ class Connection(EventManager):
 
         self.driver_capabilities = None
         self.pool_capabilities = None
-        self.domain_capabilities = None
+        self.domain_capabilities_cache = DomainCapabilitiesCache(self, 16)
         self.supports_secrets = False
 
+        # Shared by all performance graphs of this connection
+        self.stats_collector = StatsCollector(self, 200, 600, 5000)
+        # Merges bursts of lifecycle events, one refresh per object
+        self.event_coalescer = EventCoalescer(self.sendEvent, EVENT_COALESCE_INTERVAL)
+        self.reconnect_supervisor = ReconnectSupervisor(
+            self, RECONNECT_INITIAL_DELAY, RECONNECT_MAX_DELAY, RECONNECT_MAX_ATTEMPTS
+        )
+        # Fresh handles while reconnecting, dict from (object type, uuid)
+        self.__rebind_handles__ = {}
+        self.__vanished__ = set()  # (object type, uuid) of objects gone meanwhile
+        self.__connect_attempt__ = 0  # To ignore attempts that timed out
+        self.__pending_connect__ = None  # (done callback, timeout) of the attempt
+        self.__versions__ = None  # Versions of the host, key of the capabilities cache
+
         self.settings = conn_settings
         self.loadSettings()
 
+        __connections__.add(self)
         atexit.register(self.onExit)
 
     def onExit(self):
@@ -72,19 +300,27 @@ class Connection(EventManager):
 
     def onDomainEvent(self, conn, dom: libvirt.virDomain, event, detail, _):
         """Top Level handler for domain events."""
-        self.sendEvent(conn, dom, CALLBACK_TYPE_DOMAIN_LIFECYCLE, event, detail)
+        self.event_coalescer.push(
+            conn, dom, CALLBACK_TYPE_DOMAIN_LIFECYCLE, event, detail
+        )
 
     def onStorageEvent(self, conn, pool, event, detail, _):
         """Top Level handler for pool events."""
-        self.sendEvent(conn, pool, CALLBACK_TYPE_POOL_LIFECYCLE, event, detail)
+        self.event_coalescer.push(
+            conn, pool, CALLBACK_TYPE_POOL_LIFECYCLE, event, detail
+        )
 
     def onNetworkEvent(self, conn, network, event, detail, _):
         """Top Level handler for network events."""
-        self.sendEvent(conn, network, CALLBACK_TYPE_NETWORK_LIFECYCLE, event, detail)
+        self.event_coalescer.push(
+            conn, network, CALLBACK_TYPE_NETWORK_LIFECYCLE, event, detail
+        )
 
     def onSecretEvent(self, conn, secret, event, detail, _):
         """Top Level handler for secret events. (Connection secrets)"""
-        self.sendEvent(conn, secret, CALLBACK_TYPE_SECRET_LIFECYCLE, event, detail)
+        self.event_coalescer.push(
+            conn, secret, CALLBACK_TYPE_SECRET_LIFECYCLE, event, detail
+        )
 
     ############################################
     # Other methods
@@ -92,35 +328,235 @@ class Connection(EventManager):
 
     def isAlive(self):
         """Check if connection is alive. Use as a barrier before interacting
-        with connection objects. Sends out CONNECTION_EVENT_DISCONNECTED upon
-        detecting that the connection disconnected.
+        with connection objects. This only checks the cached state and does
+        no I/O, the state is kept up to date by the close callback, libvirt's
+        keepalive and connection-lost errors.
 
         Raises:
             Exception: Raise if not alive
         """
-        # This variable is mostly to prevent weird recursions
+        if self.__state__ != CONNECTION_STATE_CONNECTED or self.__connection__ is None:
+            raise Exception("Connection is not alive")
+
+    def checkAlive(self) -> bool:
+        """Ask libvirt whether the connection is still alive, i.e. after
+        an error. Sends out CONNECTION_EVENT_DISCONNECTED upon detecting that
+        the connection disconnected.
+
+        Returns:
+            bool: False, to be usable as GLib callback
+        """
         if self.__state__ != CONNECTION_STATE_CONNECTED:
-            raise Exception("Connection is still not alive")
+            return False
+        try:
+            alive = self.__connection__ is not None and self.__connection__.isAlive()
+        except libvirt.libvirtError:
+            alive = False
+        if not alive:
+            self.__onConnectionLost__()
+        return False
+
+    def __onConnectionLost__(self, connection=None, reason: int = None):
+        """Handle a connection that was closed from outside, it will be
+        reopened by the reconnect supervisor. Until then the connection is
+        in CONNECTION_STATE_RECONNECTING and all wrappers stay alive.
+
+        Args:
+            connection (libvirt.virConnect, optional): Connection that closed
+            reason (int, optional): libvirt.VIR_CONNECT_CLOSE_REASON_*
+        """
+        if self.__state__ != CONNECTION_STATE_CONNECTED:
+            return
+        if connection is not None and connection != self.__connection__:
+            return  # An earlier connection
+        if reason == libvirt.VIR_CONNECT_CLOSE_REASON_CLIENT:
+            return  # Closed by ourselves
+
+        print(f"Lost connection to { self.url }")
+        old_connection = self.__connection__
+        self.__connection__ = None
+        self.__state__ = CONNECTION_STATE_RECONNECTING
+        self.event_coalescer.clear()
+        if old_connection is not None:
+            # Not from within the close callback
+            GLib.idle_add(self.__closeQuietly__, old_connection)
+
+        self.sendEvent(
+            None,
+            None,
+            CALLBACK_TYPE_CONNECTION_GENERIC,
+            CONNECTION_EVENT_RECONNECTING,
+            0,
+        )
+        self.reconnect_supervisor.start()
+
+    def __closeQuietly__(self, connection: libvirt.virConnect):
+        try:
+            connection.close()
+        except libvirt.libvirtError:
+            pass
+        return False
+
+    def __open__(self) -> libvirt.virConnect:
+        """Open the connection and register all callbacks.
+
+        Returns:
+            libvirt.virConnect: The opened connection
+        """
+        connection = libvirt.open(self.url)
+        if not connection:
+            raise Exception
+
+        connection.registerCloseCallback(
+            lambda conn, reason, _: self.__onConnectionLost__(conn, reason),
+            None,
+        )
 
-        if self.__connection__ is None or not self.__connection__.isAlive():
-            self.__state__ = CONNECTION_STATE_DISCONNECTED
-            self.sendEvent(
-                self.__connection__,
+        # Let libvirt detect dead connections, so that isAlive can
+        # rely on the close callback.
+        try:
+            connection.setKeepAlive(KEEPALIVE_INTERVAL, KEEPALIVE_COUNT)
+        except libvirt.libvirtError:
+            pass  # Unsupported by the driver, i.e. for local connections
+
+        # Domain events
+        connection.domainEventRegisterAny(
+            None,
+            libvirt.VIR_DOMAIN_EVENT_ID_LIFECYCLE,
+            self.onDomainEvent,
+            None,
+        )
+        # Network events
+        connection.networkEventRegisterAny(
+            None,
+            libvirt.VIR_NETWORK_EVENT_ID_LIFECYCLE,
+            self.onNetworkEvent,
+            None,
+        )
+        # Storage pool events
+        connection.storagePoolEventRegisterAny(
+            None,
+            libvirt.VIR_STORAGE_POOL_EVENT_ID_LIFECYCLE,
+            self.onStorageEvent,
+            None,
+        )
+
+        try:
+            # Secrets
+            connection.secretEventRegisterAny(
+                None,
+                libvirt.VIR_SECRET_EVENT_ID_LIFECYCLE,
+                self.onSecretEvent,
                 None,
-                CALLBACK_TYPE_CONNECTION_GENERIC,
-                CONNECTION_EVENT_DISCONNECTED,
-                0,
             )
-            if self.__connection__ is not None:
-                self.__connection__.close()
-                self.__connection__ = None
-            raise Exception("Connection is not alive")
+            self.supports_secrets = True
+        except:
+            self.supports_secrets = False
+
+        return connection
+
+    def __reopen__(self) -> tuple[libvirt.virConnect, dict]:
+        """Reopen a lost connection and fetch fresh handles of all objects,
+        runs in a worker.
+
+        Returns:
+            tuple[libvirt.virConnect, dict]: Connection and dict from
+                (object type, uuid) to the object's handle
+        """
+        connection = self.__open__()
+        try:
+            handles = {}
+            for dom in connection.listAllDomains(0):
+                handles[(OBJECT_TYPE_DOMAIN, dom.UUIDString())] = dom
+            for pool in connection.listAllStoragePools(0):
+                handles[(OBJECT_TYPE_POOL, pool.UUIDString())] = pool
+            for network in connection.listAllNetworks(0):
+                handles[(OBJECT_TYPE_NETWORK, network.UUIDString())] = network
+            if self.supports_secrets:
+                for secret in connection.listAllSecrets(0):
+                    handles[(OBJECT_TYPE_SECRET, secret.UUIDString())] = secret
+        except Exception:
+            connection.close()
+            raise
+        return connection, handles
+
+    def __onReconnected__(self, connection: libvirt.virConnect, handles: dict):
+        """Resume the session with a reopened connection. Wrappers rebind
+        to the fresh handles upon CONNECTION_EVENT_RECONNECTED."""
+        print(f"Reconnected to { self.url }")
+        self.__connection__ = connection
+        # The host may have been upgraded while it was unreachable
+        self.__resetCapabilities__()
+        self.__prefetchCapabilities__()
+        self.__state__ = CONNECTION_STATE_CONNECTED
+
+        self.__rebind_handles__ = handles
+        self.__vanished__ = {key for key in self.keyed_callbacks if key not in handles}
+        self.sendEvent(
+            self.__connection__,
+            None,
+            CALLBACK_TYPE_CONNECTION_GENERIC,
+            CONNECTION_EVENT_RECONNECTED,
+            0,
+        )
+        self.__rebind_handles__ = {}
+        self.__vanished__ = set()
+
+    def __onReconnectFailed__(self):
+        """Give up reconnecting, tear everything down."""
+        print(f"Giving up reconnecting to { self.url }")
+        self.__state__ = CONNECTION_STATE_DISCONNECTED
+        self.sendEvent(
+            None,
+            None,
+            CALLBACK_TYPE_CONNECTION_GENERIC,
+            CONNECTION_EVENT_DISCONNECTED,
+            0,
+        )
+
+    def getReboundHandle(self, object_type: int, uuid: str):
+        """Get the fresh handle of an object while reconnecting.
+
+        Args:
+            object_type (int): One of the OBJECT_TYPE_* constants
+            uuid (str): UUID of the object
+
+        Returns:
+            The libvirt object, or None if it no longer exists
+        """
+        return self.__rebind_handles__.get((object_type, uuid))
+
+    def takeVanished(self, object_type: int, uuid: str) -> bool:
+        """Check whether an object disappeared while reconnecting. Only
+        returns True once per object, so only one of its wrappers announces
+        the deletion.
+
+        Args:
+            object_type (int): One of the OBJECT_TYPE_* constants
+            uuid (str): UUID of the object
+
+        Returns:
+            bool: If the object disappeared and the caller should send
+                the deletion event
+        """
+        key = (object_type, uuid)
+        if key in self.__vanished__:
+            self.__vanished__.remove(key)
+            return True
+        return False
 
-    def tryConnect(self) -> None:
+    def tryConnect(self, queued: bool = False) -> None:
         """Try to connect to the libvirt url of this instance. Sends out
         events if connection is established/connection failed.
+
+        Args:
+            queued (bool, optional): Wait for a free slot of the startup queue,
+                i.e. for autoconnecting. Defaults to False.
         """
-        if self.__connection__:
+        if self.__connection__ or self.__state__ in [
+            CONNECTION_STATE_CONNECTING,
+            CONNECTION_STATE_RECONNECTING,
+        ]:
             return
 
         self.__state__ = CONNECTION_STATE_CONNECTING
@@ -132,64 +568,49 @@ class Connection(EventManager):
             0,
         )
 
-        def init() -> bool:
-            try:
-                self.__connection__ = libvirt.open(self.url)
-                if not self.__connection__:
-                    raise Exception
+        if queued:
+            __connect_queue__.submit(self)
+        else:
+            self.__startConnect__(lambda: None)
 
-                self.__connection__.registerCloseCallback(
-                    lambda *_: self.disconnect(from_disconnect=True),
-                    None,
-                )
+    def __startConnect__(self, done_cb: callable) -> None:
+        """Open the connection in the background, giving up after
+        CONNECT_TIMEOUT seconds.
 
-                # Domain events
-                self.__connection__.domainEventRegisterAny(
-                    None,
-                    libvirt.VIR_DOMAIN_EVENT_ID_LIFECYCLE,
-                    self.onDomainEvent,
-                    None,
-                )
-                # Network events
-                self.__connection__.networkEventRegisterAny(
-                    None,
-                    libvirt.VIR_NETWORK_EVENT_ID_LIFECYCLE,
-                    self.onNetworkEvent,
-                    None,
-                )
-                # Storage pool events
-                self.__connection__.storagePoolEventRegisterAny(
-                    None,
-                    libvirt.VIR_STORAGE_POOL_EVENT_ID_LIFECYCLE,
-                    self.onStorageEvent,
-                    None,
-                )
+        Args:
+            done_cb (callable): Called without arguments once the attempt
+                succeeded, failed or timed out
+        """
+        self.__connect_attempt__ += 1
+        attempt = self.__connect_attempt__
+        timeout = None
 
-                try:
-                    # Secrets
-                    self.__connection__.secretEventRegisterAny(
-                        None,
-                        libvirt.VIR_SECRET_EVENT_ID_LIFECYCLE,
-                        self.onSecretEvent,
-                        None,
-                    )
-                    self.supports_secrets = True
-                except:
-                    self.supports_secrets = False
-
-                self.__loadCapabilities__()
-
-                # We're ready
-                print(f"Connected to { self.url }")
-                return True
+        def init():
+            try:
+                connection = self.__open__()
             except Exception:
                 print(f"Connection failed to { self.url }")
-                self.__connection__ = None
+                connection = None
+            GLib.idle_add(finish, connection)
+
+        def finish(connection: libvirt.virConnect):
+            if attempt != self.__connect_attempt__:
+                # Timed out or cancelled, nobody waits for this connection
+                if connection is not None:
+                    self.__closeQuietly__(connection)
                 return False
+            self.__connect_attempt__ += 1
+            self.__pending_connect__ = None
+            GLib.source_remove(timeout)
+            done_cb()
 
-        def finish(connected):
-            if connected:
+            if connection is not None:
+                print(f"Connected to { self.url }")
+                self.__connection__ = connection
+                self.__resetCapabilities__()
+                self.__prefetchCapabilities__()
                 self.__state__ = CONNECTION_STATE_CONNECTED
+                setLastUsed(self.url)
                 self.sendEvent(
                     self.__connection__,
                     None,
@@ -206,30 +627,73 @@ class Connection(EventManager):
                     CONNECTION_EVENT_CONNECTION_FAILED,
                     0,
                 )
-
-        asyncJob(init, [], finish)
+            return False
+
+        def onTimeout():
+            if attempt == self.__connect_attempt__:
+                print(f"Connection to { self.url } timed out")
+                self.__connect_attempt__ += 1
+                self.__pending_connect__ = None
+                done_cb()
+                self.__state__ = CONNECTION_STATE_DISCONNECTED
+                self.sendEvent(
+                    self.__connection__,
+                    None,
+                    CALLBACK_TYPE_CONNECTION_GENERIC,
+                    CONNECTION_EVENT_CONNECTION_FAILED,
+                    0,
+                )
+            return False
+
+        timeout = GLib.timeout_add_seconds(CONNECT_TIMEOUT, onTimeout)
+        self.__pending_connect__ = (done_cb, timeout)
+        # Not a pooled job: libvirt.open can't be interrupted, so an
+        # unreachable host would hold a worker of the job pool until the
+        # system's TCP/SSH timeout.
+        threading.Thread(target=init, daemon=True).start()
+
+    def __cancelConnect__(self) -> None:
+        """Stop a queued or running connection attempt. A running
+        libvirt.open can't be interrupted, the connection it returns is
+        closed right away."""
+        __connect_queue__.remove(self)
+        self.__connect_attempt__ += 1
+        if self.__pending_connect__ is not None:
+            done_cb, timeout = self.__pending_connect__
+            self.__pending_connect__ = None
+            GLib.source_remove(timeout)
+            done_cb()
 
     def disconnect(self, from_disconnect=False) -> None:
-        """Disconnect this instance. Sends out disconnect event.
+        """Disconnect this instance. Sends out disconnect event. Also stops
+        reconnecting a lost connection.
 
         Args:
             from_disconnect (bool, optional): Handle already disconnected connection.
             This terminates everything properly when the connection was closed
             from outside.
         """
-        if self.isConnected():
-            self.__connection__.close()
+        if self.__state__ == CONNECTION_STATE_RECONNECTING:
+            self.reconnect_supervisor.cancel()
+        elif self.__state__ == CONNECTION_STATE_CONNECTING:
+            self.__cancelConnect__()
+        elif not self.isConnected() and not from_disconnect:
+            return
 
-        if self.isConnected() or from_disconnect:
-            self.__connection__ = None
-            self.__state__ = CONNECTION_STATE_DISCONNECTED
-            self.sendEvent(
-                self.__connection__,
-                None,
-                CALLBACK_TYPE_CONNECTION_GENERIC,
-                CONNECTION_EVENT_DISCONNECTED,
-                0,
-            )
+        connection = self.__connection__
+        self.__connection__ = None
+        self.__state__ = CONNECTION_STATE_DISCONNECTED
+        self.event_coalescer.clear()
+        if connection is not None:
+            connection.close()
+
+        self.sendEvent(
+            self.__connection__,
+            None,
+            CALLBACK_TYPE_CONNECTION_GENERIC,
+            CONNECTION_EVENT_DISCONNECTED,
+            0,
+        )
 
     def loadSettings(self):
         """Load the given settings of this connection."""
@@ -263,7 +727,50 @@ class Connection(EventManager):
             vir_domains = self.__connection__.listAllDomains(flag)
             return vir_domains
 
-        asyncJob(getDomains, [], ready_cb)
+        asyncJob(getDomains, [], ready_cb, queue=self.url)
+
+    def listDomainRecords(self, ready_cb: callable) -> None:
+        """List all domains on that connection asynchronously, together with
+        pre-populated records of their state. All domains are fetched in one
+        getAllDomainStats pass instead of several calls per domain.
+
+        Args:
+            ready_cb (callable): Callback with list of (virDomain, DomainRecord).
+        """
+        self.isAlive()
+
+        def getRecords() -> list[tuple[libvirt.virDomain, DomainRecord]]:
+            conn = self.__connection__
+            persistent = {
+                dom.UUIDString()
+                for dom in conn.listAllDomains(
+                    libvirt.VIR_CONNECT_LIST_DOMAINS_PERSISTENT
+                )
+            }
+            autostart = {
+                dom.UUIDString()
+                for dom in conn.listAllDomains(
+                    libvirt.VIR_CONNECT_LIST_DOMAINS_AUTOSTART
+                )
+            }
+
+            try:
+                all_stats = conn.getAllDomainStats(RECORD_STATS, 0)
+            except libvirt.libvirtError:
+                # Driver doesn't support bulk stats, the records will be
+                # filled on demand.
+                all_stats = [(dom, {}) for dom in conn.listAllDomains(0)]
+
+            records = []
+            for dom, stats in all_stats:
+                uuid = dom.UUIDString()
+                record = recordFromStats(
+                    dom, stats, uuid in persistent, uuid in autostart
+                )
+                records.append((dom, record))
+            return records
+
+        asyncJob(getRecords, [], ready_cb, queue=self.url)
 
     def listStoragePools(self, ready_cb: callable) -> None:
         """List all pools on that connection asynchronously.
@@ -278,7 +785,7 @@ class Connection(EventManager):
             vir_pools = self.__connection__.listAllStoragePools(flag)
             return vir_pools
 
-        asyncJob(getPools, [], ready_cb)
+        asyncJob(getPools, [], ready_cb, queue=self.url)
 
     def listNetworks(self, ready_cb) -> None:
         """List all network on that connection asynchronously.
@@ -292,7 +799,28 @@ class Connection(EventManager):
             vir_networks = self.__connection__.listAllNetworks()
             return vir_networks
 
-        asyncJob(getNetworks, [], ready_cb)
+        asyncJob(getNetworks, [], ready_cb, queue=self.url)
+
+    def listNetworkTitles(self, ready_cb: callable) -> None:
+        """List all networks on that connection asynchronously, together with
+        their titles, so that sorting them doesn't fetch XML on the main thread.
+
+        Args:
+            ready_cb (callable): Callback with list of (virNetwork, title).
+        """
+        self.isAlive()
+
+        def getTitles() -> list[tuple[libvirt.virNetwork, str]]:
+            titles = []
+            for vnet in self.__connection__.listAllNetworks():
+                try:
+                    titles.append((vnet, networkDisplayName(vnet)))
+                except libvirt.libvirtError:
+                    # Undefined while listing
+                    continue
+            return titles
+
+        asyncJob(getTitles, [], ready_cb, queue=self.url)
 
     def listSecrets(self, ready_cb) -> None:
         """List all connection secrets on that connection asynchronously.
@@ -308,7 +836,7 @@ class Connection(EventManager):
             vir_secrets = self.__connection__.listAllSecrets()
             return vir_secrets
 
-        asyncJob(getSecrets, [], ready_cb)
+        asyncJob(getSecrets, [], ready_cb, queue=self.url)
 
     def addNetworkTree(self, tree: ET.Element, autostart: bool):
         """Add a network given its xml tree."""
@@ -332,7 +860,7 @@ class Connection(EventManager):
 
     def addPoolTree(self, tree: ET.Element, autostart: bool):
         """Add a pool given its xml tree."""
-        self.__connection__.isAlive()
+        self.isAlive()
 
         xml = ET.tostring(tree, encoding="unicode")
         self.addPool(xml, autostart)
@@ -386,9 +914,13 @@ class Connection(EventManager):
         persistent settings."""
         # First notify all other widgets of this event
         # so they can destroy themselves
+        self.reconnect_supervisor.cancel()
+        if self.__state__ == CONNECTION_STATE_CONNECTING:
+            self.__cancelConnect__()
         if self.isConnected():
             self.__connection__.close()
         self.__connection__ = None
+        self.__state__ = CONNECTION_STATE_DISCONNECTED
 
         self.sendEvent(
             self.__connection__,
@@ -399,8 +931,8 @@ class Connection(EventManager):
         )
 
         # Check if any callbacks are still there
-        if len(self.event_callbacks) > 0:
-            print([cb.cb for cb in self.event_callbacks])
+        if self.hasCallbacks():
+            print(self.event_callbacks, self.keyed_callbacks)
             raise Exception("Something didn't unregister properly")
 
         # Delete self from settings
@@ -410,30 +942,94 @@ class Connection(EventManager):
 
         # Now this connection can be safely deleted
 
-    def __loadCapabilities__(self):
-        """Load this connections capabilities after connecting."""
+    def __getCapabilitiesXML__(self, kind: str, fetch: callable) -> str:
+        """Get capabilities XML from the on-disk cache, it is only fetched from
+        the host when its hypervisor or libvirt version changed.
+
+        Args:
+            kind (str): Which capabilities, i.e. "driver"
+            fetch (callable): Fetches the XML from the host
+
+        Returns:
+            str: Capabilities XML
+        """
+        if self.__versions__ is None:
+            self.__versions__ = (
+                f"{ self.__connection__.getVersion() }"
+                f"/{ self.__connection__.getLibVersion() }"
+            )
+        return getCachedCapabilities(self.url, self.__versions__, kind, fetch)
+
+    def __resetCapabilities__(self):
+        """Drop the loaded capabilities, i.e. because the host may have been
+        upgraded. They are loaded again on first use, or by
+        __prefetchCapabilities__."""
+        self.__versions__ = None
+        self.driver_capabilities = None
+        self.pool_capabilities = None
+        self.domain_capabilities_cache.clear()
+
+    def __prefetchCapabilities__(self):
+        """Load the versions and the driver, pool and default domain
+        capabilities in the background after connecting, so that their first
+        use doesn't block the main loop."""
+        connection = self.__connection__
+
+        def prefetch() -> tuple:
+            versions = f"{ connection.getVersion() }/{ connection.getLibVersion() }"
+            try:
+                xml = getCachedCapabilities(
+                    self.url, versions, "driver", connection.getCapabilities
+                )
+                driver_capabilities = DriverCapabilities(ET.fromstring(xml))
+            except Exception:
+                traceback.print_exc()
+                driver_capabilities = None
+            try:
+                xml = getCachedCapabilities(
+                    self.url, versions, "pool", connection.getStoragePoolCapabilities
+                )
+                pool_capabilities = PoolCapabilities(ET.fromstring(xml))
+            except Exception:
+                pool_capabilities = None
+            return versions, driver_capabilities, pool_capabilities
+
+        def onPrefetched(res: ResultWrapper):
+            if res.failed or connection is not self.__connection__:
+                return  # Disconnected or reconnected in the meantime
+            versions, driver_capabilities, pool_capabilities = res.data
+            self.__versions__ = versions
+            if self.driver_capabilities is None:
+                self.driver_capabilities = driver_capabilities
+            if self.pool_capabilities is None:
+                self.pool_capabilities = pool_capabilities
+            self.domain_capabilities_cache.request(lambda _: None)
+
+        failableAsyncJob(prefetch, [], lambda _: None, onPrefetched, queue=self.url)
+
+    def __loadDriverCapabilities__(self):
+        """Load the driver capabilities on first use."""
         try:
-            xml = self.__connection__.getCapabilities()
+            xml = self.__getCapabilitiesXML__(
+                "driver", self.__connection__.getCapabilities
+            )
             xml_tree = ET.fromstring(xml)
             self.driver_capabilities = DriverCapabilities(xml_tree)
         except:
             traceback.print_exc()
             self.driver_capabilities = DriverCapabilities(None)
 
+    def __loadPoolCapabilities__(self):
+        """Load the pool capabilities on first use."""
         try:
-            xml = self.__connection__.getStoragePoolCapabilities()
+            xml = self.__getCapabilitiesXML__(
+                "pool", self.__connection__.getStoragePoolCapabilities
+            )
             xml_tree = ET.fromstring(xml)
             self.pool_capabilities = PoolCapabilities(xml_tree)
         except:
             self.pool_capabilities = PoolCapabilities(None)
 
-        try:
-            xml = self.__connection__.getDomainCapabilities()
-            xml_tree = ET.fromstring(xml)
-            self.domain_capabilities = DomainCapabilities(xml_tree)
-        except:
-            self.domain_capabilities = DomainCapabilities(None)
-
     def isConnected(self) -> bool:
         """If it is connected."""
         return (
@@ -477,19 +1073,49 @@ class Connection(EventManager):
         return self.url
 
     def getDriverCapabilities(self) -> DriverCapabilities:
-        """Retrieve the hypervisors capabilities."""
+        """Retrieve the hypervisors capabilities. They are fetched on first use."""
         self.isAlive()
+        if self.driver_capabilities is None:
+            self.__loadDriverCapabilities__()
         return self.driver_capabilities
 
     def getPoolCapabilities(self) -> PoolCapabilities:
-        """Get the hypervisors pool capabilities."""
+        """Get the hypervisors pool capabilities. They are fetched on first use."""
         self.isAlive()
+        if self.pool_capabilities is None:
+            self.__loadPoolCapabilities__()
         return self.pool_capabilities
 
-    def getDomainCapabilities(self) -> DomainCapabilities:
-        """Get the hypervisors domain capabilities."""
+    def getDomainCapabilities(
+        self,
+        emulator: str = None,
+        arch: str = None,
+        machine: str = None,
+        virttype: str = None,
+    ) -> DomainCapabilities:
+        """Get the hypervisors domain capabilities, for the default or given
+        emulator, architecture, machine type and virtualization type. They are
+        fetched on first use."""
+        self.isAlive()
+        return self.domain_capabilities_cache.get(emulator, arch, machine, virttype)
+
+    def requestDomainCapabilities(
+        self,
+        ready_cb: callable,
+        emulator: str = None,
+        arch: str = None,
+        machine: str = None,
+        virttype: str = None,
+    ) -> None:
+        """Like getDomainCapabilities, but fetches them in the background.
+
+        Args:
+            ready_cb (callable): Called with the DomainCapabilities
+        """
         self.isAlive()
-        return self.domain_capabilities
+        self.domain_capabilities_cache.request(
+            ready_cb, emulator, arch, machine, virttype
+        )
 
     def getLibvirtVersion(self) -> str:
         """Get the libvirt version as major.minor.release"""
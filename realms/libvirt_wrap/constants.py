@@ -29,6 +29,13 @@
     CALLBACK_TYPE_SECRET_GENERIC,
 ) = range(9)
 
+(
+    OBJECT_TYPE_DOMAIN,
+    OBJECT_TYPE_POOL,
+    OBJECT_TYPE_NETWORK,
+    OBJECT_TYPE_SECRET,
+) = range(4)
+
 (
     CONNECTION_EVENT_CONNECTED,
     CONNECTION_EVENT_DISCONNECTED,
@@ -36,7 +43,9 @@
     CONNECTION_EVENT_SETTINGS_CHANGED,
     CONNECTION_EVENT_ATTEMPT_CONNECT,
     CONNECTION_EVENT_CONNECTION_FAILED,
-) = range(6)
+    CONNECTION_EVENT_RECONNECTING,
+    CONNECTION_EVENT_RECONNECTED,
+) = range(8)
 
 (
     DOMAIN_EVENT_DELETED,
@@ -60,4 +69,5 @@
     CONNECTION_STATE_DISCONNECTED,
     CONNECTION_STATE_CONNECTED,
     CONNECTION_STATE_CONNECTING,
-) = range(3)
+    CONNECTION_STATE_RECONNECTING,
+) = range(4)
@@ -13,56 +13,191 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import copy
 import xml.etree.ElementTree as ET
 
 import libvirt
 
-from realms.helpers import asyncJob
+from realms.helpers import ResultWrapper, asyncJob, failableAsyncJob, getETText
 
 from .connection import Connection
 from .constants import *
-from .event_manager import EventManager
+from .domain_capabilities import DomainCapabilities
+from .domain_record import DomainRecord
+from .event_manager import STATE_EVENTS, EventManager
 from .pool import Pool, getPoolFromName
 from .volume import Volume, getVolumeFromName
 
+# Lifecycle events that only change the run state, but not the XML
+DOMAIN_STATE_EVENTS = tuple(STATE_EVENTS[CALLBACK_TYPE_DOMAIN_LIFECYCLE])
+# Lifecycle events that change the run state and the live XML, but not the
+# definition, and the state they lead to
+DOMAIN_RUN_EVENTS = {
+    libvirt.VIR_DOMAIN_EVENT_STARTED: libvirt.VIR_DOMAIN_RUNNING,
+    libvirt.VIR_DOMAIN_EVENT_STOPPED: libvirt.VIR_DOMAIN_SHUTOFF,
+}
+
 
 class Domain(EventManager):
-    def __init__(self, connection: Connection, domain: libvirt.virDomain):
+    def __init__(
+        self,
+        connection: Connection,
+        domain: libvirt.virDomain,
+        record: DomainRecord = None,
+    ):
         super().__init__()
 
         self.connection = connection
         self.connection.isAlive()
-        self.connection.registerCallback(self.onConnectionEvent)
-        self.domain_capabilites = self.connection.getDomainCapabilities()
         self.domain = domain
 
+        self.record = record if record is not None else DomainRecord()
+        # Increased whenever the record changes, so that a refresh started
+        # before doesn't overwrite newer values
+        self.__record_generation__ = 0
+
+        # Only receive events of this domain
+        self.connection.registerKeyedCallback(
+            OBJECT_TYPE_DOMAIN, self.getUUID(), self.onConnectionEvent
+        )
+
     ############################################
     # Callbacks
     ############################################
 
     def onConnectionEvent(self, conn, obj, type_id, event_id, detail_id):
-        # Filter unwanted stuff
-        if (
-            type_id in [CALLBACK_TYPE_DOMAIN_LIFECYCLE, CALLBACK_TYPE_DOMAIN_GENERIC]
-            and obj.UUIDString() != self.domain.UUIDString()
-        ):
-            return
-        elif type_id not in [
-            CALLBACK_TYPE_CONNECTION_GENERIC,
-            CALLBACK_TYPE_DOMAIN_GENERIC,
-            CALLBACK_TYPE_DOMAIN_LIFECYCLE,
-        ]:
-            return
-
+        # Events are keyed, only events of this domain and connection
+        # events arrive here.
         if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
             # What happens if we disconnect or the connection gets deleted?
             # Only unsubscribe for connection event multiplexer, other objects
             # unsubscribe by themselves
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
-                self.connection.unregisterCallback(self.onConnectionEvent)
+                self.connection.unregisterKeyedCallback(
+                    OBJECT_TYPE_DOMAIN, self.getUUID(), self.onConnectionEvent
+                )
+            elif event_id == CONNECTION_EVENT_RECONNECTED:
+                self.rebind()
+        elif type_id == CALLBACK_TYPE_DOMAIN_LIFECYCLE:
+            # State or definition changed, drop the cached values before
+            # anyone downstream reads them.
+            if event_id in DOMAIN_STATE_EVENTS:
+                self.record.info = None
+                self.__record_generation__ += 1
+            elif event_id in DOMAIN_RUN_EVENTS:
+                self.__setRunState__(DOMAIN_RUN_EVENTS[event_id])
+            else:
+                self.invalidate()
 
         self.sendEvent(conn, obj, type_id, event_id, detail_id)
 
+    def rebind(self) -> None:
+        """Swap in the domain's handle of a reconnected connection. If the
+        domain disappeared in the meantime, announce its deletion instead."""
+        uuid = self.getUUID()
+        handle = self.connection.getReboundHandle(OBJECT_TYPE_DOMAIN, uuid)
+        if handle is not None:
+            # Keep showing the cached values until they were fetched again
+            self.domain = handle
+            self.refresh()
+            return
+
+        if self.connection.takeVanished(OBJECT_TYPE_DOMAIN, uuid):
+            self.connection.sendEvent(
+                self.connection,
+                self.domain,
+                CALLBACK_TYPE_DOMAIN_GENERIC,
+                DOMAIN_EVENT_DELETED,
+                0,
+            )
+        self.connection.unregisterKeyedCallback(
+            OBJECT_TYPE_DOMAIN, uuid, self.onConnectionEvent
+        )
+
+    ############################################
+    # Cache
+    ############################################
+
+    def invalidate(self) -> None:
+        """Drop all cached values except for the UUID, they will be
+        fetched again on their next access."""
+        self.record = DomainRecord(uuid=self.record.uuid)
+        self.__record_generation__ += 1
+
+    def __setRunState__(self, state: int) -> None:
+        """The domain was started or stopped. Keep the cached title and name,
+        take the new state from the event and fetch the rest in a job."""
+        record = copy.copy(self.record)
+        if record.info is not None:
+            record.info = [state] + list(record.info[1:])
+        # The live XML differs from the inactive one
+        record.xml = None
+        record.xml_tree = None
+        self.record = record
+        self.__record_generation__ += 1
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Fetch all cached values at once in a job. The cached values are
+        used until it finished, so the getters keep returning instantly."""
+        generation = self.__record_generation__
+        domain = self.domain
+
+        def fetch() -> DomainRecord:
+            try:
+                record = DomainRecord(
+                    uuid=domain.UUIDString(),
+                    name=domain.name(),
+                    info=domain.info(),
+                    persistent=bool(domain.isPersistent()),
+                    autostart=bool(domain.autostart()),
+                )
+                self.__loadXML__(record, domain)
+            except libvirt.libvirtError:
+                # I.e. a transient domain that was stopped is gone
+                return None
+            return record
+
+        def onFetched(res: ResultWrapper):
+            # Drop the result if anything changed in the meantime
+            if res.failed or res.data is None:
+                return
+            if generation != self.__record_generation__:
+                return
+            if domain is self.domain:
+                self.record = res.data
+                self.__record_generation__ += 1
+
+        failableAsyncJob(
+            fetch, [], lambda _: None, onFetched, queue=self.connection.url
+        )
+
+    def __loadXML__(
+        self, record: DomainRecord, domain: libvirt.virDomain = None
+    ) -> None:
+        """Fetch and parse the xml definition into the given record."""
+        self.connection.isAlive()
+        if domain is None:
+            domain = self.domain
+        record.xml = domain.XMLDesc()
+        record.xml_tree = ET.fromstring(record.xml)
+        record.title = getETText(record.xml_tree.find("title"))
+
+    def __getXMLTree__(self) -> ET.Element:
+        """Get the cached xml tree. It must not be modified."""
+        record = self.record
+        if record.xml_tree is None:
+            self.__loadXML__(record)
+        return record.xml_tree
+
+    def __getInfo__(self) -> list:
+        """Get the cached info tuple."""
+        record = self.record
+        if record.info is None:
+            self.connection.isAlive()
+            record.info = self.domain.info()
+        return record.info
+
     ############################################
     # Actions
     ############################################
@@ -139,7 +274,7 @@ class Domain(EventManager):
             ready_cb (callable): Will be called with list of libvirt.virDomainSnapshot
         """
         self.connection.isAlive()
-        asyncJob(self.domain.listAllSnapshots, [], ready_cb)
+        asyncJob(self.domain.listAllSnapshots, [], ready_cb, queue=self.connection.url)
 
     def deleteDomain(self) -> None:
         """Delete this domain and perform additional checks that there are no
@@ -163,7 +298,7 @@ class Domain(EventManager):
             print([cb.cb for cb in self.event_callbacks])
             raise Exception("Something didn't unregister properly")
 
-        if self.isActive():
+        if self.domain.isActive():
             self.domain.destroy()
 
         # Use almost all the flags so it really get's deleted, see
@@ -197,6 +332,7 @@ class Domain(EventManager):
 
         new_domain = self.connection.__connection__.defineXML(xml)
         self.domain = new_domain
+        self.invalidate()
 
     def updateDevice(self, device_xml: ET.Element):
         """Update the definition of a virtual device, regardless
@@ -208,6 +344,7 @@ class Domain(EventManager):
         self.connection.isAlive()
         xml = ET.tostring(device_xml, "unicode")
         self.domain.updateDeviceFlags(xml, libvirt.VIR_DOMAIN_AFFECT_CURRENT)
+        self.invalidate()
 
     def attachDevice(self, device_xml: ET.Element):
         """Attach the given device to the domain, regardless
@@ -215,22 +352,52 @@ class Domain(EventManager):
         self.connection.isAlive()
         xml = ET.tostring(device_xml, "unicode")
         self.domain.attachDeviceFlags(xml, libvirt.VIR_DOMAIN_AFFECT_CURRENT)
+        self.invalidate()
 
     def detachDevice(self, device_xml: ET.Element):
         """Detach the given device from the domain when active."""
         self.connection.isAlive()
         xml = ET.tostring(device_xml, "unicode")
         self.domain.detachDevice(xml)
+        self.invalidate()
 
     ############################################
     # Small getters
     ############################################
     def getETree(self) -> ET.Element:
-        """Load data from xml-definition"""
-        self.connection.isAlive()
-        xml = self.domain.XMLDesc()
-        xml_tree = ET.fromstring(xml)
-        return xml_tree
+        """Load data from xml-definition. The returned tree is a copy and
+        may be modified freely."""
+        return copy.deepcopy(self.__getXMLTree__())
+
+    def getCapabilitiesKey(self) -> tuple:
+        """Get the (emulator, arch, machine, virttype) of this domain, the
+        key of its domain capabilities.
+
+        Returns:
+            tuple: Key, unknown parts are None
+        """
+        tree = self.__getXMLTree__()
+        os_type = tree.find("os/type")
+        return (
+            getETText(tree.find("devices/emulator")) or None,
+            os_type.get("arch") if os_type is not None else None,
+            os_type.get("machine") if os_type is not None else None,
+            tree.get("type"),
+        )
+
+    def getDomainCapabilities(self) -> DomainCapabilities:
+        """Get the domain capabilities matching this domain's emulator,
+        architecture and machine type."""
+        return self.connection.getDomainCapabilities(*self.getCapabilitiesKey())
+
+    def requestDomainCapabilities(self, ready_cb: callable):
+        """Get the domain capabilities matching this domain's emulator,
+        architecture and machine type without blocking.
+
+        Args:
+            ready_cb (callable): Called with the DomainCapabilities
+        """
+        self.connection.requestDomainCapabilities(ready_cb, *self.getCapabilitiesKey())
 
     def getDisplayName(self) -> str:
         """Get either the domain's title or it's name for display
@@ -238,41 +405,52 @@ class Domain(EventManager):
         Returns:
             str: Domains name for displaying
         """
-        self.connection.isAlive()
-        title_xml = self.getETree().find("title")
-        if title_xml is not None:
-            if title_xml.text is not None:
-                return title_xml.text
-        return self.domain.name()
+        record = self.record
+        if record.title is None:
+            self.__loadXML__(record)
+        if record.title:
+            return record.title
+        return self.getName()
+
+    def getName(self) -> str:
+        if self.record.name is None:
+            self.connection.isAlive()
+            self.record.name = self.domain.name()
+        return self.record.name
 
     def getUUID(self) -> str:
-        self.connection.isAlive()
-        return self.domain.UUIDString()
+        if self.record.uuid is None:
+            self.connection.isAlive()
+            self.record.uuid = self.domain.UUIDString()
+        return self.record.uuid
 
     def isPersistent(self) -> bool:
-        self.connection.isAlive()
-        return self.domain.isPersistent()
+        if self.record.persistent is None:
+            self.connection.isAlive()
+            self.record.persistent = bool(self.domain.isPersistent())
+        return self.record.persistent
 
     def isActive(self) -> bool:
-        self.connection.isAlive()
-        return self.domain.isActive()
+        return self.getStateID() not in [
+            libvirt.VIR_DOMAIN_NOSTATE,
+            libvirt.VIR_DOMAIN_SHUTOFF,
+        ]
 
     def getXML(self) -> str:
-        self.connection.isAlive()
-        return self.domain.XMLDesc()
+        self.__getXMLTree__()
+        return self.record.xml
 
     def getAutostart(self) -> bool:
-        self.connection.isAlive()
-        return self.domain.autostart()
+        if self.record.autostart is None:
+            self.connection.isAlive()
+            self.record.autostart = bool(self.domain.autostart())
+        return self.record.autostart
 
     def getStateID(self) -> int:
-        self.connection.isAlive()
-        state = self.domain.info()[0]
-        return state
+        return self.__getInfo__()[0]
 
     def getStateText(self) -> str:
         """Return a descriptive string of the current domain state"""
-        self.connection.isAlive()
         state = self.getStateID()
         if state == libvirt.VIR_DOMAIN_NOSTATE:
             return "no state"
@@ -292,23 +470,24 @@ class Domain(EventManager):
             return "pm-suspended"
 
     def getVCPUs(self) -> int:
-        self.connection.isAlive()
-        return self.domain.info()[3]
+        return self.__getInfo__()[3]
 
     def getCPUTime(self) -> int:
-        """Return the CPU time in ns averaged for all vcpus
+        """Return the CPU time in ns averaged for all vcpus. Always
+        fetches a fresh reading.
+
         Returns:
             Float: CPU time in ns (max is one second)
         """
         self.connection.isAlive()
+        self.record.info = self.domain.info()
         if self.isActive():
-            return self.domain.info()[4]
+            return self.record.info[4]
         else:
             return 0
 
     def getMaxMemory(self) -> int:
-        self.connection.isAlive()
-        return self.domain.info()[1]
+        return self.__getInfo__()[1]
 
     def getMemoryUsage(self) -> int:
         self.connection.isAlive()
@@ -325,7 +504,7 @@ class Domain(EventManager):
 
     def getAttachedStorageVolumes(self) -> list[Volume]:
         self.connection.isAlive()
-        xml = self.getETree()
+        xml = self.__getXMLTree__()
 
         volumes = []
 
@@ -353,9 +532,7 @@ class Domain(EventManager):
         nics = []
 
         if self.isActive():
-            xml = self.getETree()
-
-            volumes = []
+            xml = self.__getXMLTree__()
 
             for device_xml in xml.find("devices"):
                 if device_xml.tag == "interface":
@@ -392,3 +569,5 @@ class Domain(EventManager):
     def setAutostart(self, autostart: bool) -> None:
         self.connection.isAlive()
         self.domain.setAutostart(autostart)
+        self.record.autostart = autostart
+        self.__record_generation__ += 1
@@ -13,10 +13,15 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import hashlib
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+from realms.helpers import asyncJob
 
 
 class DomainCapabilities:
+    xml_tree = None  # None if the capabilities could not be fetched
     emulator_path = "Unknown"
     domain = "Unknown"
     machine = "Unknown"
@@ -119,3 +124,115 @@ class DomainCapabilities:
                         self.devices[dev.tag][enum.get("name")] = [
                             e.text for e in enum.findall("value")
                         ]
+
+
+class DomainCapabilitiesCache:
+    """LRU cache of a connection's domain capabilities, keyed by
+    (emulator, arch, machine, virttype). Any part of the key may be None to
+    use the hypervisor's default. Background fetches of the same key are
+    deduplicated."""
+
+    def __init__(self, connection, max_size: int):
+        """Create cache.
+
+        Args:
+            connection (Connection): Connection wrapper
+            max_size (int): Maximum number of cached capabilities
+        """
+        self.connection = connection
+        self.max_size = max_size
+
+        self.__entries__ = OrderedDict()  # Dict from key to DomainCapabilities
+        self.__waiting__ = {}  # Dict from key to callbacks of a running fetch
+        self.__generation__ = 0  # To discard fetches from before clear
+
+    def get(
+        self,
+        emulator: str = None,
+        arch: str = None,
+        machine: str = None,
+        virttype: str = None,
+    ) -> DomainCapabilities:
+        """Get domain capabilities, fetching them in the calling thread
+        if they are not cached yet.
+
+        Returns:
+            DomainCapabilities: Capabilities for the key
+        """
+        key = (emulator, arch, machine, virttype)
+        caps = self.__lookup__(key)
+        if caps is None:
+            caps = self.__fetch__(key)
+            if caps.xml_tree is not None:
+                self.__store__(key, caps)
+        return caps
+
+    def request(
+        self,
+        ready_cb: callable,
+        emulator: str = None,
+        arch: str = None,
+        machine: str = None,
+        virttype: str = None,
+    ) -> None:
+        """Get domain capabilities, fetching them in the background
+        if they are not cached yet.
+
+        Args:
+            ready_cb (callable): Called with the DomainCapabilities
+        """
+        key = (emulator, arch, machine, virttype)
+        caps = self.__lookup__(key)
+        if caps is not None:
+            ready_cb(caps)
+            return
+
+        if key in self.__waiting__:
+            self.__waiting__[key].append(ready_cb)
+            return
+        self.__waiting__[key] = [ready_cb]
+        generation = self.__generation__
+
+        def onFetched(caps: DomainCapabilities):
+            # Failures are not cached so that the next request retries
+            if generation == self.__generation__ and caps.xml_tree is not None:
+                self.__store__(key, caps)
+            for cb in self.__waiting__.pop(key, []):
+                cb(caps)
+
+        asyncJob(self.__fetch__, [key], onFetched, queue=self.connection.url)
+
+    def clear(self) -> None:
+        """Drop all cached capabilities."""
+        self.__generation__ += 1
+        self.__entries__.clear()
+
+    def __lookup__(self, key: tuple) -> DomainCapabilities:
+        caps = self.__entries__.get(key)
+        if caps is not None:
+            self.__entries__.move_to_end(key)
+        return caps
+
+    def __store__(self, key: tuple, caps: DomainCapabilities):
+        self.__entries__[key] = caps
+        self.__entries__.move_to_end(key)
+        while len(self.__entries__) > self.max_size:
+            self.__entries__.popitem(last=False)
+
+    def __fetch__(self, key: tuple) -> DomainCapabilities:
+        """Fetch and parse the capabilities of a key. Failures result in
+        the default DomainCapabilities."""
+        # The default capabilities keep their plain name in the disk cache
+        kind = "domain"
+        if key != (None, None, None, None):
+            kind += "-" + hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+
+        def fetch() -> str:
+            return self.connection.__connection__.getDomainCapabilities(*key, 0)
+
+        try:
+            self.connection.isAlive()
+            xml = self.connection.__getCapabilitiesXML__(kind, fetch)
+            return DomainCapabilities(ET.fromstring(xml))
+        except Exception:
+            return DomainCapabilities(None)
@@ -0,0 +1,83 @@
+# Realms, a libadwaita libvirt client.
+# Copyright (C) 2025
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+
+import libvirt
+
+# Stats groups needed to fill a record from getAllDomainStats
+RECORD_STATS = (
+    libvirt.VIR_DOMAIN_STATS_STATE
+    | libvirt.VIR_DOMAIN_STATS_CPU_TOTAL
+    | libvirt.VIR_DOMAIN_STATS_BALLOON
+    | libvirt.VIR_DOMAIN_STATS_VCPU
+)
+
+
+@dataclass
+class DomainRecord:
+    """Cached state of a domain. Fields that are None have not been
+    loaded yet (or were invalidated) and will be fetched on demand."""
+
+    uuid: str = None
+    name: str = None
+    title: str = None
+    info: list = None
+    persistent: bool = None
+    autostart: bool = None
+    xml: str = None
+    xml_tree: ET.Element = None
+
+
+def recordFromStats(
+    domain: libvirt.virDomain, stats: dict, persistent: bool, autostart: bool
+) -> DomainRecord:
+    """Build a record from the result of getAllDomainStats. Name and UUID
+    are stored locally in the virDomain object, so reading them is free.
+
+    Args:
+        domain (libvirt.virDomain): Domain the stats belong to
+        stats (dict): Stats as returned for RECORD_STATS
+        persistent (bool): If the domain is persistent
+        autostart (bool): If the domain is set to autostart
+
+    Returns:
+        DomainRecord: Pre-populated record
+    """
+    record = DomainRecord(
+        uuid=domain.UUIDString(),
+        name=domain.name(),
+        persistent=persistent,
+        autostart=autostart,
+    )
+
+    if "state.state" in stats:
+        # Same layout as virDomain.info()
+        record.info = [
+            stats["state.state"],
+            stats.get("balloon.maximum", 0),
+            stats.get("balloon.current", 0),
+            stats.get("vcpu.current", 0),
+            stats.get("cpu.time", 0),
+        ]
+
+    try:
+        title = domain.metadata(libvirt.VIR_DOMAIN_METADATA_TITLE, None)
+        record.title = title if title is not None else ""
+    except libvirt.libvirtError:
+        record.title = ""
+
+    return record
@@ -0,0 +1,282 @@
+# Realms, a libadwaita libvirt client.
+# Copyright (C) 2025
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Sampling of domain statistics with as few calls as possible."""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import libvirt
+from gi.repository import GLib
+
+from realms.helpers import ResultWrapper, failableAsyncJob, getMetricsStore
+
+from .constants import *
+
+# Stats groups fetched for each sample
+DOMAIN_STATS = (
+    libvirt.VIR_DOMAIN_STATS_STATE
+    | libvirt.VIR_DOMAIN_STATS_CPU_TOTAL
+    | libvirt.VIR_DOMAIN_STATS_BALLOON
+    | libvirt.VIR_DOMAIN_STATS_VCPU
+    | libvirt.VIR_DOMAIN_STATS_INTERFACE
+)
+
+
+@dataclass
+class DomainStats:
+    """One sample of a domain's statistics."""
+
+    timestamp: float = 0  # Monotonic time in seconds
+    state: int = libvirt.VIR_DOMAIN_NOSTATE
+    cpu_time: int = 0  # ns
+    vcpus: int = 0
+    memory_rss: int = 0  # KiB
+    max_memory: int = 0  # KiB
+    nics: dict = field(default_factory=dict)  # Dict from name to (rx, tx) bytes
+
+
+def parseDomainStats(stats: dict, timestamp: float) -> DomainStats:
+    """Parse the dict returned by getAllDomainStats/domainListGetStats.
+
+    Args:
+        stats (dict): Stats of one domain
+        timestamp (float): When the stats were taken
+
+    Returns:
+        DomainStats: Parsed sample
+    """
+    sample = DomainStats(
+        timestamp=timestamp,
+        state=stats.get("state.state", libvirt.VIR_DOMAIN_NOSTATE),
+        cpu_time=stats.get("cpu.time", 0),
+        vcpus=stats.get("vcpu.current", 0),
+        memory_rss=stats.get("balloon.rss", 0),
+        max_memory=stats.get("balloon.maximum", 0),
+    )
+    for i in range(stats.get("net.count", 0)):
+        name = stats.get(f"net.{ i }.name")
+        if name is None:
+            continue
+        sample.nics[name] = (
+            stats.get(f"net.{ i }.rx.bytes", 0),
+            stats.get(f"net.{ i }.tx.bytes", 0),
+        )
+    return sample
+
+
+def computeMetrics(last: DomainStats, stats: DomainStats) -> dict[str, float]:
+    """Calculate the values shown in the graphs from two consecutive samples.
+
+    Args:
+        last (DomainStats): Previous sample
+        stats (DomainStats): Current sample
+
+    Returns:
+        dict[str, float]: Dict from metric name to value: "cpu" (usage of all
+            vCPUs, 0 to 1), "memory" (KiB) and "net.<nic>.rx"/"net.<nic>.tx"
+            (bytes/s). None if the samples are not in order.
+    """
+    elapsed = stats.timestamp - last.timestamp
+    if elapsed <= 0:
+        return None
+
+    cpu_usage = 0
+    if stats.vcpus > 0 and stats.cpu_time >= last.cpu_time:
+        cpu_usage = (stats.cpu_time - last.cpu_time) / stats.vcpus
+        cpu_usage /= 1000000000 * elapsed
+
+    metrics = {"cpu": cpu_usage, "memory": stats.memory_rss}
+    for nic, (rx, tx) in stats.nics.items():
+        last_rx, last_tx = last.nics.get(nic, (rx, tx))
+        metrics[f"net.{ nic }.rx"] = max(0, rx - last_rx) / elapsed
+        metrics[f"net.{ nic }.tx"] = max(0, tx - last_tx) / elapsed
+    return metrics
+
+
+class StatsCollector:
+    """Periodically fetches the statistics of all active domains of a
+    connection with a single call. Keeps a ring buffer of samples per domain
+    and hands new samples to the callbacks subscribed to that domain. It only
+    polls while there are subscribers, so the cost scales with the number
+    of hosts and not with the number of open graphs. All samples are also
+    written to the metrics store.
+
+    Domains whose graphs are hidden can be kept in the background. They are
+    sampled at a low frequency only, to fill the history that graphs can
+    backfill from once they are shown again.
+    """
+
+    def __init__(
+        self, connection, interval: int, history: int, background_interval: int
+    ):
+        """Create collector, it starts once the first callback registers.
+
+        Args:
+            connection (Connection): Connection wrapper
+            interval (int): Sampling interval in ms
+            history (int): Number of samples kept per domain
+            background_interval (int): Sampling interval in ms when only
+                background subscribers exist
+        """
+        self.connection = connection
+        self.interval = interval
+        self.history = history
+        self.background_interval = background_interval
+
+        self.callbacks = {}  # Dict from uuid to list of callbacks
+        self.background = {}  # Dict from uuid to number of background subscribers
+        self.buffers = {}  # Dict from uuid to deque of DomainStats
+
+        self.__timeout__ = None
+        self.__timeout_interval__ = None
+        self.__pending__ = False
+
+    def registerCallback(self, uuid: str, cb: callable) -> None:
+        """Register a callback that is called with every new DomainStats
+        of the given domain.
+
+        Args:
+            uuid (str): Domain UUID
+            cb (callable): Callback
+        """
+        self.callbacks.setdefault(uuid, []).append(cb)
+        self.__reschedule__()
+
+    def unregisterCallback(self, uuid: str, cb: callable) -> None:
+        """Unregister a callback, polling stops with the last subscriber.
+
+        Args:
+            uuid (str): Domain UUID
+            cb (callable): Callback
+        """
+        callbacks = self.callbacks[uuid]
+        callbacks.remove(cb)
+        if not callbacks:
+            del self.callbacks[uuid]
+        self.__reschedule__()
+
+    def registerBackground(self, uuid: str) -> None:
+        """Keep sampling a domain at the background interval, so its
+        history stays available.
+
+        Args:
+            uuid (str): Domain UUID
+        """
+        self.background[uuid] = self.background.get(uuid, 0) + 1
+        self.__reschedule__()
+
+    def unregisterBackground(self, uuid: str) -> None:
+        """Undo registerBackground, polling stops with the last subscriber.
+
+        Args:
+            uuid (str): Domain UUID
+        """
+        self.background[uuid] -= 1
+        if self.background[uuid] <= 0:
+            del self.background[uuid]
+        self.__reschedule__()
+
+    def __reschedule__(self) -> None:
+        """Pick the sampling interval for the current subscribers."""
+        if self.callbacks:
+            interval = self.interval
+        elif self.background:
+            interval = self.background_interval
+        else:
+            self.stop()
+            return
+
+        if interval == self.__timeout_interval__:
+            return
+        if self.__timeout__ is not None:
+            GLib.source_remove(self.__timeout__)
+        self.__timeout__ = GLib.timeout_add(interval, self.__onTimeout__)
+        self.__timeout_interval__ = interval
+        self.__onTimeout__()
+
+    def stop(self) -> None:
+        """Stop polling and drop all samples."""
+        if self.__timeout__ is not None:
+            GLib.source_remove(self.__timeout__)
+            self.__timeout__ = None
+            self.__timeout_interval__ = None
+        self.buffers.clear()
+
+    def getHistory(self, uuid: str) -> list[DomainStats]:
+        """Get the buffered samples of a domain, oldest first."""
+        return list(self.buffers.get(uuid, []))
+
+    def __collect__(self) -> dict[str, DomainStats]:
+        """Fetch one sample of all active domains, runs in a worker."""
+        self.connection.isAlive()
+        timestamp = time.monotonic()
+        results = self.connection.__connection__.getAllDomainStats(
+            DOMAIN_STATS, libvirt.VIR_CONNECT_GET_ALL_DOMAINS_STATS_ACTIVE
+        )
+        return {
+            dom.UUIDString(): parseDomainStats(stats, timestamp)
+            for dom, stats in results
+        }
+
+    def __onTimeout__(self):
+        # Polling would only fail while the connection is being reopened
+        if self.connection.getState() == CONNECTION_STATE_RECONNECTING:
+            return True
+        # Skip the tick if the last sample still hasn't arrived
+        if not self.__pending__:
+            self.__pending__ = True
+            failableAsyncJob(
+                self.__collect__,
+                [],
+                lambda _: None,
+                self.__onSamples__,
+                queue=self.connection.url,
+            )
+        return True
+
+    def __onSamples__(self, res: ResultWrapper):
+        self.__pending__ = False
+        if res.failed or self.__timeout__ is None:
+            return
+
+        samples = res.data
+        timestamp = time.monotonic()
+
+        store = getMetricsStore()
+        for uuid, sample in samples.items():
+            buffer = self.buffers.get(uuid)
+            if buffer is None:
+                buffer = self.buffers[uuid] = deque(maxlen=self.history)
+            else:
+                metrics = computeMetrics(buffer[-1], sample)
+                if metrics is not None:
+                    store.push(self.connection.url, uuid, metrics)
+            buffer.append(sample)
+
+        # Domains that stopped are no longer reported
+        for uuid in list(self.buffers.keys()):
+            if uuid not in samples:
+                del self.buffers[uuid]
+
+        for uuid, callbacks in list(self.callbacks.items()):
+            sample = samples.get(uuid)
+            if sample is None:
+                sample = DomainStats(
+                    timestamp=timestamp, state=libvirt.VIR_DOMAIN_SHUTOFF
+                )
+            for cb in callbacks.copy():
+                cb(sample)
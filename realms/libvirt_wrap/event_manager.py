@@ -16,17 +16,144 @@
 
 from traceback import print_exc
 
+from gi.repository import GLib
+
 from .common import *
 
+# Which kind of object an event with the given callback type refers to.
+# Events of other types (connection events) are not bound to an object.
+CALLBACK_OBJECT_TYPES = {
+    CALLBACK_TYPE_DOMAIN_LIFECYCLE: OBJECT_TYPE_DOMAIN,
+    CALLBACK_TYPE_DOMAIN_GENERIC: OBJECT_TYPE_DOMAIN,
+    CALLBACK_TYPE_POOL_LIFECYCLE: OBJECT_TYPE_POOL,
+    CALLBACK_TYPE_POOL_GENERIC: OBJECT_TYPE_POOL,
+    CALLBACK_TYPE_NETWORK_LIFECYCLE: OBJECT_TYPE_NETWORK,
+    CALLBACK_TYPE_NETWORK_GENERIC: OBJECT_TYPE_NETWORK,
+    CALLBACK_TYPE_SECRET_LIFECYCLE: OBJECT_TYPE_SECRET,
+    CALLBACK_TYPE_SECRET_GENERIC: OBJECT_TYPE_SECRET,
+}
+
+# Lifecycle events that change which objects exist. They are never merged,
+# all other lifecycle events of an object only signal that its state changed.
+STRUCTURAL_EVENTS = {
+    CALLBACK_TYPE_DOMAIN_LIFECYCLE: {
+        libvirt.VIR_DOMAIN_EVENT_DEFINED,
+        libvirt.VIR_DOMAIN_EVENT_UNDEFINED,
+    },
+    CALLBACK_TYPE_POOL_LIFECYCLE: {
+        libvirt.VIR_STORAGE_POOL_EVENT_DEFINED,
+        libvirt.VIR_STORAGE_POOL_EVENT_UNDEFINED,
+    },
+    CALLBACK_TYPE_NETWORK_LIFECYCLE: {
+        libvirt.VIR_NETWORK_EVENT_DEFINED,
+        libvirt.VIR_NETWORK_EVENT_UNDEFINED,
+    },
+    CALLBACK_TYPE_SECRET_LIFECYCLE: {
+        libvirt.VIR_SECRET_EVENT_DEFINED,
+        libvirt.VIR_SECRET_EVENT_UNDEFINED,
+    },
+}
+
+# Lifecycle events that only change the run state of an object, but not its
+# XML. Other events of these callback types require dropping everything
+# cached about the object, so they are not merged into later state events.
+# Callback types without an entry are merged regardless.
+STATE_EVENTS = {
+    CALLBACK_TYPE_DOMAIN_LIFECYCLE: {
+        libvirt.VIR_DOMAIN_EVENT_SUSPENDED,
+        libvirt.VIR_DOMAIN_EVENT_RESUMED,
+        libvirt.VIR_DOMAIN_EVENT_SHUTDOWN,
+        libvirt.VIR_DOMAIN_EVENT_PMSUSPENDED,
+        libvirt.VIR_DOMAIN_EVENT_CRASHED,
+    },
+}
+
+
+class EventCoalescer:
+    """Collects the lifecycle events arriving within a short window and merges
+    them per object before they are sent out. Of the state changes of one
+    object only the last is kept, so a burst results in one refresh per
+    object. Structural events are always kept. Of the events that are
+    neither structural nor in STATE_EVENTS, the last one is kept as well,
+    so receivers still drop their cached XML. The order of the remaining
+    events is preserved.
+    """
+
+    def __init__(self, send: callable, interval: int):
+        """Create coalescer.
+
+        Args:
+            send (callable): Called with (conn, obj, type_id, event_id,
+                detail_id, uuid) per merged event, i.e. EventManager.sendEvent
+            interval (int): Window in ms
+        """
+        self.send = send
+        self.interval = interval
+
+        self.__pending__ = []  # Events in order, merged ones are None
+        # Dict from (type_id, uuid, is state event) to index of the last event
+        self.__last__ = {}
+        self.__timeout__ = None
+
+    def push(self, conn, obj, type_id, event_id, detail_id) -> None:
+        """Queue an event, it is sent out after the window."""
+        uuid = obj.UUIDString()
+        if event_id not in STRUCTURAL_EVENTS.get(type_id, ()):
+            state_events = STATE_EVENTS.get(type_id)
+            is_state = state_events is None or event_id in state_events
+            # An event that drops the cache supersedes earlier state events
+            # too, while a state event must not hide an earlier one of those.
+            merged = [True] if is_state else [True, False]
+            for merged_is_state in merged:
+                index = self.__last__.pop((type_id, uuid, merged_is_state), None)
+                if index is not None:
+                    self.__pending__[index] = None
+            self.__last__[(type_id, uuid, is_state)] = len(self.__pending__)
+        self.__pending__.append((conn, obj, type_id, event_id, detail_id, uuid))
+
+        if self.__timeout__ is None:
+            self.__timeout__ = GLib.timeout_add(self.interval, self.flush)
+
+    def flush(self) -> bool:
+        """Send out all queued events now.
+
+        Returns:
+            bool: False, to be usable as GLib callback
+        """
+        if self.__timeout__ is not None:
+            GLib.source_remove(self.__timeout__)
+            self.__timeout__ = None
+
+        pending = self.__pending__
+        self.__pending__ = []
+        self.__last__ = {}
+        for event in pending:
+            if event is not None:
+                self.send(*event)
+        return False
+
+    def clear(self) -> None:
+        """Drop all queued events."""
+        if self.__timeout__ is not None:
+            GLib.source_remove(self.__timeout__)
+            self.__timeout__ = None
+        self.__pending__ = []
+        self.__last__ = {}
+
 
 class EventManager:
     """Simple base class that allows managing events with
     arbitrarily many callbacks. Used for most libvirt wrapping
     classes.
+
+    Callbacks can either receive all events, or be keyed to a single
+    object by its type and UUID. Keyed callbacks only receive the events
+    of that object, plus all events not bound to an object.
     """
 
     def __init__(self):
         self.event_callbacks = []
+        self.keyed_callbacks = {}  # Dict from (object type, uuid) to callbacks
 
     def registerCallback(self, _cb: callable):
         """Register a callback to the wrappers callback multiplexer.
@@ -67,10 +194,67 @@ class EventManager:
         else:
             raise ValueError("Callback was not registered")
 
-    def sendEvent(self, conn, obj, type_id, event_id, detail_id):
-        """Send out event to all subscribed callbacks"""
+    def registerKeyedCallback(self, object_type: int, uuid: str, _cb: callable):
+        """Register a callback that is only called for events of one object.
+
+        Args:
+            object_type (int): One of the OBJECT_TYPE_* constants
+            uuid (str): UUID of the object
+            _cb (callable): Callback
+
+        Raises:
+            ValueError: Raise if function already registered for that object
+        """
+        callbacks = self.keyed_callbacks.setdefault((object_type, uuid), [])
+        if _cb in callbacks:
+            raise ValueError("Callback already registered")
+        callbacks.append(_cb)
+
+    def unregisterKeyedCallback(self, object_type: int, uuid: str, _cb: callable):
+        """Unregister a keyed event callback
+
+        Args:
+            object_type (int): One of the OBJECT_TYPE_* constants
+            uuid (str): UUID of the object
+            _cb (callable): Callback
+
+        Raises:
+            ValueError: If not registered
+        """
+        key = (object_type, uuid)
+        callbacks = self.keyed_callbacks.get(key, [])
+        if _cb not in callbacks:
+            raise ValueError("Callback was not registered")
+        callbacks.remove(_cb)
+        if not callbacks:
+            del self.keyed_callbacks[key]
+        print(f"Removed callback { _cb }")
+
+    def hasCallbacks(self) -> bool:
+        """If any callbacks, keyed or not, are still registered."""
+        return len(self.event_callbacks) > 0 or len(self.keyed_callbacks) > 0
+
+    def sendEvent(self, conn, obj, type_id, event_id, detail_id, uuid: str = None):
+        """Send out event to all subscribed callbacks
+
+        Args:
+            uuid (str, optional): UUID to dispatch keyed callbacks by, if
+                it is not the UUID of obj. Defaults to None.
+        """
         # printEvent(conn, obj, type_id, event_id, detail_id)
-        for cb in self.event_callbacks.copy():
+        callbacks = self.event_callbacks.copy()
+
+        if self.keyed_callbacks:
+            object_type = CALLBACK_OBJECT_TYPES.get(type_id)
+            if object_type is None:
+                for keyed in self.keyed_callbacks.values():
+                    callbacks.extend(keyed)
+            else:
+                if uuid is None and obj is not None:
+                    uuid = obj.UUIDString()
+                callbacks.extend(self.keyed_callbacks.get((object_type, uuid), []))
+
+        for cb in callbacks:
             try:
                 cb(conn, obj, type_id, event_id, detail_id)
             except Exception:
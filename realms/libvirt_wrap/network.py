@@ -19,48 +19,82 @@ import libvirt
 
 from realms.helpers.async_jobs import asyncJob
 
+from .common import networkDisplayName
 from .connection import Connection
 from .constants import *
 from .event_manager import EventManager
 
 
 class Network(EventManager):
-    def __init__(self, connection: Connection, network: libvirt.virNetwork):
+    def __init__(
+        self,
+        connection: Connection,
+        network: libvirt.virNetwork,
+        display_name: str = None,
+    ):
         super().__init__()
         self.event_callbacks = []
 
         self.connection = connection
         self.connection.isAlive()
-        self.connection.registerCallback(self.onConnectionEvent)
         self.network = network
+        self.uuid = network.UUIDString()
+
+        # Cached title or name, fetched on demand while None. Pass it in if
+        # it was already fetched in a job, i.e. by listNetworkTitles.
+        self.__display_name__ = display_name
+
+        # Only receive events of this network
+        self.connection.registerKeyedCallback(
+            OBJECT_TYPE_NETWORK, self.uuid, self.onConnectionEvent
+        )
 
     ############################################
     # Callbacks
     ############################################
 
     def onConnectionEvent(self, conn, obj, type_id, event_id, detail_id):
-        # Filter unwanted stuff
-        if (
-            type_id in [CALLBACK_TYPE_NETWORK_LIFECYCLE, CALLBACK_TYPE_NETWORK_GENERIC]
-            and obj.UUIDString() != self.network.UUIDString()
-        ):
-            return
-        if type_id not in [
-            CALLBACK_TYPE_CONNECTION_GENERIC,
-            CALLBACK_TYPE_NETWORK_GENERIC,
-            CALLBACK_TYPE_NETWORK_LIFECYCLE,
-        ]:
-            return
-
+        # Events are keyed, only events of this network and connection
+        # events arrive here.
         if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
             # What happens if we disconnect or the connection gets deleted?
             # Only unsubscribe for connection event multiplexer, other objects
             # unsubscribe by themselves
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
-                self.connection.unregisterCallback(self.onConnectionEvent)
+                self.connection.unregisterKeyedCallback(
+                    OBJECT_TYPE_NETWORK, self.uuid, self.onConnectionEvent
+                )
+            elif event_id == CONNECTION_EVENT_RECONNECTED:
+                self.rebind()
+        elif type_id == CALLBACK_TYPE_NETWORK_LIFECYCLE:
+            if event_id == libvirt.VIR_NETWORK_EVENT_DEFINED:
+                # The title might have changed
+                self.__display_name__ = None
 
         self.sendEvent(conn, obj, type_id, event_id, detail_id)
 
+    def rebind(self) -> None:
+        """Swap in the network's handle of a reconnected connection. If the
+        network disappeared in the meantime, announce its deletion instead."""
+        uuid = self.uuid
+        handle = self.connection.getReboundHandle(OBJECT_TYPE_NETWORK, uuid)
+        if handle is not None:
+            self.network = handle
+            self.__display_name__ = None
+            return
+
+        if self.connection.takeVanished(OBJECT_TYPE_NETWORK, uuid):
+            self.connection.sendEvent(
+                self.connection,
+                self.network,
+                CALLBACK_TYPE_NETWORK_GENERIC,
+                NETWORK_EVENT_DELETED,
+                0,
+            )
+        self.connection.unregisterKeyedCallback(
+            OBJECT_TYPE_NETWORK, uuid, self.onConnectionEvent
+        )
+
     ############################################
     # Actions
     ############################################
@@ -81,6 +115,7 @@ class Network(EventManager):
 
         new_network = self.connection.__connection__.networkDefineXML(xml)
         self.network = new_network
+        self.__display_name__ = None
 
     def start(self):
         self.connection.isAlive()
@@ -121,11 +156,9 @@ class Network(EventManager):
 
     def getDisplayName(self):
         self.connection.isAlive()
-        title_xml = self.getETree().find("title")
-        if title_xml is not None:
-            if title_xml.text is not None:
-                return title_xml.text
-        return self.network.name()
+        if self.__display_name__ is None:
+            self.__display_name__ = networkDisplayName(self.network)
+        return self.__display_name__
 
     def isActive(self):
         self.connection.isAlive()
@@ -145,8 +178,7 @@ class Network(EventManager):
         return self.network.autostart()
 
     def getUUID(self):
-        self.connection.isAlive()
-        return self.network.UUIDString()
+        return self.uuid
 
     def getDHCPLeases(self, ready_cb: callable) -> list:
         self.connection.isAlive()
@@ -158,7 +190,7 @@ class Network(EventManager):
             except:
                 return None
 
-        asyncJob(listLeases, [], ready_cb)
+        asyncJob(listLeases, [], ready_cb, queue=self.connection.url)
 
     ############################################
     # Small setters
@@ -39,46 +39,78 @@ def getPoolFromName(conn: Connection, name: str):
 
 
 class Pool(EventManager):
-    def __init__(self, connection: Connection, pool: libvirt.virStoragePool):
+    def __init__(
+        self,
+        connection: Connection,
+        pool: libvirt.virStoragePool,
+        subscribe: bool = True,
+    ):
+        """Create pool wrapper.
+
+        Args:
+            connection (Connection): Connection wrapper
+            pool (libvirt.virStoragePool): Pool
+            subscribe (bool, optional): Receive the pool's events. Wrappers
+                that are only used briefly, i.e. for a copy target, don't
+                subscribe, so they don't stay registered until the connection
+                closes. Defaults to True.
+        """
         super().__init__()
         self.event_callbacks = []
 
         self.connection = connection
         self.pool = pool
+        self.uuid = pool.UUIDString()
 
         self.connection.isAlive()
-        self.pool_capabilities = self.connection.getPoolCapabilities()
 
-        self.connection.registerCallback(self.onConnectionEvent)
+        # Only receive events of this pool and its volumes
+        if subscribe:
+            self.connection.registerKeyedCallback(
+                OBJECT_TYPE_POOL, self.uuid, self.onConnectionEvent
+            )
 
     ############################################
     # Callbacks
     ############################################
 
     def onConnectionEvent(self, conn, obj, type_id, event_id, detail_id):
-        # Filter unwanted stuff
-        if (
-            type_id in [CALLBACK_TYPE_POOL_LIFECYCLE, CALLBACK_TYPE_POOL_GENERIC]
-            and event_id not in [POOL_EVENT_VOLUME_ADDED, POOL_EVENT_VOLUME_DELETED]
-            and obj.UUIDString() != self.pool.UUIDString()
-        ):
-            return
-        if type_id not in [
-            CALLBACK_TYPE_CONNECTION_GENERIC,
-            CALLBACK_TYPE_POOL_LIFECYCLE,
-            CALLBACK_TYPE_POOL_GENERIC,
-        ]:
-            return
-
+        # Events are keyed, only events of this pool, its volumes and
+        # connection events arrive here.
         if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
             # What happens if we disconnect or the connection gets deleted?
             # Only unsubscribe for connection event multiplexer, other objects
             # unsubscribe by themselves
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
-                self.connection.unregisterCallback(self.onConnectionEvent)
+                self.connection.unregisterKeyedCallback(
+                    OBJECT_TYPE_POOL, self.uuid, self.onConnectionEvent
+                )
+            elif event_id == CONNECTION_EVENT_RECONNECTED:
+                self.rebind()
 
         self.sendEvent(conn, obj, type_id, event_id, detail_id)
 
+    def rebind(self) -> None:
+        """Swap in the pool's handle of a reconnected connection. If the
+        pool disappeared in the meantime, announce its deletion instead."""
+        uuid = self.uuid
+        handle = self.connection.getReboundHandle(OBJECT_TYPE_POOL, uuid)
+        if handle is not None:
+            self.pool = handle
+            return
+
+        if self.connection.takeVanished(OBJECT_TYPE_POOL, uuid):
+            self.connection.sendEvent(
+                self.connection,
+                self.pool,
+                CALLBACK_TYPE_POOL_GENERIC,
+                POOL_EVENT_DELETED,
+                0,
+            )
+        self.connection.unregisterKeyedCallback(
+            OBJECT_TYPE_POOL, uuid, self.onConnectionEvent
+        )
+
     ############################################
     # Actions
     ############################################
@@ -136,7 +168,7 @@ class Pool(EventManager):
             vir_volumes = self.pool.listAllVolumes(0)
             return vir_volumes
 
-        asyncJob(getVolumes, [], ready_cb)
+        asyncJob(getVolumes, [], ready_cb, queue=self.connection.url)
 
     def addVolume(self, xml_tree: ET.Element) -> libvirt.virStorageVol:
         """Create a new volume
@@ -165,6 +197,7 @@ class Pool(EventManager):
             CALLBACK_TYPE_POOL_GENERIC,
             POOL_EVENT_VOLUME_ADDED,
             0,
+            uuid=self.uuid,
         )
 
         return vir_volume
@@ -185,6 +218,7 @@ class Pool(EventManager):
             CALLBACK_TYPE_POOL_GENERIC,
             POOL_EVENT_VOLUME_DELETED,
             0,
+            uuid=self.uuid,
         )
 
     ############################################
@@ -202,8 +236,7 @@ class Pool(EventManager):
         return self.pool.name()
 
     def getUUID(self) -> str:
-        self.connection.isAlive()
-        return self.pool.UUIDString()
+        return self.uuid
 
     def getCapacity(self) -> int:
         self.connection.isAlive()
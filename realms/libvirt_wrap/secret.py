@@ -29,36 +29,55 @@ class Secret(EventManager):
         super().__init__()
         self.connection = connection
         self.connection.isAlive()
-        self.connection.registerCallback(self.onConnectionEvent)
         self.secret = secret
+        self.uuid = secret.UUIDString()
+
+        # Only receive events of this secret
+        self.connection.registerKeyedCallback(
+            OBJECT_TYPE_SECRET, self.uuid, self.onConnectionEvent
+        )
 
     ############################################
     # Callbacks
     ############################################
 
     def onConnectionEvent(self, conn, obj, type_id, event_id, detail_id):
-        # Filter unwanted stuff
-        if (
-            type_id in [CALLBACK_TYPE_SECRET_LIFECYCLE, CALLBACK_TYPE_SECRET_GENERIC]
-            and obj.UUIDString() != self.secret.UUIDString()
-        ):
-            return
-        elif type_id not in [
-            CALLBACK_TYPE_CONNECTION_GENERIC,
-            CALLBACK_TYPE_SECRET_LIFECYCLE,
-            CALLBACK_TYPE_SECRET_GENERIC,
-        ]:
-            return
-
+        # Events are keyed, only events of this secret and connection
+        # events arrive here.
         if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
             # What happens if we disconnect or the connection gets deleted?
             # Only unsubscribe for connection event multiplexer, other objects
             # unsubscribe by themselves
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
-                self.connection.unregisterCallback(self.onConnectionEvent)
+                self.connection.unregisterKeyedCallback(
+                    OBJECT_TYPE_SECRET, self.uuid, self.onConnectionEvent
+                )
+            elif event_id == CONNECTION_EVENT_RECONNECTED:
+                self.rebind()
 
         self.sendEvent(conn, obj, type_id, event_id, detail_id)
 
+    def rebind(self) -> None:
+        """Swap in the secret's handle of a reconnected connection. If the
+        secret disappeared in the meantime, announce its deletion instead."""
+        uuid = self.uuid
+        handle = self.connection.getReboundHandle(OBJECT_TYPE_SECRET, uuid)
+        if handle is not None:
+            self.secret = handle
+            return
+
+        if self.connection.takeVanished(OBJECT_TYPE_SECRET, uuid):
+            self.connection.sendEvent(
+                self.connection,
+                self.secret,
+                CALLBACK_TYPE_SECRET_GENERIC,
+                SECRET_EVENT_DELETED,
+                0,
+            )
+        self.connection.unregisterKeyedCallback(
+            OBJECT_TYPE_SECRET, uuid, self.onConnectionEvent
+        )
+
     ############################################
     # Actions
     ############################################
@@ -133,8 +152,7 @@ class Secret(EventManager):
         return "unknown"
 
     def getUUID(self) -> str:
-        self.connection.isAlive()
-        return self.secret.UUIDString()
+        return self.uuid
 
     def getXML(self) -> str:
         self.connection.isAlive()
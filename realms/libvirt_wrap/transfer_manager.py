@@ -0,0 +1,281 @@
+# Realms, a libadwaita libvirt client.
+# Copyright (C) 2025
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Queue of volume transfers. Transfers run in the background, a limited
+number at a time per host, independent of the widgets that started them."""
+import os
+import threading
+import time
+import traceback
+from collections import deque
+
+from gi.repository import GLib
+
+from realms.helpers import Settings
+
+from .volume import Volume
+from .volume_transfer import TransferCancelledException
+
+# Transfers running at the same time per host, unless configured
+# with the "transfers-per-host" setting
+TRANSFERS_PER_HOST = 2
+
+# Seconds over which the throughput is averaged
+THROUGHPUT_WINDOW = 3
+
+TRANSFER_KIND_DOWNLOAD, TRANSFER_KIND_UPLOAD, TRANSFER_KIND_COPY = range(3)
+
+(
+    TRANSFER_STATE_QUEUED,
+    TRANSFER_STATE_RUNNING,
+    TRANSFER_STATE_PAUSED,
+    TRANSFER_STATE_DONE,
+    TRANSFER_STATE_FAILED,
+    TRANSFER_STATE_CANCELLED,
+) = range(6)
+
+
+class Transfer:
+    """A download or upload between a volume and a local file, or a
+    copy between two volumes."""
+
+    def __init__(
+        self, kind: int, volume: Volume, filename: str = None, target: Volume = None
+    ):
+        """Create transfer, it is run by submitting it to the TransferManager.
+
+        Args:
+            kind (int): TRANSFER_KIND_*
+            volume (Volume): Volume to transfer
+            filename (str, optional): Local file, for downloads and uploads.
+                Defaults to None.
+            target (Volume, optional): Volume to copy into, for copies.
+                Defaults to None.
+        """
+        self.kind = kind
+        self.volume = volume
+        self.filename = filename
+        self.target = target
+        self.name = volume.getName()
+
+        # URLs of the hosts the transfer takes a slot on
+        self.hosts = {volume.pool.connection.url}
+        if target is not None:
+            self.hosts.add(target.pool.connection.url)
+
+        self.state = TRANSFER_STATE_QUEUED
+        self.position = 0  # Offset to resume an upload from
+        self.current = 0  # Offset the running transfer reached
+        self.total = 0
+        self.error = None
+        self.cancel_event = threading.Event()
+
+        self.__samples__ = deque()  # (time, transferred) of the last seconds
+
+    def isActive(self) -> bool:
+        """If the transfer is queued or running."""
+        return self.state in (TRANSFER_STATE_QUEUED, TRANSFER_STATE_RUNNING)
+
+    def getThroughput(self) -> float:
+        """Get the bytes per second over the last seconds."""
+        if self.state != TRANSFER_STATE_RUNNING or len(self.__samples__) < 2:
+            return 0
+        (start, first), (end, last) = self.__samples__[0], self.__samples__[-1]
+        if end <= start:
+            return 0
+        return (last - first) / (end - start)
+
+    def __run__(self):
+        """Run the transfer, blocks until done."""
+        if self.kind == TRANSFER_KIND_DOWNLOAD:
+            self.volume.download(self.filename, self.__onProgress__, self.cancel_event)
+        elif self.kind == TRANSFER_KIND_COPY:
+            self.volume.copyTo(self.target, self.__onProgress__, self.cancel_event)
+        else:
+            self.volume.upload(
+                self.filename, self.position, self.__onProgress__, self.cancel_event
+            )
+
+    def __onProgress__(self, position: int, total: int, transferred: int):
+        if self.state != TRANSFER_STATE_RUNNING:
+            return  # Reported after the transfer ended
+        self.current = position
+        self.total = total
+
+        now = time.monotonic()
+        self.__samples__.append((now, transferred))
+        while self.__samples__ and self.__samples__[0][0] < now - THROUGHPUT_WINDOW:
+            self.__samples__.popleft()
+
+        getTransferManager().__notify__(self)
+
+
+class TransferManager:
+    """Runs the transfers of all connections. Callbacks are called with the
+    transfer whenever it progressed or its state changed."""
+
+    def __init__(self):
+        self.transfers = []  # All transfers, in order of submission
+        self.callbacks = []
+
+    def registerCallback(self, cb: callable):
+        """Register a callback, called with the transfer that changed."""
+        self.callbacks.append(cb)
+
+    def unregisterCallback(self, cb: callable):
+        """Unregister a callback."""
+        self.callbacks.remove(cb)
+
+    def download(self, volume: Volume, filename: str) -> Transfer:
+        """Queue the download of a volume into a local file."""
+        transfer = Transfer(TRANSFER_KIND_DOWNLOAD, volume, filename)
+        self.submit(transfer)
+        return transfer
+
+    def upload(self, volume: Volume, filename: str) -> Transfer:
+        """Queue the upload of a local file into a volume."""
+        transfer = Transfer(TRANSFER_KIND_UPLOAD, volume, filename)
+        self.submit(transfer)
+        return transfer
+
+    def copy(self, volume: Volume, target: Volume) -> Transfer:
+        """Queue the copy of a volume into another volume, possibly on
+        another host."""
+        transfer = Transfer(TRANSFER_KIND_COPY, volume, target=target)
+        self.submit(transfer)
+        return transfer
+
+    def submit(self, transfer: Transfer):
+        """Queue a transfer, it starts as soon as its host has a free slot."""
+        self.transfers.append(transfer)
+        self.__notify__(transfer)
+        self.__startNext__()
+
+    def cancel(self, transfer: Transfer):
+        """Cancel a transfer. A running upload is paused and can be resumed."""
+        if transfer.state == TRANSFER_STATE_QUEUED:
+            transfer.state = TRANSFER_STATE_CANCELLED
+            self.__notify__(transfer)
+        elif transfer.state == TRANSFER_STATE_RUNNING:
+            transfer.cancel_event.set()
+
+    def resume(self, transfer: Transfer):
+        """Queue a paused or failed transfer again. Uploads continue where
+        they stopped, downloads and copies start over."""
+        if transfer.isActive():
+            return
+        transfer.state = TRANSFER_STATE_QUEUED
+        transfer.error = None
+        transfer.cancel_event = threading.Event()
+        self.__notify__(transfer)
+        self.__startNext__()
+
+    def remove(self, transfer: Transfer):
+        """Remove a transfer that is not active anymore from the list."""
+        if transfer.isActive() or transfer not in self.transfers:
+            return
+        self.transfers.remove(transfer)
+        self.__notify__(transfer)
+
+    def getThroughput(self) -> float:
+        """Get the summed bytes per second of all running transfers."""
+        return sum(t.getThroughput() for t in self.transfers)
+
+    def getMaxPerHost(self) -> int:
+        """Get how many transfers may run at the same time per host."""
+        limit = Settings.get("transfers-per-host")
+        if limit is None:
+            return TRANSFERS_PER_HOST
+        return max(1, int(limit))
+
+    def __startNext__(self):
+        """Start queued transfers while their hosts have free slots."""
+        limit = self.getMaxPerHost()
+        running = {}
+        for transfer in self.transfers:
+            if transfer.state == TRANSFER_STATE_RUNNING:
+                for host in transfer.hosts:
+                    running[host] = running.get(host, 0) + 1
+
+        for transfer in self.transfers:
+            if transfer.state != TRANSFER_STATE_QUEUED:
+                continue
+            if any(running.get(host, 0) >= limit for host in transfer.hosts):
+                continue
+            for host in transfer.hosts:
+                running[host] = running.get(host, 0) + 1
+            self.__start__(transfer)
+
+    def __start__(self, transfer: Transfer):
+        transfer.state = TRANSFER_STATE_RUNNING
+        transfer.current = transfer.position
+        self.__notify__(transfer)
+
+        def run():
+            error = None
+            try:
+                transfer.__run__()
+            except Exception as e:
+                if not isinstance(e, TransferCancelledException):
+                    traceback.print_exc()
+                error = e
+            GLib.idle_add(self.__onFinished__, transfer, error)
+
+        # Not a pooled job: a transfer can take hours, it would hold a
+        # worker of the connection's job queue all that time.
+        threading.Thread(target=run, daemon=True).start()
+
+    def __onFinished__(self, transfer: Transfer, error: Exception):
+        if error is None:
+            transfer.state = TRANSFER_STATE_DONE
+            transfer.current = transfer.total
+        elif isinstance(error, TransferCancelledException):
+            if transfer.kind == TRANSFER_KIND_UPLOAD:
+                transfer.state = TRANSFER_STATE_PAUSED
+                transfer.position = error.position
+            else:
+                transfer.state = TRANSFER_STATE_CANCELLED
+        else:
+            transfer.state = TRANSFER_STATE_FAILED
+            transfer.error = error
+
+        if error is not None and transfer.kind == TRANSFER_KIND_DOWNLOAD:
+            # Don't leave a partial file behind
+            try:
+                os.remove(transfer.filename)
+            except OSError:
+                pass
+
+        self.__notify__(transfer)
+        self.__startNext__()
+        return False
+
+    def __notify__(self, transfer: Transfer):
+        for cb in self.callbacks.copy():
+            try:
+                cb(transfer)
+            except Exception:
+                traceback.print_exc()
+
+
+__transfer_manager__ = None
+
+
+def getTransferManager() -> TransferManager:
+    """Get the transfer manager, it is created on first use."""
+    global __transfer_manager__
+    if __transfer_manager__ is None:
+        __transfer_manager__ = TransferManager()
+    return __transfer_manager__
@@ -13,12 +13,25 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+import threading
 import xml.etree.ElementTree as ET
 
 import libvirt
 
+from realms.helpers import asyncJob
+
 from .constants import *
 from .pool import Pool
+from .volume_transfer import (
+    ChunkSender,
+    ChunkWriter,
+    TransferCancelledException,
+    TransferProgress,
+    isSparseUnsupportedError,
+    recvSparse,
+    sendSparse,
+)
 
 
 def getVolumeFromName(pool: Pool, name: str):
@@ -35,15 +48,60 @@ def getVolumeFromName(pool: Pool, name: str):
     return Volume(pool, vir_vol)
 
 
+def loadVolumes(pool: Pool, ready_cb: callable, refresh: bool = False) -> None:
+    """List the volumes of a pool asynchronously, with name, type, capacity
+    and allocation of all volumes loaded in the same background pass.
+
+    Args:
+        pool (Pool): Pool wrapper
+        ready_cb (callable): Callback with list of Volume, sorted by name
+        refresh (bool, optional): Refresh the pool first. Defaults to False.
+    """
+    pool.connection.isAlive()
+
+    def getVolumes() -> list:
+        if refresh:
+            pool.pool.refresh()
+        volumes = []
+        for vir_volume in pool.pool.listAllVolumes(0):
+            try:
+                info = vir_volume.info()
+            except libvirt.libvirtError:
+                continue  # Deleted in the meantime
+            volumes.append(Volume(pool, vir_volume, vir_volume.name(), info))
+        volumes.sort(key=lambda v: v.getName())
+        return volumes
+
+    asyncJob(getVolumes, [], ready_cb, queue=pool.connection.url)
+
+
 class Volume:
     """Simple class to represent storage volumes. Since there are no events for volumes,
     this class is much more slim than other wrappers.
     """
 
-    def __init__(self, pool: Pool, volume: libvirt.virStorageVol):
+    def __init__(
+        self,
+        pool: Pool,
+        volume: libvirt.virStorageVol,
+        name: str = None,
+        info: list = None,
+    ):
+        """Create wrapper.
+
+        Args:
+            pool (Pool): Pool of the volume
+            volume (libvirt.virStorageVol): Wrapped volume
+            name (str, optional): Preloaded name. Defaults to None.
+            info (list, optional): Preloaded result of virStorageVol.info().
+                Defaults to None.
+        """
         self.pool = pool
         self.volume = volume
 
+        self.__cached_name__ = name
+        self.__cached_info__ = info
+
     ############################################
     # Actions
     ############################################
@@ -55,6 +113,7 @@ class Volume:
     def wipe(self):
         """Wipe this volume."""
         self.volume.wipe()
+        self.__updateInfo__()
 
     def clone(self, new_name: str):
         """Clone this volume.
@@ -74,6 +133,215 @@ class Volume:
 
         return Volume(self.pool, new_vol)
 
+    def download(
+        self,
+        filename: str,
+        progress_cb: callable = None,
+        cancel_event: threading.Event = None,
+    ) -> int:
+        """Download the contents of this volume into a local file. Holes of
+        sparse volumes stay holes in the file and are not transferred.
+        Blocks until done, so run it asynchronously.
+
+        Args:
+            filename (str): Path of the file to write
+            progress_cb (callable, optional): Called on the main loop with
+                (position, total, transferred). Defaults to None.
+            cancel_event (threading.Event, optional): Cancels the download
+                when set. Defaults to None.
+
+        Raises:
+            TransferCancelledException: If cancelled
+
+        Returns:
+            int: Bytes that were actually transferred
+        """
+        self.pool.connection.isAlive()
+        progress = TransferProgress(self.refreshInfo()[1], progress_cb)
+        stream = self.__startDownload__()
+
+        try:
+            with open(filename, "wb") as f:
+                writer = ChunkWriter(f)
+                writer.start()
+                try:
+                    recvSparse(stream, writer.put, progress, cancel_event)
+                finally:
+                    writer.finish()
+            stream.finish()
+        except BaseException:
+            try:
+                stream.abort()
+            except libvirt.libvirtError:
+                pass
+            raise
+
+        progress.report(True)
+        return progress.transferred
+
+    def upload(
+        self,
+        filename: str,
+        offset: int = 0,
+        progress_cb: callable = None,
+        cancel_event: threading.Event = None,
+    ) -> int:
+        """Upload a local file into this volume. Holes of sparse files are
+        sent as holes. Blocks until done, so run it asynchronously.
+
+        Args:
+            filename (str): Path of the file to read
+            offset (int, optional): Offset in both file and volume to start at,
+                to resume a cancelled upload. Defaults to 0.
+            progress_cb (callable, optional): Called on the main loop with
+                (position, total, transferred). Defaults to None.
+            cancel_event (threading.Event, optional): Cancels the upload
+                when set. Defaults to None.
+
+        Raises:
+            TransferCancelledException: If cancelled. Everything up to its
+                position was written, the upload can be resumed from there.
+            ValueError: If the file doesn't fit into the volume
+
+        Returns:
+            int: Bytes that were actually transferred
+        """
+        self.pool.connection.isAlive()
+        fd = os.open(filename, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            if size > self.refreshInfo()[1]:
+                raise ValueError("The file is larger than the volume")
+
+            progress = TransferProgress(size, progress_cb, offset)
+            stream, sparse = self.__startUpload__(offset, size - offset)
+            try:
+                sendSparse(stream, fd, offset, size, sparse, progress, cancel_event)
+                stream.finish()
+            except TransferCancelledException:
+                # Finish properly, so that all data sent so far gets written
+                stream.finish()
+                raise
+            except BaseException:
+                try:
+                    stream.abort()
+                except libvirt.libvirtError:
+                    pass
+                raise
+        finally:
+            os.close(fd)
+
+        self.__updateInfo__()  # Allocation changed
+        progress.report(True)
+        return progress.transferred
+
+    def copyTo(
+        self,
+        target: "Volume",
+        progress_cb: callable = None,
+        cancel_event: threading.Event = None,
+    ) -> int:
+        """Copy the contents of this volume into another volume, which may
+        be on another connection. The download stream is piped directly
+        into the upload stream through a bounded buffer, nothing is staged
+        on local disk. Holes are forwarded as holes. Blocks until done,
+        so run it asynchronously.
+
+        Args:
+            target (Volume): Volume to overwrite
+            progress_cb (callable, optional): Called on the main loop with
+                (position, total, transferred). Defaults to None.
+            cancel_event (threading.Event, optional): Cancels the copy
+                when set. Defaults to None.
+
+        Raises:
+            TransferCancelledException: If cancelled
+            ValueError: If the target is this volume, or this volume doesn't
+                fit into it
+
+        Returns:
+            int: Bytes that were actually transferred
+        """
+        self.pool.connection.isAlive()
+        target.pool.connection.isAlive()
+        if (
+            target.pool.connection == self.pool.connection
+            and target.volume.key() == self.volume.key()
+        ):
+            raise ValueError("A volume can't be copied into itself")
+        size = self.refreshInfo()[1]
+        if size > target.refreshInfo()[1]:
+            raise ValueError("The volume is larger than the target volume")
+
+        progress = TransferProgress(size, progress_cb)
+        streams = [self.__startDownload__()]
+        try:
+            upload_stream, sparse = target.__startUpload__(0, size)
+            streams.append(upload_stream)
+
+            sender = ChunkSender(upload_stream, sparse)
+            sender.start()
+            try:
+                recvSparse(streams[0], sender.put, progress, cancel_event)
+            except BaseException:
+                sender.abort()
+                raise
+            sender.finish()
+
+            for stream in streams:
+                stream.finish()
+        except BaseException:
+            for stream in streams:
+                try:
+                    stream.abort()
+                except libvirt.libvirtError:
+                    pass
+            raise
+
+        target.__updateInfo__()  # Allocation changed
+        progress.report(True)
+        return progress.transferred
+
+    def __startUpload__(self, offset: int, length: int) -> tuple:
+        """Start uploading into the volume, as sparse stream if the storage
+        backend supports it.
+
+        Returns:
+            tuple: (stream, whether it is sparse)
+        """
+        connection = self.pool.connection.__connection__
+        stream = connection.newStream(0)
+        try:
+            self.volume.upload(
+                stream, offset, length, libvirt.VIR_STORAGE_VOL_UPLOAD_SPARSE_STREAM
+            )
+            return stream, True
+        except libvirt.libvirtError as e:
+            if not isSparseUnsupportedError(e):
+                raise
+
+        stream = connection.newStream(0)
+        self.volume.upload(stream, offset, length, 0)
+        return stream, False
+
+    def __startDownload__(self) -> libvirt.virStream:
+        """Start downloading the whole volume, as sparse stream if the
+        storage backend supports it."""
+        connection = self.pool.connection.__connection__
+        stream = connection.newStream(0)
+        try:
+            self.volume.download(
+                stream, 0, 0, libvirt.VIR_STORAGE_VOL_DOWNLOAD_SPARSE_STREAM
+            )
+            return stream
+        except libvirt.libvirtError as e:
+            if not isSparseUnsupportedError(e):
+                raise
+
+        stream = connection.newStream(0)
+        self.volume.download(stream, 0, 0, 0)
+        return stream
+
     ############################################
     # Small getters
     ############################################
@@ -89,8 +357,10 @@ class Volume:
         return xml_tree
 
     def getName(self) -> str:
-        self.pool.connection.isAlive()
-        return self.volume.name()
+        if self.__cached_name__ is None:
+            self.pool.connection.isAlive()
+            self.__cached_name__ = self.volume.name()
+        return self.__cached_name__
 
     def getUUID(self) -> str:
         self.pool.connection.isAlive()
@@ -102,9 +372,7 @@ class Volume:
         Returns:
             str: Name of the type
         """
-        self.pool.connection.isAlive()
-        info = self.volume.info()
-        vol_type = info[0]
+        vol_type = self.getInfo()[0]
 
         types = ["file", "block", "dir", "network", "netdir", "ploop"]
 
@@ -116,9 +384,7 @@ class Volume:
         Returns:
             int: Capacity in bytes
         """
-        self.pool.connection.isAlive()
-        info = self.volume.info()
-        return info[1]
+        return self.getInfo()[1]
 
     def getAllocation(self) -> int:
         """Get volume allocation
@@ -126,9 +392,41 @@ class Volume:
         Returns:
             int: Allocated bytes
         """
+        return self.getInfo()[2]
+
+    def getInfo(self) -> list:
+        """Get type, capacity and allocation. They are cached after the
+        first load, use refreshInfo() to get the current values.
+
+        Returns:
+            list: Result of virStorageVol.info()
+        """
+        if self.__cached_info__ is None:
+            self.refreshInfo()
+        return self.__cached_info__
+
+    def hasInfo(self) -> bool:
+        """If type, capacity and allocation are loaded, so getInfo() won't
+        block."""
+        return self.__cached_info__ is not None
+
+    def __updateInfo__(self):
+        """Load the info again after this volume was changed, in the job that
+        changed it. If that fails, it is loaded on next use."""
+        try:
+            self.refreshInfo()
+        except libvirt.libvirtError:
+            self.__cached_info__ = None
+
+    def refreshInfo(self) -> list:
+        """Load type, capacity and allocation again.
+
+        Returns:
+            list: Result of virStorageVol.info()
+        """
         self.pool.connection.isAlive()
-        info = self.volume.info()
-        return info[2]
+        self.__cached_info__ = self.volume.info()
+        return self.__cached_info__
 
     def getXML(self) -> str:
         """Get XML description
@@ -150,3 +448,4 @@ class Volume:
             new_capacity (int): New capacity in bytes
         """
         self.volume.resize(new_capacity)
+        self.__updateInfo__()
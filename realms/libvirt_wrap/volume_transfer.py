@@ -0,0 +1,371 @@
+# Realms, a libadwaita libvirt client.
+# Copyright (C) 2025
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""Building blocks to move volume contents through libvirt streams. Holes
+of sparse volumes are forwarded as holes, so only the data is transferred."""
+import errno
+import os
+import queue
+import threading
+import time
+
+import libvirt
+from gi.repository import GLib
+
+# Bytes asked for per read. The size is doubled as long as the stream
+# fills it completely.
+TRANSFER_MIN_CHUNK = 256 * 1024
+TRANSFER_MAX_CHUNK = 8 * 1024 * 1024
+
+# Chunks buffered between the stream and the local file
+TRANSFER_QUEUE_SIZE = 32
+
+# Seconds between two progress reports
+PROGRESS_INTERVAL = 0.2
+
+
+class TransferCancelledException(Exception):
+    """The transfer was cancelled."""
+
+    def __init__(self, position: int = 0):
+        """Create exception.
+
+        Args:
+            position (int, optional): Offset up to which the volume was
+                completely transferred, to resume from. Defaults to 0.
+        """
+        super().__init__("Transfer was cancelled")
+        self.position = position
+
+
+class TransferProgress:
+    """Byte-accurate progress of a transfer. Reports are sent to the main
+    loop, at most every PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, total: int, progress_cb: callable = None, position: int = 0):
+        """Create progress.
+
+        Args:
+            total (int): Size of the volume in bytes
+            progress_cb (callable, optional): Called on the main loop with
+                (position, total, transferred), position includes holes,
+                transferred only counts data. Defaults to None.
+            position (int, optional): Offset the transfer starts at. Defaults to 0.
+        """
+        self.total = total
+        self.progress_cb = progress_cb
+        self.position = position
+        self.transferred = 0
+
+        self.__last_report__ = 0
+
+    def addData(self, length: int):
+        """Account for data that was transferred."""
+        self.position += length
+        self.transferred += length
+        self.report()
+
+    def addHole(self, length: int):
+        """Account for a hole that was skipped."""
+        self.position += length
+        self.report()
+
+    def report(self, force=False):
+        """Send the current progress to the callback.
+
+        Args:
+            force (bool, optional): Report even if the last report was
+                just now. Defaults to False.
+        """
+        if self.progress_cb is None:
+            return
+        now = time.monotonic()
+        if not force and now - self.__last_report__ < PROGRESS_INTERVAL:
+            return
+        self.__last_report__ = now
+        GLib.idle_add(self.progress_cb, self.position, self.total, self.transferred)
+
+
+class ChunkConsumer(threading.Thread):
+    """Consumes chunks in its own thread, so that the producing stream
+    is not held up by the consumer. Chunks are either bytes, or the
+    length of a hole as int. At most TRANSFER_QUEUE_SIZE chunks are
+    buffered, which bounds the memory a transfer takes."""
+
+    def __init__(self):
+        """Create consumer, start it with start()."""
+        super().__init__(daemon=True)
+        self.error = None
+
+        self.__queue__ = queue.Queue(TRANSFER_QUEUE_SIZE)
+        self.__aborted__ = False
+
+    def put(self, chunk):
+        """Queue a chunk, blocks while the queue is full.
+
+        Raises:
+            Exception: The error of the consumer, if consuming failed
+        """
+        if self.error is not None:
+            raise self.error
+        self.__queue__.put(chunk)
+
+    def finish(self):
+        """Consume the remaining chunks and stop the consumer.
+
+        Raises:
+            Exception: The error of the consumer, if consuming failed
+        """
+        self.__queue__.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
+
+    def abort(self):
+        """Drop the remaining chunks and stop the consumer."""
+        self.__aborted__ = True
+        self.__queue__.put(None)
+        self.join()
+
+    def consume(self, chunk):
+        """Handle one chunk, implemented by subclasses."""
+        raise NotImplementedError
+
+    def close(self):
+        """Called after the last chunk was consumed successfully."""
+
+    def run(self):
+        while True:
+            chunk = self.__queue__.get()
+            if chunk is None:
+                break
+            if self.error is not None or self.__aborted__:
+                continue  # Drain the queue, so that put() doesn't block
+            try:
+                self.consume(chunk)
+            except Exception as e:
+                self.error = e
+
+        if self.error is None and not self.__aborted__:
+            try:
+                self.close()
+            except Exception as e:
+                self.error = e
+
+
+class ChunkWriter(ChunkConsumer):
+    """Writes chunks to a file, holes are skipped by seeking."""
+
+    def __init__(self, f):
+        """Create writer, start it with start().
+
+        Args:
+            f: File opened for binary writing
+        """
+        super().__init__()
+        self.f = f
+
+    def consume(self, chunk):
+        if isinstance(chunk, int):
+            self.f.seek(chunk, 1)
+        else:
+            self.f.write(chunk)
+
+    def close(self):
+        # A hole at the end only moved the position
+        self.f.truncate()
+
+
+def recvSparse(
+    stream: libvirt.virStream,
+    sink: callable,
+    progress: TransferProgress,
+    cancel_event: threading.Event = None,
+):
+    """Read a stream until its end, stopping at holes. This is what
+    virStream.sparseRecvAll does, but with growing chunk sizes.
+
+    Args:
+        stream (libvirt.virStream): Blocking stream
+        sink (callable): Called with bytes for data, and with an int for
+            the length of a hole
+        progress (TransferProgress): Progress to account the chunks for
+        cancel_event (threading.Event, optional): Stops the transfer when
+            set. Defaults to None.
+
+    Raises:
+        TransferCancelledException: If cancelled
+    """
+    want = TRANSFER_MIN_CHUNK
+    while True:
+        if cancel_event is not None and cancel_event.is_set():
+            raise TransferCancelledException()
+
+        got = stream.recvFlags(want, libvirt.VIR_STREAM_RECV_STOP_AT_HOLE)
+        if got == -3:
+            length = stream.recvHole()
+            sink(length)
+            progress.addHole(length)
+            continue
+        if isinstance(got, int):
+            raise libvirt.libvirtError("Receiving from stream failed")
+        if len(got) == 0:
+            break
+
+        sink(got)
+        progress.addData(len(got))
+        if len(got) == want and want < TRANSFER_MAX_CHUNK:
+            want *= 2
+
+
+def __fileSections__(fd: int, start: int, end: int):
+    """Split a local file into data and holes with SEEK_DATA and SEEK_HOLE.
+    File systems without hole detection yield a single data section.
+
+    Yields:
+        tuple: (is_data, offset, length)
+    """
+    pos = start
+    while pos < end:
+        try:
+            data = min(os.lseek(fd, pos, os.SEEK_DATA), end)
+        except OSError as e:
+            if e.errno != errno.ENXIO:
+                yield (True, pos, end - pos)
+                return
+            data = end  # Only a hole is left
+
+        if data > pos:
+            yield (False, pos, data - pos)
+            pos = data
+            continue
+
+        try:
+            hole = min(os.lseek(fd, pos, os.SEEK_HOLE), end)
+        except OSError:
+            hole = end
+        yield (True, pos, hole - pos)
+        pos = hole
+
+
+def __sendAll__(stream: libvirt.virStream, data: bytes):
+    """Send a buffer completely, a blocking stream may take only a part."""
+    while data:
+        sent = stream.send(data)
+        data = data[sent:]
+
+
+class ChunkSender(ChunkConsumer):
+    """Sends chunks into a stream, so that one stream can be piped into
+    another at the speed of the slower one."""
+
+    def __init__(self, stream: libvirt.virStream, sparse: bool):
+        """Create sender, start it with start().
+
+        Args:
+            stream (libvirt.virStream): Blocking stream
+            sparse (bool): If holes can be sent as holes, otherwise they
+                are sent as zeros
+        """
+        super().__init__()
+        self.stream = stream
+        self.sparse = sparse
+
+        self.__zeros__ = None
+
+    def consume(self, chunk):
+        if not isinstance(chunk, int):
+            __sendAll__(self.stream, chunk)
+        elif self.sparse:
+            self.stream.sendHole(chunk, 0)
+        else:
+            if self.__zeros__ is None:
+                self.__zeros__ = bytes(TRANSFER_MAX_CHUNK)
+            while chunk > 0:
+                want = min(TRANSFER_MAX_CHUNK, chunk)
+                __sendAll__(self.stream, self.__zeros__[:want])
+                chunk -= want
+
+
+def sendSparse(
+    stream: libvirt.virStream,
+    fd: int,
+    start: int,
+    end: int,
+    sparse: bool,
+    progress: TransferProgress,
+    cancel_event: threading.Event = None,
+):
+    """Send the contents of a local file between start and end. This is
+    what virStream.sparseSendAll does, but the file is read with pread in
+    large chunks and holes are found with SEEK_DATA and SEEK_HOLE.
+
+    Args:
+        stream (libvirt.virStream): Blocking stream
+        fd (int): File descriptor of the local file
+        start (int): Offset to start at
+        end (int): Offset to stop at
+        sparse (bool): If holes can be sent as holes, otherwise they
+            are sent as zeros
+        progress (TransferProgress): Progress to account the chunks for
+        cancel_event (threading.Event, optional): Stops the transfer when
+            set. Defaults to None.
+
+    Raises:
+        TransferCancelledException: If cancelled, with the position up to
+            which everything was sent
+    """
+    zeros = None
+    for is_data, offset, length in __fileSections__(fd, start, end):
+        if not is_data and sparse:
+            stream.sendHole(length, 0)
+            progress.addHole(length)
+            continue
+
+        pos = offset
+        stop = offset + length
+        while pos < stop:
+            if cancel_event is not None and cancel_event.is_set():
+                raise TransferCancelledException(progress.position)
+
+            want = min(TRANSFER_MAX_CHUNK, stop - pos)
+            if is_data:
+                data = os.pread(fd, want, pos)
+                if not data:
+                    raise EOFError("File was truncated during upload")
+            else:
+                if zeros is None:
+                    zeros = bytes(TRANSFER_MAX_CHUNK)
+                data = zeros[:want]
+
+            __sendAll__(stream, data)
+            pos += len(data)
+            progress.addData(len(data))
+
+
+def isSparseUnsupportedError(e: libvirt.libvirtError) -> bool:
+    """If a transfer failed because the storage backend can't do sparse streams.
+
+    Args:
+        e (libvirt.libvirtError): Error of virStorageVol.download or upload
+
+    Returns:
+        bool: True if it should be retried without sparse streams
+    """
+    return e.get_error_code() in (
+        libvirt.VIR_ERR_NO_SUPPORT,
+        libvirt.VIR_ERR_INVALID_ARG,
+        libvirt.VIR_ERR_OPERATION_UNSUPPORTED,
+    )
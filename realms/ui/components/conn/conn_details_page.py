@@ -17,6 +17,7 @@ from gi.repository import Adw, Gtk
 
 from realms.helpers import bytesToString
 from realms.libvirt_wrap.constants import *
+from realms.libvirt_wrap.domain_capabilities import DomainCapabilities
 from realms.ui.components import ActionOption, ApplyRow, propertyRow, selectDialog
 from realms.ui.components.common import deleteRow
 from realms.ui.components.preference_widgets import RealmsPreferencesPage
@@ -213,14 +214,7 @@ class ConnectionDetailsPage(Gtk.Box):
         except:
             pass
 
-        try:
-            domain_caps = self.parent.connection.getDomainCapabilities()
-            self.emulator_path_row.set_subtitle(domain_caps.emulator_path)
-            self.domain_type_row.set_subtitle(domain_caps.domain)
-            self.machine_row.set_subtitle(domain_caps.machine)
-            self.arch_row.set_subtitle(domain_caps.arch)
-        except:
-            pass
+        self.parent.connection.requestDomainCapabilities(self.__onDomainCapabilities__)
 
         self.libvirt_ver_row.set_subtitle(
             str(self.parent.connection.getLibvirtVersion())
@@ -229,6 +223,13 @@ class ConnectionDetailsPage(Gtk.Box):
             str(self.parent.connection.getHypervisorVersion())
         )
 
+    def __onDomainCapabilities__(self, domain_caps: DomainCapabilities):
+        """Show the hypervisor's default domain capabilities."""
+        self.emulator_path_row.set_subtitle(domain_caps.emulator_path)
+        self.domain_type_row.set_subtitle(domain_caps.domain)
+        self.machine_row.set_subtitle(domain_caps.machine)
+        self.arch_row.set_subtitle(domain_caps.arch)
+
     def onApplyClicked(self, _):
         """Apply was clicked."""
         new_settings = {
@@ -13,9 +13,11 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
-from gi.repository import Adw, Gtk
+import time
 
-from realms.helpers import bytesToString
+from gi.repository import Adw, GLib, Gtk
+
+from realms.helpers import bytesToString, getMetricsStore
 from realms.ui.components.generic_preferences_row import GenericPreferencesRow
 from realms.ui.components.graphs import DataPoint, DataSeries, Graph, RelativeDataPoint
 from realms.ui.components.preference_widgets import RealmsPreferencesPage
@@ -92,15 +94,16 @@ class ConnectionPerformancePage(Gtk.Box):
             cpu_time_reading = self.parent.connection.getHostCPUTime()
             display_val = 0
             if len(self.__cpu_data_series__) > 1:
-                display_val = abs(ds.values[-2].last_reading - cpu_time_reading)
+                display_val = abs(ds.getReading(-2) - cpu_time_reading)
                 display_val /= 2
             else:
-                display_val = abs(ds.getLast().last_reading - cpu_time_reading)
+                display_val = abs(ds.getReading(-1) - cpu_time_reading)
             display_val /= 1000000000 * self.REFRESH_SECONDS
+            self.__storeMetric__("cpu", display_val)
             return RelativeDataPoint(display_val, cpu_time_reading)
 
         self.__cpu_data_series__.setWatchCallback(
-            1000 * self.REFRESH_SECONDS, getCPUData
+            1000 * self.REFRESH_SECONDS, getCPUData, self.parent.connection.url
         )
 
         self.__iowait_data_series__.setValues(
@@ -111,24 +114,38 @@ class ConnectionPerformancePage(Gtk.Box):
             iowait_time_reading = self.parent.connection.getHostIOWait()
             display_val = 0
             if len(self.__iowait_data_series__) > 1:
-                display_val = abs(ds.values[-2].last_reading - iowait_time_reading)
+                display_val = abs(ds.getReading(-2) - iowait_time_reading)
                 display_val /= 2
             else:
-                display_val = abs(ds.getLast().last_reading - iowait_time_reading)
+                display_val = abs(ds.getReading(-1) - iowait_time_reading)
             display_val /= 1000000000 * self.REFRESH_SECONDS
+            self.__storeMetric__("iowait", display_val)
             return RelativeDataPoint(display_val, iowait_time_reading)
 
         self.__iowait_data_series__.setWatchCallback(
-            1000 * self.REFRESH_SECONDS, getIOwaitData
+            1000 * self.REFRESH_SECONDS, getIOwaitData, self.parent.connection.url
         )
         self.__mem_data_series__.setValues([DataPoint(0)])
         self.__mem_data_series__.max_value = self.parent.connection.maxMemory()
 
         def getMemData(*_):
-            return DataPoint(self.parent.connection.getHostMemoryUsage() * 1024)
+            memory = self.parent.connection.getHostMemoryUsage() * 1024
+            self.__storeMetric__("memory", memory)
+            return DataPoint(memory)
 
         self.__mem_data_series__.setWatchCallback(
-            1000 * self.REFRESH_SECONDS, getMemData
+            1000 * self.REFRESH_SECONDS, getMemData, self.parent.connection.url
+        )
+
+    def __storeMetric__(self, metric: str, value: float):
+        """Write a host metric to the metrics store. Called by the watch
+        callbacks in a worker, the store is only pushed to on the main loop."""
+        GLib.idle_add(
+            getMetricsStore().push,
+            self.parent.connection.url,
+            "host",
+            {metric: value},
+            time.time(),
         )
 
     def end(self):
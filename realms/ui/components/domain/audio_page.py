@@ -213,13 +213,13 @@ class AudioPage(BaseDevicePage):
         self.updateData()
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Audio Backend"
 
     def getDescription(self) -> str:
         return "Host side audio backend"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "speaker-symbolic"
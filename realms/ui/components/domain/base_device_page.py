@@ -112,9 +112,23 @@ class BaseDevicePage:
         elif self.can_update and self.update_row is not None:
             self.update_row.set_visible(self.__changed__)
 
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        """Get a human-readable title of a device from its xml, without
+        creating a page."""
+        raise NotImplementedError
+
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
+        """Get the name of a fitting icon of a device from its xml, without
+        creating a page."""
+        raise NotImplementedError
+
     def getTitle(self) -> str:
         """Get a human-readable title of the device."""
-        raise NotImplementedError
+        if self.use_for_adding:
+            return ""
+        return self.titleFromXML(self.xml_tree)
 
     def getDescription(self) -> str:
         """Get a human-readable description of the device."""
@@ -122,7 +136,7 @@ class BaseDevicePage:
 
     def getIconName(self) -> str:
         """Get the name of a fitting icon of the device."""
-        raise NotImplementedError
+        return self.iconNameFromXML(self.xml_tree)
 
     def deleteDevice(self, *_):
         """The delete button was clicked."""
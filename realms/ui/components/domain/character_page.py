@@ -387,15 +387,15 @@ class CharacterPage(BaseDevicePage):
                 self.xml_tree.find("target").append(self.target_model_row.elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.tag.capitalize()
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.tag.capitalize()
 
     def getDescription(self) -> str:
         return "Generic character device"
 
-    def getIconName(self) -> str:
-        if self.xml_tree.tag == "console":
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
+        if xml_tree.tag == "console":
             return "terminal-symbolic"
         return "horizontal-arrows-symbolic"
@@ -138,15 +138,15 @@ class ClockPage(BaseDevicePage):
             self.timer_group.add(row)
             self.timer_rows.append(row)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Clock"
 
     def getDescription(self) -> str:
         return "Hardware clock"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "clock-alt-symbolic"
 
     def __onAddTimerClicked__(self, btn):
@@ -157,13 +157,13 @@ class ControllerPage(BaseDevicePage):
         self.updateData()
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.get("type", "").upper() + " Controller"
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.get("type", "").upper() + " Controller"
 
     def getDescription(self) -> str:
         return "Bus Controller"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "pci-card-symbolic"
@@ -80,13 +80,13 @@ class CryptoPage(BaseDevicePage):
             self.xml_tree.append(self.backend_model_row.elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.tag.capitalize()
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.tag.capitalize()
 
     def getDescription(self) -> str:
         return "Crypto device"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "computer-chip-symbolic"
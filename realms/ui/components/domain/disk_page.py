@@ -17,6 +17,7 @@ import xml.etree.ElementTree as ET
 
 from gi.repository import Adw, Gtk
 
+from realms.libvirt_wrap.domain_capabilities import DomainCapabilities
 from realms.ui.components.bindable_entries import (
     BindableComboRow,
     BindableDropDown,
@@ -124,11 +125,8 @@ class DiskPage(BaseDevicePage):
         )
         self.prefs_page.add(self.group)
 
-        self.domain_caps = self.parent.domain.connection.getDomainCapabilities()
-
-        self.device_type_row = BindableComboRow(
-            self.domain_caps.devices["disk"]["diskDevice"], title="Disk hardware type"
-        )
+        # The choices are filled in once the capabilities arrived
+        self.device_type_row = BindableComboRow([], title="Disk hardware type")
         self.group.add(self.device_type_row)
 
         self.source_row = SourceRow(self.xml_tree, self.showApply)
@@ -141,9 +139,7 @@ class DiskPage(BaseDevicePage):
         )
         self.group.add(self.driver_row)
 
-        self.target_bus_name_row = BindableComboRow(
-            self.domain_caps.devices["disk"]["bus"], "", title="Target bus"
-        )
+        self.target_bus_name_row = BindableComboRow([], "", title="Target bus")
         self.group.add(self.target_bus_name_row)
 
         self.target_device_row = BindableEntryRow(title="Target device name")
@@ -169,6 +165,15 @@ class DiskPage(BaseDevicePage):
             self.group.add(deleteRow(self.deleteDevice))
 
         self.updateData()
+        self.parent.domain.requestDomainCapabilities(self.__onDomainCapabilities__)
+
+    def __onDomainCapabilities__(self, domain_caps: DomainCapabilities):
+        """Offer the choices the domain's emulator supports."""
+        self.device_type_row.unbind()
+        self.device_type_row.setSelection(domain_caps.devices["disk"]["diskDevice"])
+        self.target_bus_name_row.unbind()
+        self.target_bus_name_row.setSelection(domain_caps.devices["disk"]["bus"])
+        self.updateData()
 
     def updateData(self):
         self.group.set_title(self.getTitle())
@@ -223,10 +228,9 @@ class DiskPage(BaseDevicePage):
                 driver.set("name", "aio")
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        t = self.xml_tree.get("device", "")
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        t = xml_tree.get("device", "")
         if t == "disk":
             return "Harddisk"
         if t == "cdrom":
@@ -238,8 +242,9 @@ class DiskPage(BaseDevicePage):
     def getDescription(self) -> str:
         return "Disk device"
 
-    def getIconName(self) -> str:
-        t = self.xml_tree.get("device")
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
+        t = xml_tree.get("device")
         if t == "disk":
             return "harddisk-symbolic"
         if t == "cdrom":
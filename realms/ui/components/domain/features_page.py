@@ -147,13 +147,13 @@ class FeaturesPage(BaseDevicePage):
         for row in self.basic_rows:
             row.bind(features, self.showApply)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Hypervisor features"
 
     def getDescription(self) -> str:
         return "Optional hypervisor features"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "wrench-wide-symbolic"
@@ -131,13 +131,13 @@ class FilesystemPage(BaseDevicePage):
         self.updateSource()
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return f"{ self.xml_tree.get('type', '').capitalize() } Filesystem"
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return f"{ xml_tree.get('type', '').capitalize() } Filesystem"
 
     def getDescription(self) -> str:
         return "Filesystem exported into the domain"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "file-manager-symbolic"
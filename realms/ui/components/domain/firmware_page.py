@@ -29,16 +29,9 @@ from .base_device_page import BaseDevicePage
 
 
 class LoaderRow(GenericPreferencesRow):
-    def __init__(
-        self,
-        xml_tree,
-        domain_caps: DomainCapabilities,
-        show_apply_cb: callable,
-        **kwargs
-    ):
+    def __init__(self, xml_tree, show_apply_cb: callable, **kwargs):
         super().__init__(**kwargs)
         self.xml_tree = xml_tree
-        self.domain_caps = domain_caps
         self.show_apply_cb = show_apply_cb
 
         box = Gtk.Box(spacing=6)
@@ -64,34 +57,48 @@ class LoaderRow(GenericPreferencesRow):
         inner_box = Gtk.Box(spacing=6, hexpand=True)
         box.append(inner_box)
         inner_box.append(Gtk.Label(label="Readonly", halign=Gtk.Align.START))
-        self.readonly = BindableDropDown(
-            self.domain_caps.os["loader"]["readonly"], "", hexpand=True
-        )
+        self.readonly = BindableDropDown([], "", hexpand=True)
         inner_box.append(self.readonly)
 
         inner_box = Gtk.Box(spacing=6, hexpand=True)
         box.append(inner_box)
         inner_box.append(Gtk.Label(label="Secure", halign=Gtk.Align.START))
-        self.secure = BindableDropDown(
-            self.domain_caps.os["loader"]["secure"], "", hexpand=True
-        )
+        self.secure = BindableDropDown([], "", hexpand=True)
         inner_box.append(self.secure)
 
         inner_box = Gtk.Box(spacing=6, hexpand=True)
         box.append(inner_box)
         inner_box.append(Gtk.Label(label="Type", halign=Gtk.Align.START))
-        self.type = BindableDropDown(
-            self.domain_caps.os["loader"]["type"], "", hexpand=True
-        )
+        self.type = BindableDropDown([], "", hexpand=True)
         inner_box.append(self.type)
 
-        self.loader_source = BindableDropDown(
-            self.domain_caps.os["loader"]["values"], "", hexpand=True
-        )
+        self.loader_source = BindableDropDown([], "", hexpand=True)
         self.content_box.append(self.loader_source)
 
         self.updateData()
 
+    def setDomainCapabilities(self, domain_caps: DomainCapabilities):
+        """Offer the loaders the domain's emulator supports.
+
+        Args:
+            domain_caps (DomainCapabilities): Capabilities of the domain
+        """
+        loader_caps = domain_caps.os["loader"]
+        if loader_caps is None:
+            # The hypervisor does not support choosing a loader
+            self.set_visible(False)
+            return
+
+        for dropdown, name in [
+            (self.readonly, "readonly"),
+            (self.secure, "secure"),
+            (self.type, "type"),
+            (self.loader_source, "values"),
+        ]:
+            dropdown.unbind()
+            dropdown.setSelection(loader_caps.get(name, []))
+        self.updateData()
+
     def updateData(self):
         loader = self.xml_tree.find("os").find("loader")
         if loader is not None:
@@ -129,19 +136,12 @@ class FirmwarePage(BaseDevicePage):
         prefs_group = Adw.PreferencesGroup(title="Firmware")
         self.prefs_page.add(prefs_group)
 
-        domain_caps = self.parent.domain.connection.getDomainCapabilities()
-
-        self.firmware_row = BindableComboRow(
-            domain_caps.os["firmware"], "", title="Firmware template"
-        )
+        # The choices are filled in once the capabilities arrived
+        self.firmware_row = BindableComboRow([], "", title="Firmware template")
         os = self.xml_tree.find("os")
         prefs_group.add(self.firmware_row)
 
-        self.loader_row = LoaderRow(
-            self.xml_tree,
-            domain_caps,
-            self.showApply,
-        )
+        self.loader_row = LoaderRow(self.xml_tree, self.showApply)
         prefs_group.add(self.loader_row)
 
         if len(os.findall("boot")) != 0:
@@ -174,6 +174,14 @@ class FirmwarePage(BaseDevicePage):
         self.features_group.add(self.enrolled_keys_row.switch_row)
 
         self.updateData()
+        self.parent.domain.requestDomainCapabilities(self.__onDomainCapabilities__)
+
+    def __onDomainCapabilities__(self, domain_caps: DomainCapabilities):
+        """Offer the choices the domain's emulator supports."""
+        self.firmware_row.unbind()
+        self.firmware_row.setSelection(domain_caps.os["firmware"])
+        self.loader_row.setDomainCapabilities(domain_caps)
+        self.updateData()
 
     def updateData(self):
         os = self.xml_tree.find("os")
@@ -218,13 +226,13 @@ class FirmwarePage(BaseDevicePage):
         self.updateData()
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Firmware"
 
     def getDescription(self) -> str:
         return "Firmware settings"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "application-x-firmware-symbolic"
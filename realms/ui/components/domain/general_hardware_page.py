@@ -18,6 +18,7 @@ import xml.etree.ElementTree as ET
 from gi.repository import Adw, Gtk
 
 from realms.helpers import asyncJob, bytesToString, stringToBytes
+from realms.libvirt_wrap.domain_capabilities import DomainCapabilities
 from realms.ui.components.bindable_entries import (
     BindableComboRow,
     BindableEntryRow,
@@ -50,16 +51,11 @@ class GeneralHardwarePage(BaseDevicePage):
         self.vcpus_row.spin_row.set_sensitive(False)
         prefs_group.add(self.vcpus_row.spin_row)
 
-        self.domain_caps = self.parent.domain.connection.getDomainCapabilities()
-
-        self.config_row = BindableComboRow(
-            self.domain_caps.cpu_modes, "", title="CPU Configuration"
-        )
+        # The choices are filled in once the capabilities arrived
+        self.config_row = BindableComboRow([], "", title="CPU Configuration")
         prefs_group.add(self.config_row)
 
-        self.cpu_model_row = BindableComboRow(
-            self.domain_caps.custom_cpu_models, title="CPU Model"
-        )
+        self.cpu_model_row = BindableComboRow([], title="CPU Model")
         prefs_group.add(self.cpu_model_row)
 
         self.match_row = BindableComboRow(
@@ -106,6 +102,15 @@ class GeneralHardwarePage(BaseDevicePage):
         prefs_group.add(self.memory_row)
 
         self.updateData()
+        self.parent.domain.requestDomainCapabilities(self.__onDomainCapabilities__)
+
+    def __onDomainCapabilities__(self, domain_caps: DomainCapabilities):
+        """Offer the choices the domain's emulator supports."""
+        self.config_row.unbind()
+        self.config_row.setSelection(domain_caps.cpu_modes)
+        self.cpu_model_row.unbind()
+        self.cpu_model_row.setSelection(domain_caps.custom_cpu_models)
+        self.updateData()
 
     def updateData(self):
         # Bind vcpus
@@ -114,7 +119,12 @@ class GeneralHardwarePage(BaseDevicePage):
             self.vcpus_row.bindText(self.xml_tree.find("vcpu"), self.showApply)
             self.vcpus_row.spin_row.set_sensitive(True)
 
-        asyncJob(self.parent.domain.connection.maxVCPUs, [], setVCPUsRange)
+        asyncJob(
+            self.parent.domain.connection.maxVCPUs,
+            [],
+            setVCPUsRange,
+            queue=self.parent.domain.connection.url,
+        )
 
         mem = self.xml_tree.find("memory")
         self.memory_row.bindText(
@@ -188,7 +198,12 @@ class GeneralHardwarePage(BaseDevicePage):
             self.sockets_row.getWidget().set_sensitive(False)
             self.cores_row.getWidget().set_sensitive(False)
             self.threads_row.getWidget().set_sensitive(False)
-            asyncJob(self.parent.domain.connection.maxVCPUs, [], setVCPUsRange)
+            asyncJob(
+                self.parent.domain.connection.maxVCPUs,
+                [],
+                setVCPUsRange,
+                queue=self.parent.domain.connection.url,
+            )
 
             self.topology_row.set_enable_expansion(True)
 
@@ -206,13 +221,13 @@ class GeneralHardwarePage(BaseDevicePage):
         self.updateTopology()
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Hardware"
 
     def getDescription(self) -> str:
         return "Common hardware settings"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "processor-symbolic"
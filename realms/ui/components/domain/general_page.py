@@ -186,12 +186,12 @@ class GeneralPage(BaseDevicePage):
 
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "General"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "org.gnome.Settings-symbolic"
 
     def getDescription(self) -> str:
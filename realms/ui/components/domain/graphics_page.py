@@ -17,6 +17,7 @@ import xml.etree.ElementTree as ET
 
 from gi.repository import Adw, Gtk
 
+from realms.libvirt_wrap.domain_capabilities import DomainCapabilities
 from realms.ui.components import propertyRow
 from realms.ui.components.bindable_entries import (
     BindableComboRow,
@@ -291,12 +292,8 @@ class GraphicsPage(BaseDevicePage):
         )
         self.prefs_page.add(self.group)
 
-        self.domain_caps = self.parent.domain.connection.getDomainCapabilities()
-
-        self.type_row = BindableComboRow(
-            self.domain_caps.devices["graphics"]["type"],
-            title="Graphics type",
-        )
+        # The choices are filled in once the capabilities arrived
+        self.type_row = BindableComboRow([], title="Graphics type")
         self.group.add(self.type_row)
 
         self.rows["display"] = BindableEntryRow(title="Display")
@@ -396,6 +393,13 @@ class GraphicsPage(BaseDevicePage):
             self.group.add(deleteRow(self.deleteDevice))
 
         self.updateData()
+        self.parent.domain.requestDomainCapabilities(self.__onDomainCapabilities__)
+
+    def __onDomainCapabilities__(self, domain_caps: DomainCapabilities):
+        """Offer the choices the domain's emulator supports."""
+        self.type_row.unbind()
+        self.type_row.setSelection(domain_caps.devices["graphics"]["type"])
+        self.updateData()
 
     def updateData(self):
         for row in self.rows.values():
@@ -455,13 +459,13 @@ class GraphicsPage(BaseDevicePage):
             self.xml_tree.append(row.elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.get("type", "").upper() + " Graphics "
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.get("type", "").upper() + " Graphics "
 
     def getDescription(self) -> str:
         return "Graphical Framebuffer"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "waves-and-screen-symbolic"
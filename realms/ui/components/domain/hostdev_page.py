@@ -99,6 +99,7 @@ class HostdevPage(BaseDevicePage):
             [],
             onDevsListingFailed,
             onDevsListed,
+            queue=self.parent.domain.connection.url,
         )
 
     def onDeviceChanged(self, *_):
@@ -111,13 +112,13 @@ class HostdevPage(BaseDevicePage):
         self.xml_tree.append(dev_tree.find("source"))
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Host Device"
 
     def getDescription(self) -> str:
         return "Forwarded host device"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "computer-chip-symbolic"
@@ -56,16 +56,16 @@ class InputPage(BaseDevicePage):
         self.bus_row.bindAttr(self.xml_tree, "bus", self.showApply)
         self.address_row.setXML(self.xml_tree)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.get("type", "").capitalize()
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.get("type", "").capitalize()
 
     def getDescription(self) -> str:
         return "Input device"
 
-    def getIconName(self) -> str:
-        t = self.xml_tree.get("type")
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
+        t = xml_tree.get("type")
         if t == "mouse":
             return "mouse-wireless-symbolic"
         if t == "keyboard":
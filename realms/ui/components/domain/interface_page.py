@@ -418,13 +418,13 @@ class InterfacePage(BaseDevicePage):
                 self.xml_tree.append(self.attr_rows["target"].elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Network Interface"
 
     def getDescription(self) -> str:
         return "Virtual network adapter"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "network-server-symbolic"
@@ -78,13 +78,13 @@ class IOMMUPage(BaseDevicePage):
         self.aw_bits_row.bindAttr(driver, "aw_bits", self.showApply)
         self.dma_translation_row.bindAttr(driver, "dma_translation", self.showApply)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "IOMMU"
 
     def getDescription(self) -> str:
         return "IO Memory Management Unit"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "memory-symbolic"
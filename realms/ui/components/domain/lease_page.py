@@ -66,13 +66,13 @@ class LeasePage(BaseDevicePage):
         self.target_path_row.bindAttr(target, "path", self.showApply)
         self.target_offset_row.bindAttr(target, "offset", self.showApply)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Device Lease"
 
     def getDescription(self) -> str:
         return "Lock manager lease"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "padlock2-open-symbolic"
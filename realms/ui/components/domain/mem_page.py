@@ -29,13 +29,13 @@ class MemPage(BaseDevicePage):
         # TODO
         pass
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "memory"
 
     def getDescription(self) -> str:
         return "Additional memory"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "memory-symbolic"
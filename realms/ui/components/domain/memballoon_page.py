@@ -69,13 +69,13 @@ class MemballoonPage(BaseDevicePage):
 
         self.address_row.setXML(self.xml_tree)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.tag.capitalize()
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.tag.capitalize()
 
     def getDescription(self) -> str:
         return "Memory balloon"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "memory-symbolic"
@@ -13,6 +13,8 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import xml.etree.ElementTree as ET
+
 from gi.repository import Adw
 
 from realms.ui.components.bindable_entries import BindableComboRow
@@ -61,13 +63,13 @@ class PanicPage(BaseDevicePage):
         self.updateData()
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Panic Device"
 
     def getDescription(self) -> str:
         return "Receive panic notifications"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "skull-symbolic"
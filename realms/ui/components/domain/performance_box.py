@@ -13,13 +13,16 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import math
+import time
+
 from gi.repository import Adw, Gtk
 
 from realms.helpers import bytesToString
-from realms.libvirt_wrap.constants import *
 from realms.libvirt_wrap.domain import Domain
+from realms.libvirt_wrap.domain_stats import DomainStats, computeMetrics
 from realms.ui.components.generic_preferences_row import GenericPreferencesRow
-from realms.ui.components.graphs import DataPoint, DataSeries, Graph, RelativeDataPoint
+from realms.ui.components.graphs import DataPoint, DataSeries, Graph, resampleSpans
 from realms.ui.components.preference_widgets import RealmsPreferencesPage
 
 
@@ -27,11 +30,14 @@ class PerformanceBox(Gtk.Box):
     """Box containing the performance graphs of a domain."""
 
     def __init__(self, domain: Domain):
-        self.REFRESH_SECONDS = 0.2
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
 
         self.domain = domain
-        self.domain.registerCallback(self.__onConnectionEvent__)
+        self.uuid = domain.getUUID()
+        self.stats_collector = domain.connection.stats_collector
+
+        # Last sample, to calculate rates from
+        self.__last_stats__: DomainStats = None
 
         self.page = RealmsPreferencesPage()
         self.append(self.page)
@@ -44,24 +50,9 @@ class PerformanceBox(Gtk.Box):
         row.set_activatable(False)
         self.group.add(row)
 
-        self.__cpu_data_series__ = DataSeries(
-            [RelativeDataPoint(0, domain.getCPUTime())], 1, 600
-        )
-
-        def getCPUData(ds):
-            cpu_time_reading = domain.getCPUTime()
-            display_val = 0
-            if len(self.__cpu_data_series__) > 1:
-                display_val = abs(ds.values[-2].last_reading - cpu_time_reading)
-                display_val /= 2
-            else:
-                display_val = abs(ds.getLast().last_reading - cpu_time_reading)
-            display_val /= domain.getVCPUs()
-            display_val /= 1000000000 * self.REFRESH_SECONDS
-            return RelativeDataPoint(display_val, cpu_time_reading)
-
-        self.__cpu_data_series__.setWatchCallback(
-            1000 * self.REFRESH_SECONDS, getCPUData
+        self.__cpu_data_series__ = DataSeries([DataPoint(0)], 1, 600)
+        self.__cpu_data_series__.setMetricSource(
+            domain.connection.url, self.uuid, "cpu"
         )
         self.__cpu_graph__ = Graph(
             [self.__cpu_data_series__],
@@ -78,12 +69,8 @@ class PerformanceBox(Gtk.Box):
         self.__mem_data_series__ = DataSeries(
             [DataPoint(0)], domain.getMaxMemory(), 600
         )
-
-        def getMemData(*_):
-            return DataPoint(domain.getMemoryUsage())
-
-        self.__mem_data_series__.setWatchCallback(
-            1000 * self.REFRESH_SECONDS, getMemData
+        self.__mem_data_series__.setMetricSource(
+            domain.connection.url, self.uuid, "memory"
         )
         self.__mem_graph__ = Graph(
             [self.__mem_data_series__],
@@ -95,71 +82,148 @@ class PerformanceBox(Gtk.Box):
         # Network Graphs
         self.net_rows = dict()
 
-        self.__updateNetworkRow__()
-
-    def __updateNetworkRow__(self):
-        def getRXNICStats(ds: DataSeries, nic: str):
-            rx = self.domain.getNICStats(nic)[0]
-            value = rx - ds.getLast().last_reading
-            return RelativeDataPoint(value, rx)
-
-        def getTXNICStats(ds: DataSeries, nic: str):
-            tx = self.domain.getNICStats(nic)[1]
-            value = tx - ds.getLast().last_reading
-            return RelativeDataPoint(value, tx)
+        # Only sample at full rate while the graphs are visible, otherwise
+        # keep the domain in the collector's background.
+        self.__started__ = False
+        self.__ended__ = False
+        self.stats_collector.registerBackground(self.uuid)
+        self.connect("map", lambda *_: self.start())
+        self.connect("unmap", lambda *_: self.stop())
 
+    def __updateNetworkRows__(self, nics: list[str]):
+        """Rebuild the network graphs for the given interfaces."""
         # Remove existing rows.
-        for row, rx_ds, tx_ds in self.net_rows.values():
+        for row, _, _ in self.net_rows.values():
             self.group.remove(row)
-            rx_ds.stopWatchCallback()
-            tx_ds.stopWatchCallback()
         self.net_rows.clear()
 
-        if self.domain.isActive():
-            nics = self.domain.getNICs()
-
-            for nic in nics:
-                rx_ds = DataSeries(
-                    [RelativeDataPoint(0, self.domain.getNICStats(nic)[0])],
-                    None,
-                    600,
-                    fill=False,
+        for nic in nics:
+            rx_ds = DataSeries([DataPoint(0)], None, 600, fill=False)
+            tx_ds = DataSeries([DataPoint(0)], None, 600, fill=False)
+
+            graph = Graph(
+                [rx_ds, tx_ds],
+                nic.upper(),
+                lambda series: f"↓{ bytesToString(int(series[0].getLastAvg(5))) }/s ↑{ bytesToString(int(series[1].getLastAvg(5))) }/s",
+            )
+
+            row = GenericPreferencesRow()
+            row.set_activatable(False)
+            self.group.add(row)
+            row.addChild(graph)
+            self.net_rows[nic] = (row, rx_ds, tx_ds)
+
+    def __onStats__(self, stats: DomainStats):
+        """Fan a new sample out to all data series."""
+        if stats.nics.keys() != self.net_rows.keys():
+            self.__updateNetworkRows__(list(stats.nics.keys()))
+
+        last = self.__last_stats__
+        self.__last_stats__ = stats
+        if last is None:
+            return
+
+        metrics = computeMetrics(last, stats)
+        if metrics is None:
+            return
+
+        self.__cpu_data_series__.pushRaw(metrics["cpu"])
+
+        if stats.max_memory > 0:
+            self.__mem_data_series__.max_value = stats.max_memory
+        self.__mem_data_series__.pushRaw(metrics["memory"])
+
+        for nic, (_, rx_ds, tx_ds) in self.net_rows.items():
+            rx_ds.pushRaw(metrics[f"net.{ nic }.rx"])
+            tx_ds.pushRaw(metrics[f"net.{ nic }.tx"])
+
+    def __loadStoredHistory__(self):
+        """Fill the CPU and memory graphs from the metrics store, i.e. with
+        the data of an earlier session. The window spans max_size sampling
+        intervals, so the graphs keep their time scale."""
+        interval = self.stats_collector.interval / 1000
+        end = time.time()
+        for graph, ds in [
+            (self.__cpu_graph__, self.__cpu_data_series__),
+            (self.__mem_graph__, self.__mem_data_series__),
+        ]:
+            graph.showWindow(end - ds.max_size * interval, end)
+
+    def __replayHistory__(self, history: list[DomainStats]):
+        """Add the samples taken while the graphs were hidden. Hidden domains
+        are only sampled every few seconds, so the values between the samples
+        are resampled onto the sampling interval to keep the time scale."""
+        if history[-1].nics.keys() != self.net_rows.keys():
+            self.__updateNetworkRows__(list(history[-1].nics.keys()))
+
+        first = self.__last_stats__
+        if first is None:
+            first, history = history[0], history[1:]
+
+        # Dict from metric to the (start, duration, value) between two samples
+        spans = {}
+        last = first
+        for stats in history:
+            metrics = computeMetrics(last, stats)
+            if metrics is None:
+                continue
+            for metric, value in metrics.items():
+                spans.setdefault(metric, []).append(
+                    (last.timestamp, stats.timestamp - last.timestamp, value)
                 )
-                rx_ds.setWatchCallback(
-                    1000 * self.REFRESH_SECONDS,
-                    lambda ds, nic=nic: getRXNICStats(ds, nic),
-                )
-                tx_ds = DataSeries(
-                    [RelativeDataPoint(0, self.domain.getNICStats(nic)[1])],
-                    None,
-                    600,
-                    fill=False,
-                )
-                tx_ds.setWatchCallback(
-                    1000 * self.REFRESH_SECONDS,
-                    lambda ds, nic=nic: getTXNICStats(ds, nic),
-                )
-
-                graph = Graph(
-                    [rx_ds, tx_ds],
-                    nic.upper(),
-                    lambda series: f"↓{ bytesToString(int(series[0].getLastAvg(5))) } ↑{ bytesToString(int(series[1].getLastAvg(5))) }",
-                )
-
-                row = GenericPreferencesRow()
-                row.set_activatable(False)
-                self.group.add(row)
-                row.addChild(graph)
-                self.net_rows[nic] = (row, rx_ds, tx_ds)
-
-    def __onConnectionEvent__(self, conn, obj, type_id, event_id, detail_id):
-        if type_id == CALLBACK_TYPE_DOMAIN_LIFECYCLE:
-            self.__updateNetworkRow__()
+            if stats.max_memory > 0:
+                self.__mem_data_series__.max_value = stats.max_memory
+            last = stats
+        self.__last_stats__ = last
+
+        interval = self.stats_collector.interval / 1000
+        count = min(
+            self.__cpu_data_series__.max_size,
+            math.ceil((last.timestamp - first.timestamp) / interval),
+        )
+        start = last.timestamp - count * interval
+
+        series = [
+            (self.__cpu_data_series__, "cpu"),
+            (self.__mem_data_series__, "memory"),
+        ]
+        for nic, (_, rx_ds, tx_ds) in self.net_rows.items():
+            series.append((rx_ds, f"net.{ nic }.rx"))
+            series.append((tx_ds, f"net.{ nic }.tx"))
+        for ds, metric in series:
+            for value in resampleSpans(spans.get(metric, []), start, interval, count):
+                ds.pushRaw(value)
+
+    def start(self):
+        """Start updating the graphs, catching up on the samples taken
+        while they were hidden."""
+        if self.__started__ or self.__ended__:
+            return
+        self.__started__ = True
+
+        last = self.__last_stats__
+        history = [
+            stats
+            for stats in self.stats_collector.getHistory(self.uuid)
+            if last is None or stats.timestamp > last.timestamp
+        ]
+        if history:
+            self.__replayHistory__(history)
+        elif last is None:
+            self.__loadStoredHistory__()
+        self.stats_collector.registerCallback(self.uuid, self.__onStats__)
+
+    def stop(self):
+        """Stop updating the graphs, the domain is only sampled in the
+        background until start is called again."""
+        if not self.__started__:
+            return
+        self.__started__ = False
+        self.stats_collector.unregisterCallback(self.uuid, self.__onStats__)
 
     def end(self):
         """Stop collecting data and updating the graph."""
-        self.__cpu_data_series__.stopWatchCallback()
-        self.__mem_data_series__.stopWatchCallback()
-        for row, rx_ds, tx_ds in self.net_rows.values():
-            rx_ds.stopWatchCallback()
-            tx_ds.stopWatchCallback()
+        self.stop()
+        if not self.__ended__:
+            self.__ended__ = True
+            self.stats_collector.unregisterBackground(self.uuid)
@@ -77,13 +77,13 @@ class PstorePage(BaseDevicePage):
                 self.xml_tree.add(self.path_row.elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.tag.capitalize()
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.tag.capitalize()
 
     def getDescription(self) -> str:
         return "Pstore"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "archive-symbolic"
@@ -67,13 +67,13 @@ class RedirdevPage(BaseDevicePage):
         self.boot_row.setXML(self.xml_tree)
         self.address_row.setXML(self.xml_tree)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Redirected Device"
 
     def getDescription(self) -> str:
         return "Redirected USB device"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "computer-chip-symbolic"
@@ -108,13 +108,13 @@ class RedirfilterPage(BaseDevicePage):
         self.rows.remove(row)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Redirected Device Filter"
 
     def getDescription(self) -> str:
         return "Redirected USB device filter"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "computer-chip-symbolic"
@@ -17,6 +17,7 @@ import xml.etree.ElementTree as ET
 
 from gi.repository import Adw
 
+from realms.libvirt_wrap.domain_capabilities import DomainCapabilities
 from realms.ui.components.bindable_entries import BindableComboRow
 from realms.ui.components.common import deleteRow
 from realms.ui.components.domain.address_row import AddressRow
@@ -34,12 +35,8 @@ class RNGPage(BaseDevicePage):
         )
         self.prefs_page.add(self.group)
 
-        self.domain_caps = self.parent.domain.connection.getDomainCapabilities()
-
-        self.model_row = BindableComboRow(
-            self.domain_caps.devices["rng"]["model"],
-            title="RNG model",
-        )
+        # The choices are filled in once the capabilities arrived
+        self.model_row = BindableComboRow([], title="RNG model")
         self.group.add(self.model_row)
 
         self.address_row = AddressRow(self.xml_tree, self.showApply)
@@ -49,18 +46,25 @@ class RNGPage(BaseDevicePage):
             self.group.add(deleteRow(self.deleteDevice))
 
         self.updateData()
+        self.parent.domain.requestDomainCapabilities(self.__onDomainCapabilities__)
+
+    def __onDomainCapabilities__(self, domain_caps: DomainCapabilities):
+        """Offer the choices the domain's emulator supports."""
+        self.model_row.unbind()
+        self.model_row.setSelection(domain_caps.devices["rng"]["model"])
+        self.updateData()
 
     def updateData(self):
         self.model_row.bindAttr(self.xml_tree, "model", self.showApply)
         self.address_row.setXML(self.xml_tree)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Random Number Generator"
 
     def getDescription(self) -> str:
         return "Random number generator"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "dice3-symbolic"
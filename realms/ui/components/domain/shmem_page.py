@@ -91,13 +91,13 @@ class SHMemPage(BaseDevicePage):
                 self.xml_tree.append(self.size_row.elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Shared Memory"
 
     def getDescription(self) -> str:
         return "Shared memory"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "memory-symbolic"
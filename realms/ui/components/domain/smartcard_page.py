@@ -100,13 +100,13 @@ class SmartcardPage(BaseDevicePage):
                 self.xml_tree.add(self.database_row.elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Smartcard"
 
     def getDescription(self) -> str:
         return "Smartcard reader"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "smartcard-symbolic"
@@ -99,6 +99,7 @@ class SnapshotRow(Adw.ActionRow):
                 [self.snapshot],
                 lambda e: self.parent.window_ref.window.pushToastText(str(e)),
                 onDone,
+                queue=self.domain.connection.url,
             )
 
         dialog = selectDialog(
@@ -221,6 +222,7 @@ class SnapshotBox(Gtk.Box):
             [row.snapshot],
             lambda e: self.window_ref.window.pushToastText(str(e)),
             lambda *x: None,
+            queue=self.domain.connection.url,
         )
 
     def __onConnectionEvent__(self, conn, obj, type_id, event_id, _):
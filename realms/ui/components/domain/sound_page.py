@@ -26,8 +26,6 @@ from .base_device_page import BaseDevicePage
 
 class SoundPage(BaseDevicePage):
     def build(self):
-        self.domain_caps = self.parent.domain.connection.getDomainCapabilities()
-
         self.group = Adw.PreferencesGroup()
         self.prefs_page.add(self.group)
 
@@ -116,13 +114,13 @@ class SoundPage(BaseDevicePage):
                 self.xml_tree.append(self.audio_row.elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.get("model", "") + " Sound Card"
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.get("model", "") + " Sound Card"
 
     def getDescription(self) -> str:
         return "Sound card"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "soundcard-symbolic"
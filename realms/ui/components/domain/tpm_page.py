@@ -123,13 +123,13 @@ class TPMPage(BaseDevicePage):
             if encryption is None:
                 backend.append(self.secret_row.elem)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "TPM"
 
     def getDescription(self) -> str:
         return "Trusted Platform Module"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "key-login-symbolic"
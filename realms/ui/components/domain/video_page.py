@@ -18,6 +18,7 @@ import xml.etree.ElementTree as ET
 from gi.repository import Adw, Gtk
 
 from realms.helpers import bytesToString, stringToBytes
+from realms.libvirt_wrap.domain_capabilities import DomainCapabilities
 from realms.ui.components.bindable_entries import (
     BindableComboRow,
     BindableEntryRow,
@@ -92,11 +93,8 @@ class VideoPage(BaseDevicePage):
         self.group = Adw.PreferencesGroup()
         self.prefs_page.add(self.group)
 
-        self.domain_caps = self.parent.domain.connection.getDomainCapabilities()
-
-        self.model_row = BindableComboRow(
-            self.domain_caps.devices["video"]["modelType"], title="Model"
-        )
+        # The choices are filled in once the capabilities arrived
+        self.model_row = BindableComboRow([], title="Model")
         self.group.add(self.model_row)
 
         self.vram_row = BindableEntryRow(title="VRam")
@@ -123,6 +121,13 @@ class VideoPage(BaseDevicePage):
             self.group.add(deleteRow(self.deleteDevice))
 
         self.updateData()
+        self.parent.domain.requestDomainCapabilities(self.__onDomainCapabilities__)
+
+    def __onDomainCapabilities__(self, domain_caps: DomainCapabilities):
+        """Offer the choices the domain's emulator supports."""
+        self.model_row.unbind()
+        self.model_row.setSelection(domain_caps.devices["video"]["modelType"])
+        self.updateData()
 
     def updateData(self):
         self.group.set_title(self.getTitle())
@@ -168,13 +173,13 @@ class VideoPage(BaseDevicePage):
             model.remove(self.accel_row.elem)
         self.showApply()
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.find("model").get("type") + " Video"
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.find("model").get("type") + " Video"
 
     def getDescription(self) -> str:
         return "Virtual display adapter"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "brush-monitor-symbolic"
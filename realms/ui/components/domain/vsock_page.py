@@ -64,10 +64,9 @@ class VSockPage(BaseDevicePage):
 
         self.address_row.bindAttr(cid, "address", self.showApply)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
-        return self.xml_tree.tag.capitalize()
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
+        return xml_tree.tag.capitalize()
 
     def onCIDChanged(self):
         self.showApply()
@@ -75,5 +74,6 @@ class VSockPage(BaseDevicePage):
     def getDescription(self) -> str:
         return "Virtual socket"
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "horizontal-arrows-symbolic"
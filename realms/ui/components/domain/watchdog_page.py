@@ -53,13 +53,13 @@ class WatchdogPage(BaseDevicePage):
         self.model_row.bindAttr(self.xml_tree, "model", self.showApply)
         self.action_row.bindAttr(self.xml_tree, "action", self.showApply)
 
-    def getTitle(self) -> str:
-        if self.use_for_adding:
-            return ""
+    @staticmethod
+    def titleFromXML(xml_tree: ET.Element) -> str:
         return "Hardware Watchdog"
 
     def getDescription(self) -> str:
         return ""
 
-    def getIconName(self) -> str:
+    @staticmethod
+    def iconNameFromXML(xml_tree: ET.Element) -> str:
         return "dog-symbolic"
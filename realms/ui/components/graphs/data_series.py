@@ -15,9 +15,39 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """DataSeries provide a way of storing a set number of data-points, and
 updating them regularly."""
+import math
+import time
+import traceback
+from array import array
+
 from gi.repository import Adw, GLib
 
-from realms.helpers import asyncJob
+from realms.helpers import DEFAULT_JOB_QUEUE, asyncJob, getMetricsStore
+
+
+def resampleSpans(
+    spans: list[tuple[float, float, float]], start: float, interval: float, count: int
+) -> list[float]:
+    """Resample values that each cover a span of time onto evenly spaced
+    points, i.e. stored averages or rates between two samples.
+
+    Args:
+        spans (list[tuple[float, float, float]]): (start, duration, value)
+            of each span, oldest first
+        start (float): Time of the first point
+        interval (float): Time between two points
+        count (int): Number of points
+
+    Returns:
+        list[float]: Value of each point, 0 where no span covers it
+    """
+    values = [0.0] * count
+    for span_start, duration, value in spans:
+        first = max(0, math.ceil((span_start - start) / interval))
+        last = min(count, math.ceil((span_start + duration - start) / interval))
+        for i in range(first, last):
+            values[i] = value
+    return values
 
 
 class DataPoint:
@@ -42,6 +72,10 @@ class DataSeries:
     """Main data class that is used by the graphs. It manages all it's points
     automatically, executes periodic data gathering operations and can notify
     graphs that a redraw is needed.
+
+    Values are kept in preallocated ring buffers, so pushing a value doesn't
+    allocate and doesn't move any other values. The maximum and the sums
+    needed for averages are tracked while pushing.
     """
 
     def __init__(
@@ -53,30 +87,126 @@ class DataSeries:
         fill: bool = True,
     ):
         self.redraw_cb = None
-        self.values = initial_values
         self.max_value = max_value
         self.max_size = max_size
         self.color = color
         self.fill = fill
 
         self.watch_cb = None
+        self.source = None  # (url, key, metric) in the metrics store
+        self.generation = 0  # Increased on every change of the values
+
+        self.__values__ = None  # Ring buffer of values
+        self.__readings__ = None  # Ring buffer of last readings
+        self.__sums__ = None  # Ring buffer of running sums up to each value
+        self.__start__ = 0  # Index of the oldest value
+        self.__count__ = 0
+        self.__sum_base__ = 0.0  # Running sum before the oldest value
+        self.__max__ = 0.0
+        self.__max_dirty__ = False
+
+        self.__reset__(max_size)
+        self.__extend__(initial_values)
 
     def __len__(self) -> int:
-        return len(self.values)
+        return self.__count__
 
-    def setWatchCallback(self, watch_timeout: int, watch_cb: callable) -> None:
+    def __reset__(self, max_size: int) -> None:
+        """Allocate empty buffers for the given size."""
+        self.max_size = max_size
+        self.__values__ = array("d", bytes(8 * max_size))
+        self.__readings__ = array("d", bytes(8 * max_size))
+        self.__sums__ = array("d", bytes(8 * max_size))
+        self.__start__ = 0
+        self.__count__ = 0
+        self.__sum_base__ = 0.0
+        self.__max__ = 0.0
+        self.__max_dirty__ = False
+        self.generation += 1
+
+    def __ringIndex__(self, i: int) -> int:
+        """Ring buffer index of the i-th value, negative values count from
+        the newest value."""
+        if i < 0:
+            i += self.__count__
+        if i < 0 or i >= self.__count__:
+            raise IndexError("DataSeries index out of range")
+        return (self.__start__ + i) % self.max_size
+
+    def __push__(self, value: float, last_reading: float) -> None:
+        """Add a value without notifying the graph."""
+        if self.__count__ < self.max_size:
+            index = (self.__start__ + self.__count__) % self.max_size
+            previous_sum = (
+                self.__sums__[index - 1] if self.__count__ > 0 else self.__sum_base__
+            )
+            self.__count__ += 1
+        else:
+            # Overwrite the oldest value
+            index = self.__start__
+            previous_sum = self.__sums__[index - 1]
+            self.__sum_base__ = self.__sums__[index]
+            if self.__values__[index] >= self.__max__:
+                self.__max_dirty__ = True
+            self.__start__ = (self.__start__ + 1) % self.max_size
+            if self.__start__ == 0:
+                # Rebase the running sums once per cycle, so they don't grow
+                # unbounded and lose precision.
+                base = self.__sum_base__
+                for i in range(self.max_size):
+                    self.__sums__[i] -= base
+                previous_sum -= base
+                self.__sum_base__ = 0.0
+
+        self.generation += 1
+        self.__values__[index] = value
+        self.__readings__[index] = last_reading
+        self.__sums__[index] = previous_sum + value
+
+        if self.__count__ == 1 or value >= self.__max__:
+            self.__max__ = value
+            self.__max_dirty__ = False
+
+    def __extend__(self, values: list[DataPoint]) -> None:
+        """Add DataPoints without notifying the graph."""
+        for value in values[-self.max_size :]:
+            self.__push__(value.value, getattr(value, "last_reading", 0))
+
+    def setWatchCallback(
+        self, watch_timeout: int, watch_cb: callable, queue: str = DEFAULT_JOB_QUEUE
+    ) -> None:
         """Add a callback to go and get the next data point
 
         Args:
             watch_timeout (int): Interval in ms at which the cb is called
             watch_cb (callable): Callback, must return a single DataPoint
+            queue (str, optional): Job queue to run the callback in, i.e.
+                the connection's URL. Defaults to DEFAULT_JOB_QUEUE.
         """
         self.watch_cb = watch_cb
+        pending = False
+
+        def fetch():
+            try:
+                return watch_cb(self)
+            except Exception:
+                traceback.print_exc()
+                return None
+
+        def onResult(value: DataPoint):
+            nonlocal pending
+            pending = False
+            if value is not None:
+                self.pushValue(value)
 
         def onTimeout(*_):
+            nonlocal pending
             if self.watch_cb is None:
                 return False  # Cancel timeout
-            asyncJob(self.watch_cb, [self], self.pushValue)
+            # Don't pile up jobs when the hypervisor is slow to answer
+            if not pending:
+                pending = True
+                asyncJob(fetch, [], onResult, queue)
             return True
 
         GLib.timeout_add(watch_timeout, onTimeout)
@@ -85,6 +215,40 @@ class DataSeries:
         """Remove the watch callback, it will no longer be called"""
         self.watch_cb = None
 
+    def setMetricSource(self, url: str, key: str, metric: str) -> None:
+        """Set the metric in the metrics store that loadWindow reads.
+
+        Args:
+            url (str): Connection URL
+            key (str): Object the metric belongs to, i.e. a domain UUID
+            metric (str): Metric name
+        """
+        self.source = (url, key, metric)
+
+    def loadWindow(self, start: float, end: float = None) -> None:
+        """Replace the values with the stored ones of a time window. The
+        window is spread over max_size points, the store picks a rollup
+        that is fine enough. Nothing happens without a metric source.
+
+        Args:
+            start (float): Unix time
+            end (float, optional): Unix time, defaults to now
+        """
+        if self.source is None:
+            return
+        if end is None:
+            end = time.time()
+
+        store = getMetricsStore()
+        url, key, metric = self.source
+        resolution = store.getResolution(start, end)
+        spans = [
+            (timestamp, resolution, value)
+            for timestamp, value in store.query(url, key, metric, start, end)
+        ]
+        interval = (end - start) / self.max_size
+        self.setRawValues(resampleSpans(spans, start, interval, self.max_size))
+
     def registerRedrawCallback(self, redraw_cb: callable) -> None:
         """Register a callback for when redrawing is required, i.e.
         when a new point was added.
@@ -99,7 +263,7 @@ class DataSeries:
         self.redraw_cb = None
 
     def triggerRedraw(self):
-        if self.redraw_cb is not None and len(self.values) > 1:
+        if self.redraw_cb is not None and self.__count__ > 1:
             self.redraw_cb()
 
     def pushValue(self, value: DataPoint) -> None:
@@ -108,9 +272,18 @@ class DataSeries:
         Args:
             value (DataPoint): DataPoint to add
         """
-        self.values.append(value)
-        while len(self.values) > self.max_size:
-            self.values.pop(0)
+        self.pushRaw(value.value, getattr(value, "last_reading", 0))
+
+    def pushRaw(self, value: float, last_reading: float = 0) -> None:
+        """Add a plain value to this series without creating a DataPoint.
+        Will notify the graph to redraw.
+
+        Args:
+            value (float): Value to add
+            last_reading (float, optional): Plain measurement the value was
+                derived from. Defaults to 0.
+        """
+        self.__push__(value, last_reading)
         self.triggerRedraw()
 
     def setMaxSize(self, max_size: int) -> None:
@@ -120,9 +293,11 @@ class DataSeries:
         Args:
             max_size (int): _description_
         """
-        self.max_size = max_size
-        while len(self.values) > self.max_size:
-            self.values.pop(0)
+        values = self.getValues()
+        readings = [self.__readings__[self.__ringIndex__(i)] for i in range(len(self))]
+        self.__reset__(max_size)
+        for value, reading in list(zip(values, readings))[-max_size:]:
+            self.__push__(value, reading)
         self.triggerRedraw()
 
     def setValues(self, values: list[DataPoint]):
@@ -132,32 +307,69 @@ class DataSeries:
             values (list[DataPoint]): New data points, oldest points will be discarded
                 until max size is reached
         """
-        self.values = values
-        while len(self.values) > self.max_size:
-            self.values.pop(0)
+        self.__reset__(self.max_size)
+        self.__extend__(values)
         self.triggerRedraw()
 
+    def setRawValues(self, values: list[float]):
+        """Replace the series' values with plain values, i.e. loaded from
+        the metrics store.
+
+        Args:
+            values (list[float]): New values, oldest values will be discarded
+                until max size is reached
+        """
+        self.__reset__(self.max_size)
+        for value in values[-self.max_size :]:
+            self.__push__(value, 0)
+        self.triggerRedraw()
+
+    def getValues(self) -> array:
+        """Get a copy of all values, oldest first."""
+        end = self.__start__ + self.__count__
+        if end <= self.max_size:
+            return self.__values__[self.__start__ : end]
+        return (
+            self.__values__[self.__start__ :] + self.__values__[: end - self.max_size]
+        )
+
+    def getValue(self, i: int) -> float:
+        """Get the i-th value, negative indices count from the newest."""
+        return self.__values__[self.__ringIndex__(i)]
+
+    def getReading(self, i: int) -> float:
+        """Get the last reading stored with the i-th value, negative
+        indices count from the newest."""
+        return self.__readings__[self.__ringIndex__(i)]
+
     def getLast(self) -> DataPoint:
         """Get the last data point."""
-        return self.values[-1]
+        return RelativeDataPoint(self.getValue(-1), self.getReading(-1))
 
     def getFirst(self) -> DataPoint:
         """Get the first data point."""
-        return self.values[0]
+        return RelativeDataPoint(self.getValue(0), self.getReading(0))
 
     def getMaxValue(self) -> any:
         """Get the (current) maximum value of this data series."""
         if self.max_value is None:
-            val = max([dp.value for dp in self.values])
+            if self.__max_dirty__:
+                # The maximum dropped out of the buffer, this is only
+                # needed rarely.
+                self.__max__ = max(self.getValues(), default=0)
+                self.__max_dirty__ = False
+            val = self.__max__
             return val if val != 0 else 1
         return self.max_value
 
     def getLastAvg(self, n: int) -> float:
         """Get average over last n values."""
-        n = min(n, len(self.values))
-        avg = 0
-        for i in range(n):
-            avg += self.values[-i].value
-
-        avg /= n
-        return avg
+        n = min(n, self.__count__)
+        if n == 0:
+            return 0
+        total = self.__sums__[self.__ringIndex__(-1)]
+        if n < self.__count__:
+            total -= self.__sums__[self.__ringIndex__(-n - 1)]
+        else:
+            total -= self.__sum_base__
+        return total / n
@@ -15,11 +15,12 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """Implementation of a graph that will automatically plot
 with a given DataSeries."""
+
 from gi.repository import Adw, Gsk, Gtk
 
 from realms.ui.components.common import hspacer
 
-from .data_series import DataPoint, DataSeries
+from .data_series import DataSeries
 
 
 class InnerGraph(Gtk.Box):
@@ -37,6 +38,8 @@ class InnerGraph(Gtk.Box):
         self.parent = parent
         self.__data_series__ = data_series
         self.value_text = value_text
+        self.__redraw_pending__ = False
+        self.__paths__ = {}  # Cached (key, stroke, fill) paths per data series
 
         colors = [
             Adw.AccentColor.BLUE,
@@ -57,16 +60,19 @@ class InnerGraph(Gtk.Box):
             ds.registerRedrawCallback(self.__onRedraw__)
 
     def __onRedraw__(self):
+        # Several data series may request a redraw at the same time,
+        # only draw once per frame.
+        if self.__redraw_pending__:
+            return
+        self.__redraw_pending__ = True
+        self.add_tick_callback(self.__onTick__)
+
+    def __onTick__(self, *_):
+        self.__redraw_pending__ = False
         # Only redraw if the widget is visible
         if self.is_drawable():
             self.queue_draw()
-
-    def __fitValue__(self, ds: DataSeries, p: DataPoint, width, height) -> float:
-        """Calculate the y-coordinate of a given point"""
-        value = height * (1 - p.value / ds.getMaxValue())
-        value = max(0, value)
-        value = min(height, value)
-        return value
+        return False
 
     # pylint: disable-next=invalid-name
     def do_snapshot(self, snapshot, *_):
@@ -82,6 +88,35 @@ class InnerGraph(Gtk.Box):
 
         self.parent.setValueLabel(self.value_text(self.__data_series__))
 
+    def __buildPaths__(self, ds: DataSeries, width, height) -> tuple:
+        """Build the stroke and fill path of a data series.
+
+        Returns:
+            tuple: (Gsk.Path, Gsk.Path), stroke and fill path
+        """
+        values = ds.getValues()
+        move_width = width / (ds.max_size - 1)
+        start_x = (ds.max_size - len(values)) * move_width
+        scale = height / ds.getMaxValue()
+
+        # Calculate all coordinates in one pass, clamped to the widget
+        ys = [min(height, max(0, height - v * scale)) for v in values]
+
+        builder = Gsk.PathBuilder()
+        builder.move_to(start_x, ys[0])
+        line_to = builder.line_to
+        for i, y in enumerate(ys):
+            line_to(start_x + i * move_width, y)
+        stroke = builder.to_path()
+
+        builder.add_path(stroke)
+        builder.line_to(width, height)
+        builder.line_to(start_x, height)
+        builder.line_to(start_x, ys[0])
+        fill = builder.to_path()
+
+        return stroke, fill
+
     def __drawDataSeries__(self, snapshot, ds: DataSeries):
         if len(ds) < 2:
             return  # A line needs at least two points
@@ -89,33 +124,21 @@ class InnerGraph(Gtk.Box):
         width = self.get_width()
         height = self.get_height()
 
-        color = ds.color.to_rgba()
-        builder = Gsk.PathBuilder()
-        move_width = width / (ds.max_size - 1)
-        start_x = (ds.max_size - len(ds)) * move_width
-        start_y = self.__fitValue__(ds, ds.getFirst(), width, height)
-        builder.move_to(
-            start_x,
-            start_y,
-        )
-        for i, v in enumerate(ds.values):
-            builder.line_to(
-                start_x + i * move_width,
-                self.__fitValue__(ds, v, width, height),
-            )
-
-        path = builder.to_path()
+        # Reuse the paths if neither the values nor the size changed
+        key = (ds.generation, ds.getMaxValue(), width, height)
+        cached = self.__paths__.get(id(ds))
+        if cached is not None and cached[0] == key:
+            _, stroke, fill = cached
+        else:
+            stroke, fill = self.__buildPaths__(ds, width, height)
+            self.__paths__[id(ds)] = (key, stroke, fill)
 
-        snapshot.append_stroke(path, Gsk.Stroke(2), color)
-
-        builder.add_path(path)
-        builder.line_to(width, height)
-        builder.line_to(start_x, height)
-        builder.line_to(start_x, start_y)
+        color = ds.color.to_rgba()
+        snapshot.append_stroke(stroke, Gsk.Stroke(2), color)
 
         if ds.fill:
             snapshot.push_opacity(0.3)
-            snapshot.append_fill(builder.to_path(), Gsk.FillRule.WINDING, color)
+            snapshot.append_fill(fill, Gsk.FillRule.WINDING, color)
             snapshot.pop()
 
 
@@ -152,9 +175,23 @@ class Graph(Gtk.Box):
         )
         title_box.append(self.value_label)
 
+        self.__data_series__ = data_series
         self.__frame__ = InnerGraph(self, data_series, value_text)
         self.append(self.__frame__)
 
+    def showWindow(self, start: float, end: float = None):
+        """Show the stored values of a time window in all data series that
+        have a metric source. Values pushed afterwards are appended at the
+        series' own pace, so a live graph should use a window of max_size
+        sampling intervals.
+
+        Args:
+            start (float): Unix time
+            end (float, optional): Unix time, defaults to now
+        """
+        for ds in self.__data_series__:
+            ds.loadWindow(start, end)
+
     def setValueLabel(self, label: str):
         """Set the text of the value label."""
         self.value_label.set_label(label)
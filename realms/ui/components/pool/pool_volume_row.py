@@ -13,45 +13,56 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
-from gi.repository import Adw, Gtk
+import xml.etree.ElementTree as ET
+
+from gi.repository import Adw, GObject, Gtk
 
 from realms.helpers import asyncJob, bytesToString, failableAsyncJob, stringToBytes
 from realms.helpers.async_jobs import ResultWrapper
-from realms.libvirt_wrap import Volume
+from realms.libvirt_wrap import Volume, getTransferManager
 from realms.ui.components import ActionOption, selectDialog
 
 # from ..bindable_entries import
 from realms.ui.components.common import deleteButton, iconButton, propertyRow
 from realms.ui.components.generic_preferences_row import GenericPreferencesRow
-from realms.ui.dialogs.download_volume_dialog import DownloadVolumeDialog
+from realms.ui.dialogs.copy_volume_dialog import CopyVolumeDialog
 from realms.ui.window_reference import WindowReference
 
 from .pool_permissions_box import PoolPermissionsBox
 
 
+class PoolVolumeItem(GObject.Object):
+    """Model item of the volume list, one for each volume. Row widgets only
+    exist for the visible items and get bound to them."""
+
+    def __init__(self, volume: Volume):
+        super().__init__()
+        self.volume = volume
+        self.expanded = False
+        self.xml_tree = None  # Loaded when the row is expanded first
+
+
 class PoolVolumeRow(Adw.ExpanderRow):
-    """Represent a volume row for the pool details page."""
+    """Represent a volume row for the pool details page. Rows are recycled
+    by the list view, they show one item at a time. The details are only
+    built while the row is expanded."""
 
-    def __init__(
-        self,
-        volume: Volume,
-        window_ref: WindowReference,
-    ):
-        super().__init__(title=volume.getName())
+    def __init__(self, window_ref: WindowReference):
+        super().__init__()
 
-        self.volume = volume
+        self.item = None
+        self.volume = None
         self.window_ref = window_ref
-        self.volume_tree = None
 
         self.usage_progress = None
 
         self.capacity_row = None
         self.action_row = None
+        self.__detail_rows__ = []
 
         self.__build__()
 
     def __build__(self):
-        self.volume_tree = self.volume.getETree()
         self.usage_progress = Gtk.ProgressBar(
             vexpand=True,
             valign=Gtk.Align.BASELINE_CENTER,
@@ -59,27 +70,94 @@ class PoolVolumeRow(Adw.ExpanderRow):
         )
         self.add_suffix(self.usage_progress)
 
+        self.connect("notify::expanded", self.__onExpandedChanged__)
+
+    def bind(self, item: PoolVolumeItem):
+        """Show the given item"""
+        self.item = item
+        self.volume = item.volume
+
+        self.set_title(self.volume.getName())
+        self.__showUsage__()
+
+        if item.expanded:
+            self.set_expanded(True)
+
+    def unbind(self):
+        """Stop showing the current item"""
+        self.item = None
+        self.set_expanded(False)
+        self.__clearDetails__()
+        self.volume = None
+
+    def __onExpandedChanged__(self, *_):
+        if self.item is None:
+            return
+        self.item.expanded = self.get_expanded()
+        if self.item.expanded and not self.__detail_rows__:
+            self.__loadDetails__()
+
+    def __loadDetails__(self):
+        """Build the details, the XML is fetched on first use."""
+        item = self.item
+        if item.xml_tree is not None and item.volume.hasInfo():
+            self.__buildDetails__()
+            return
+
+        def load() -> ET.Element:
+            # The details show the info too, it may have been invalidated
+            item.volume.getInfo()
+            return item.volume.getETree()
+
+        def onLoaded(res: ResultWrapper):
+            if res.failed:
+                return
+            item.xml_tree = res.data
+            if self.item is item and item.expanded and not self.__detail_rows__:
+                self.__buildDetails__()
+
+        failableAsyncJob(
+            load,
+            [],
+            lambda e: self.window_ref.window.pushToastText(str(e)),
+            onLoaded,
+            queue=item.volume.pool.connection.url,
+        )
+
+    def __addDetailRow__(self, row: Gtk.Widget):
+        self.add_row(row)
+        self.__detail_rows__.append(row)
+
+    def __clearDetails__(self):
+        for row in self.__detail_rows__:
+            self.remove(row)
+        self.__detail_rows__.clear()
+        self.capacity_row = None
+        self.action_row = None
+
+    def __buildDetails__(self):
         name_row = propertyRow("Name")
         name_row.set_subtitle(self.volume.getName())
-        self.add_row(name_row)
+        self.__addDetailRow__(name_row)
 
         self.capacity_row = Adw.EntryRow(title="Capacity", show_apply_button=False)
+        self.capacity_row.set_text(bytesToString(self.volume.getCapacity()))
         self.capacity_row.connect(
             "changed", lambda *_: self.capacity_row.set_show_apply_button(True)
         )
         self.capacity_row.connect("apply", self.__applyCapacityChange__)
-        self.add_row(self.capacity_row)
+        self.__addDetailRow__(self.capacity_row)
 
         type_row = propertyRow("Type")
         type_row.set_subtitle(self.volume.getType())
-        self.add_row(type_row)
+        self.__addDetailRow__(type_row)
 
-        target = self.volume_tree.find("target")
+        target = self.item.xml_tree.find("target")
         f = target.find("format")
         if f is not None:
             format_row = propertyRow("Format")
             format_row.set_subtitle(f.get("type"))
-            self.add_row(format_row)
+            self.__addDetailRow__(format_row)
 
         permissions = target.find("permissions")
         if permissions is not None:
@@ -88,10 +166,10 @@ class PoolVolumeRow(Adw.ExpanderRow):
             perms_box = PoolPermissionsBox(lambda *x: None, sensitive=False)
             perms_box.connectData(permissions)
             perms_row.addChild(perms_box)
-            self.add_row(perms_row)
+            self.__addDetailRow__(perms_row)
 
         self.action_row = Adw.ActionRow()
-        self.add_row(self.action_row)
+        self.__addDetailRow__(self.action_row)
 
         wipe_btn = iconButton(
             "Wipe", "eraser-symbolic", self.__onWipeClicked__, css_classes=["flat"]
@@ -108,49 +186,87 @@ class PoolVolumeRow(Adw.ExpanderRow):
         )
         self.action_row.add_suffix(download_btn)
 
-        self.__loadUsageStats__()
-
-    def __loadUsageStats__(self):
-        """Show the usage of the volume."""
-
-        def loadStats():
-            capacity = self.volume.getCapacity()
-            allocated = self.volume.getAllocation()
-
-            fill_fraction = 0
-            if capacity > 0:
-                fill_fraction = allocated / capacity
+        upload_btn = iconButton(
+            "Upload",
+            "folder-upload-symbolic",
+            self.__onUploadClicked__,
+            css_classes=["flat"],
+        )
+        self.action_row.add_suffix(upload_btn)
 
-            text = f"{ bytesToString(allocated)} / { bytesToString(capacity) }"
-            return (fill_fraction, text, capacity)
+        copy_btn = iconButton(
+            "Copy",
+            "copy-symbolic",
+            self.__onCopyClicked__,
+            css_classes=["flat"],
+        )
+        self.action_row.add_suffix(copy_btn)
+
+    def __showUsage__(self):
+        """Show the usage of the volume from the loaded info."""
+        if not self.volume.hasInfo():
+            # Not loaded or changed, shown once it was loaded in the background
+            self.usage_progress.set_fraction(0)
+            self.usage_progress.set_text("…")
+            self.__loadUsageStats__()
+            return
+
+        capacity = self.volume.getCapacity()
+        allocated = self.volume.getAllocation()
+
+        fill_fraction = 0
+        if capacity > 0:
+            fill_fraction = allocated / capacity
+
+        self.usage_progress.set_fraction(min(1, fill_fraction))
+        self.usage_progress.set_text(
+            f"{ bytesToString(allocated)} / { bytesToString(capacity) }"
+        )
+        if self.capacity_row is not None:
+            self.capacity_row.set_text(bytesToString(capacity))
+            self.capacity_row.set_show_apply_button(False)
 
-        def showStats(res):
-            self.usage_progress.set_fraction(min(1, res[0]))
-            self.usage_progress.set_text(res[1])
+    def __loadUsageStats__(self):
+        """Load the usage of the volume again and show it."""
+        volume = self.volume
 
-            self.capacity_row.set_text(bytesToString(res[2]))
-            self.capacity_row.set_show_apply_button(False)
+        def showStats(_):
+            if self.volume is volume:
+                self.__showUsage__()
 
-        asyncJob(loadStats, [], showStats)
+        asyncJob(volume.refreshInfo, [], showStats, queue=volume.pool.connection.url)
 
     def __applyCapacityChange__(self, *_):
         """As the capacity is the only parameter to be changed for a volume,
         this handler handles the entry changing directly.
         """
-        description = self.capacity_row.get_text()
+        volume = self.volume
         try:
-            b = stringToBytes(description)
-            self.volume.setCapacity(b)
+            new_capacity = stringToBytes(self.capacity_row.get_text())
         except Exception as e:
             self.window_ref.window.pushToastText(str(e))
-
-        self.capacity_row.set_text(bytesToString(self.volume.getCapacity()))
-        self.capacity_row.set_show_apply_button(False)
-
-        self.__loadUsageStats__()
+            self.__showUsage__()
+            return
+
+        def finish(_):
+            if self.volume is not volume:
+                return
+            if self.capacity_row is not None:
+                self.capacity_row.set_sensitive(True)
+            self.__showUsage__()
+
+        self.capacity_row.set_sensitive(False)
+        failableAsyncJob(
+            volume.setCapacity,
+            [new_capacity],
+            lambda e: self.window_ref.window.pushToastText(str(e)),
+            finish,
+            queue=volume.pool.connection.url,
+        )
 
     def __onDeleteClicked__(self, btn):
         """Delete this volume."""
+        volume = self.volume
 
         def finish(res: ResultWrapper):
             btn.set_sensitive(True)
@@ -162,14 +278,15 @@ class PoolVolumeRow(Adw.ExpanderRow):
             btn.set_sensitive(False)
 
             failableAsyncJob(
-                self.volume.delete,
+                volume.delete,
                 [],
                 lambda e: self.window_ref.window.pushToastText(str(e)),
                 finish,
+                queue=volume.pool.connection.url,
             )
 
         dialog = selectDialog(
-            f'Delete "{ self.volume.getName() }"?',
+            f'Delete "{ volume.getName() }"?',
             "The volume will be deleted permanently",
             [
                 ActionOption(
@@ -183,6 +300,7 @@ class PoolVolumeRow(Adw.ExpanderRow):
 
     def __onWipeClicked__(self, btn):
         """Erase this volume."""
+        volume = self.volume
 
         def finish(res: ResultWrapper):
             btn.set_sensitive(True)
@@ -190,18 +308,21 @@ class PoolVolumeRow(Adw.ExpanderRow):
             self.window_ref.window.pushToastText(
                 "Volume was wiped" if not res.failed else "Wiping volume failed"
             )
+            if self.volume is volume:
+                self.__showUsage__()
 
         def wipe():
             btn.set_sensitive(False)
             failableAsyncJob(
-                self.volume.wipe,
+                volume.wipe,
                 [],
                 lambda e: self.window_ref.window.pushToastText(str(e)),
                 finish,
+                queue=volume.pool.connection.url,
             )
 
         dialog = selectDialog(
-            f'Wipe volume "{ self.volume.getName() }"?',
+            f'Wipe volume "{ volume.getName() }"?',
             "The volume's contents will be erased permanently",
             [
                 ActionOption(
@@ -215,4 +336,56 @@ class PoolVolumeRow(Adw.ExpanderRow):
 
     def __onDownloadClicked__(self, _):
         """Download this volume."""
-        DownloadVolumeDialog(self.window_ref.window, self.volume)
+        volume = self.volume
+
+        def onFolderSelected(dialog, result):
+            folder = dialog.select_folder_finish(result)
+            if folder is None:
+                pass
+            else:
+                getTransferManager().download(
+                    volume, f"{ folder.get_path() }/{ volume.getName() }"
+                )
+                self.window_ref.window.pushToastText(
+                    f'Download of "{ volume.getName() }" queued'
+                )
+
+        # Present dialog to pick saving location
+        dialog = Gtk.FileDialog(title="Select download location")
+        dialog.select_folder(self.window_ref.window, None, onFolderSelected)
+
+    def __onUploadClicked__(self, _):
+        """Upload a local file into this volume."""
+        volume = self.volume
+
+        def onFileSelected(dialog, result):
+            file = dialog.open_finish(result)
+            if file is None:
+                pass
+            else:
+                getTransferManager().upload(volume, file.get_path())
+                self.window_ref.window.pushToastText(
+                    f'Upload into "{ volume.getName() }" queued'
+                )
+
+        def upload():
+            # Present dialog to pick the file
+            dialog = Gtk.FileDialog(title="Select file to upload")
+            dialog.open(self.window_ref.window, None, onFileSelected)
+
+        dialog = selectDialog(
+            f'Overwrite "{ volume.getName() }"?',
+            "The volume's contents will be replaced by the uploaded file",
+            [
+                ActionOption(
+                    "Upload",
+                    upload,
+                    appearance=Adw.ResponseAppearance.DESTRUCTIVE,
+                )
+            ],
+        )
+        dialog.present(self.window_ref.window)
+
+    def __onCopyClicked__(self, _):
+        """Copy this volume into another volume, possibly on another host."""
+        CopyVolumeDialog(self.window_ref.window, self.volume)
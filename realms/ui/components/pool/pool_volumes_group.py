@@ -13,37 +13,54 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
-from gi.repository import Adw, Gtk
+from gi.repository import Adw, Gio, Gtk
 
-from realms.libvirt_wrap import Pool, Volume
+from realms.libvirt_wrap import Pool, loadVolumes
 from realms.ui.components.common import iconButton
+from realms.ui.components.preference_widgets import realmsClamp
 from realms.ui.dialogs.add_volume_dialog import AddVolumeDialog
 from realms.ui.window_reference import WindowReference
 
-from .pool_volume_row import PoolVolumeRow
+from .pool_volume_row import PoolVolumeItem, PoolVolumeRow
 
 
-class VolumesGroup(Adw.PreferencesGroup):
-    """Preferences group containing all volume rows in the pool details tab."""
+class VolumesGroup(Gtk.Box):
+    """List of all volumes in the pool details tab. The volumes are kept in
+    a list model, only the visible ones get a row."""
 
     def __init__(
         self, pool: Pool, show_apply_cb: callable, window_ref: WindowReference
     ):
-        super().__init__()
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, vexpand=True)
 
         self.pool = pool
         self.show_apply_cb = show_apply_cb
         self.window_ref = window_ref
         self.vol_refresh_btn = None
+        self.count_label = None
 
-        self.rows = []
+        self.items = {}  # Dict from volume name to item
+        self.store = Gio.ListStore(item_type=PoolVolumeItem)
 
         self.__build__()
 
     def __build__(self):
-        self.set_title("Volumes")
+        header_clamp = realmsClamp()
+        self.append(header_clamp)
+
+        box = Gtk.Box(spacing=6, margin_top=12, margin_bottom=6)
+        header_clamp.set_child(box)
+
+        title_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, hexpand=True)
+        title_box.append(
+            Gtk.Label(label="Volumes", css_classes=["heading"], halign=Gtk.Align.START)
+        )
+        self.count_label = Gtk.Label(
+            css_classes=["dim-label", "caption"], halign=Gtk.Align.START
+        )
+        title_box.append(self.count_label)
+        box.append(title_box)
 
-        box = Gtk.Box(spacing=6)
         add_vol_btn = iconButton(
             "",
             "list-add-symbolic",
@@ -62,27 +79,68 @@ class VolumesGroup(Adw.PreferencesGroup):
         )
         box.append(self.vol_refresh_btn)
 
-        self.set_header_suffix(box)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self.__onSetupRow__)
+        factory.connect("bind", lambda _, li: li.get_child().bind(li.get_item()))
+        factory.connect("unbind", lambda _, li: li.get_child().unbind())
+
+        list_view = Gtk.ListView(
+            model=Gtk.NoSelection(model=self.store),
+            factory=factory,
+            show_separators=True,
+            margin_bottom=12,
+        )
+
+        # The list view has to be the scrollable child to only create
+        # rows for the visible volumes
+        self.append(
+            Gtk.ScrolledWindow(
+                hscrollbar_policy=Gtk.PolicyType.NEVER,
+                vexpand=True,
+                child=Adw.ClampScrollable(
+                    tightening_threshold=400,
+                    maximum_size=750,
+                    margin_start=12,
+                    margin_end=12,
+                    child=list_view,
+                ),
+            )
+        )
+
+    def __onSetupRow__(self, _, list_item: Gtk.ListItem):
+        list_item.set_activatable(False)
+        list_item.set_child(PoolVolumeRow(self.window_ref))
 
     def __onAddClicked__(self, *_):
         AddVolumeDialog(self.window_ref.window, self.pool)
 
+    def dropVolumes(self):
+        """Remove the listed volumes, i.e. when their handles became invalid.
+        Expanded rows are opened again once the volumes are listed again."""
+        self.store.remove_all()
+        self.count_label.set_label("")
+
     def onRefreshClicked(self, refresh=True):
         """Refresh the list of volumes and display it."""
-        for row in self.rows:
-            self.remove(row)
-        self.rows.clear()
-
-        def finish(vir_volumes):
-            vir_volumes = sorted(vir_volumes, key=lambda el: el.name())
-            for vir_volume in vir_volumes:
-                vol = Volume(self.pool, vir_volume)
-                row = PoolVolumeRow(vol, self.window_ref)
-                self.add(row)
-                self.rows.append(row)
+
+        def finish(volumes):
+            items = {}
+            for volume in volumes:
+                item = PoolVolumeItem(volume)
+                old_item = self.items.get(volume.getName())
+                if old_item is not None:
+                    # Keep expanded rows open, their details are reloaded
+                    item.expanded = old_item.expanded
+                items[volume.getName()] = item
+
+            self.items = items
+            self.store.splice(0, self.store.get_n_items(), list(items.values()))
+            self.count_label.set_label(
+                "1 volume" if len(items) == 1 else f"{ len(items) } volumes"
+            )
 
             self.vol_refresh_btn.set_sensitive(True)
 
         self.vol_refresh_btn.set_sensitive(False)
 
-        self.pool.listVolumes(finish, refresh=refresh)
+        loadVolumes(self.pool, finish, refresh=refresh)
@@ -13,15 +13,24 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
-"""Build the main row inside the main window's sidebar,
-one for each connection."""
+"""Build the main window's sidebar, with one part
+for each connection."""
 
 import libvirt
-from gi.repository import Adw, Gtk, Pango
+from gi.repository import Adw, Gio, GObject, Gtk, Pango
 
-from realms.libvirt_wrap import Connection, Domain, Network, Pool
+from realms.libvirt_wrap import Connection, Domain, DomainRecord, Network, Pool
 from realms.libvirt_wrap.constants import *
-from realms.ui.rows import DomainRow, NetworkRow, PoolRow
+from realms.ui.rows import (
+    BaseRow,
+    BaseRowItem,
+    DomainItem,
+    DomainRow,
+    NetworkItem,
+    NetworkRow,
+    PoolItem,
+    PoolRow,
+)
 from realms.ui.rows.row_sorting import rowSortingFunc
 from realms.ui.tabs import ConnectionDetailsTab
 
@@ -43,7 +52,8 @@ def buildQuickAction(icon: str, tooltip: str, clicked_cb) -> Gtk.Button:
 
 
 def buildSubExpander(title: str, expanded=False) -> Gtk.Expander:
-    """Build an expander inside of each domains, networks and storage pools are listed."""
+    """Build an expander that shows or hides the list of domains, networks or
+    storage pools below it."""
     expander = Gtk.Expander(expanded=expanded, resize_toplevel=False)
     label = Gtk.Label(
         label=title,
@@ -57,30 +67,141 @@ def buildSubExpander(title: str, expanded=False) -> Gtk.Expander:
     return expander
 
 
-def buildSubListbox() -> Gtk.ListBox:
-    """Builds the listbox used for listing domains, pool and networks"""
+class SidebarWidgetItem(GObject.Object):
+    """Sidebar item that always shows the same widget, i.e. the header of a
+    connection or of one of its lists."""
 
-    def onSubRowActivated(_, row):
-        row.onActivate()
+    def __init__(self, widget: Gtk.Widget):
+        super().__init__()
+        self.widget = widget
 
-    listbox = Gtk.ListBox(
-        show_separators=False,
+
+def buildWidgetModel(widget: Gtk.Widget) -> Gio.ListStore:
+    """Build a list model holding only the given widget's item."""
+    store = Gio.ListStore(item_type=SidebarWidgetItem)
+    store.append(SidebarWidgetItem(widget))
+    return store
+
+
+# Row widget to show each kind of item with
+ROW_TYPES = {PoolItem: PoolRow, NetworkItem: NetworkRow, DomainItem: DomainRow}
+
+
+def buildSidebarView(window: Adw.ApplicationWindow) -> tuple:
+    """Build the list view of the main window's sidebar. It shows the models
+    of all connections flattened into one list, so that the sidebar scrolls
+    as a whole and rows only exist for the visible items.
+
+    Args:
+        window (Adw.ApplicationWindow): Main window
+
+    Returns:
+        tuple: The list view, and the store to add each ConnectionRow.model to
+    """
+    connections = Gio.ListStore(item_type=Gio.ListModel)
+    model = Gtk.FlattenListModel(model=connections)
+
+    def onBind(_, list_item: Gtk.ListItem):
+        item = list_item.get_item()
+        if isinstance(item, SidebarWidgetItem):
+            list_item.set_activatable(False)
+            list_item.set_child(item.widget)
+            return
+
+        list_item.set_activatable(True)
+        row_type = ROW_TYPES[type(item)]
+        row = list_item.get_child()
+        if not isinstance(row, row_type):
+            row = row_type(window)
+            list_item.set_child(row)
+        row.bind(item)
+
+    def onUnbind(_, list_item: Gtk.ListItem):
+        child = list_item.get_child()
+        if isinstance(child, BaseRow):
+            child.unbind()
+        else:
+            # Header widgets belong to their item, release them so that
+            # another list item can show them.
+            list_item.set_child(None)
+
+    def onActivate(_, position: int):
+        item = model.get_item(position)
+        if isinstance(item, BaseRowItem):
+            item.onActivate()
+
+    factory = Gtk.SignalListItemFactory()
+    factory.connect("bind", onBind)
+    factory.connect("unbind", onUnbind)
+
+    list_view = Gtk.ListView(
+        model=Gtk.NoSelection(model=model),
+        factory=factory,
+        single_click_activate=True,
         css_classes=["navigation-sidebar"],
-        selection_mode=Gtk.SelectionMode.NONE,
     )
-    listbox.connect("row-activated", onSubRowActivated)
-
-    listbox.set_sort_func(rowSortingFunc)
+    list_view.connect("activate", onActivate)
+
+    return list_view, connections
+
+
+class SubList:
+    """Sorted list of the domains, networks or storage pools of a connection.
+    The items are kept in a list model, only the visible ones get a row.
+    """
+
+    def __init__(self):
+        self.items = {}  # Dict from uuid to item
+        self.store = Gio.ListStore(item_type=BaseRowItem)
+
+    def get(self, uuid: str) -> BaseRowItem:
+        """Get the item of an object, or None"""
+        return self.items.get(uuid)
+
+    def add(self, uuid: str, item: BaseRowItem):
+        """Insert an item at its sorted position."""
+        item.sort_changed_cb = self.__onSortChanged__
+        self.items[uuid] = item
+        self.store.insert_sorted(item, rowSortingFunc)
+
+    def remove(self, uuid: str):
+        """Remove the item of an object, if it exists."""
+        item = self.items.pop(uuid, None)
+        if item is None:
+            return
+        found, position = self.store.find(item)
+        if found:
+            self.store.remove(position)
+
+    def reset(self, items: dict):
+        """Replace all items at once.
+
+        Args:
+            items (dict): Dict from uuid to item
+        """
+        for item in items.values():
+            item.sort_changed_cb = self.__onSortChanged__
+        self.items = items
+        self.store.splice(
+            0,
+            self.store.get_n_items(),
+            sorted(items.values(), key=lambda i: i.getSortingTitle()),
+        )
 
-    return listbox
+    def __onSortChanged__(self, item: BaseRowItem):
+        """Move an item whose title changed."""
+        found, position = self.store.find(item)
+        if found:
+            self.store.remove(position)
+            self.store.insert_sorted(item, rowSortingFunc)
 
 
-class ConnectionRow(Gtk.ListBoxRow):
-    """Large "row" for the navigation sidebar. Represent an individual connection."""
+class ConnectionRow:
+    """Part of the navigation sidebar that represents an individual connection.
+    Its model holds the connection's header, followed by the header and items
+    of each list."""
 
     def __init__(self, conn_settings: dict, window: Adw.ApplicationWindow):
-        super().__init__(focusable=False)
-
         self.connection = None
         self.window = None
 
@@ -94,13 +215,16 @@ class ConnectionRow(Gtk.ListBoxRow):
         self.network_expander = None
         self.domain_expander = None
 
-        self.storage_listbox = None
-        self.network_listbox = None
-        self.domain_listbox = None
+        self.storage_list = None
+        self.network_list = None
+        self.domain_list = None
 
-        self.storage_rows = {}  # Dict from uuid to storage-row
-        self.network_rows = {}  # Dict from uuid to network-row
-        self.domain_rows = {}  # Dict from uuid to domain-row
+        self.model = None
+        self.sections = None  # Store of the models shown in self.model
+        self.header_model = None
+        self.expander_models = {}  # Dict from expander to its model
+        self.__shown_models__ = []
+        self.__show_lists__ = False
 
         self.window = window
         self.connection = Connection(conn_settings)
@@ -109,20 +233,15 @@ class ConnectionRow(Gtk.ListBoxRow):
         self.build()
 
         if self.connection.autoconnect:
-            self.connection.tryConnect()
+            self.connection.tryConnect(queued=True)
 
         self.setStatus()
 
     def build(self):
         """Build self."""
-        self.set_activatable(False)
-        self.set_css_classes(["frame"])
-        self.set_margin_bottom(6)
-
-        # Main Box with the subexpanders
+        # Header box with name and quick actions
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
-        box.set_margin_bottom(6)
-        self.set_child(box)
+        box.set_margin_top(6)
 
         # Label widget
         label_box = Gtk.Box(
@@ -178,43 +297,90 @@ class ConnectionRow(Gtk.ListBoxRow):
             self.quick_action_box.append(widget)
 
         self.storage_expander = buildSubExpander("Storage Pools", False)
-        self.storage_listbox = buildSubListbox()
-        self.storage_expander.set_child(self.storage_listbox)
-        box.append(self.storage_expander)
+        self.storage_list = SubList()
 
         self.network_expander = buildSubExpander("Networks", False)
-        self.network_listbox = buildSubListbox()
-        self.network_expander.set_child(self.network_listbox)
-        box.append(self.network_expander)
+        self.network_list = SubList()
 
         self.domain_expander = buildSubExpander("Domains", True)
-        self.domain_listbox = buildSubListbox()
-        self.domain_expander.set_child(self.domain_listbox)
-        self.domain_expander.set_expanded(True)
-        box.append(self.domain_expander)
+        self.domain_list = SubList()
+
+        self.header_model = buildWidgetModel(box)
+        for expander in [
+            self.storage_expander,
+            self.network_expander,
+            self.domain_expander,
+        ]:
+            self.expander_models[expander] = buildWidgetModel(expander)
+            expander.connect("notify::expanded", lambda *_: self.updateSections())
+
+        self.sections = Gio.ListStore(item_type=Gio.ListModel)
+        self.model = Gtk.FlattenListModel(model=self.sections)
 
         self.setStatus()
 
+    def updateSections(self):
+        """Show the header of each list while connected, and the items of
+        the expanded lists. Only the models that changed are replaced, so
+        the other rows stay bound."""
+        models = [self.header_model]
+        if self.__show_lists__:
+            for expander, sub_list in [
+                (self.storage_expander, self.storage_list),
+                (self.network_expander, self.network_list),
+                (self.domain_expander, self.domain_list),
+            ]:
+                models.append(self.expander_models[expander])
+                if expander.get_expanded():
+                    models.append(sub_list.store)
+
+        old = self.__shown_models__
+        if len(old) == len(models) and all(a is b for a, b in zip(old, models)):
+            return  # setStatus runs on every event, mostly nothing changes
+
+        start = 0
+        while start < min(len(old), len(models)) and old[start] is models[start]:
+            start += 1
+        end = 0
+        while (
+            end < min(len(old), len(models)) - start
+            and old[-1 - end] is models[-1 - end]
+        ):
+            end += 1
+
+        self.__shown_models__ = models
+        self.sections.splice(
+            start, len(old) - start - end, models[start : len(models) - end]
+        )
+
     def buildNetworkRows(self):
         """Build the network sub-rows."""
 
-        def finish(vir_networks: list[libvirt.virNetwork]):
-            self.network_listbox.remove_all()
-            self.network_rows.clear()
-            for vnet in vir_networks:
-                self.addNetwork(vnet)
+        def finish(titles: list[tuple[libvirt.virNetwork, str]]):
+            self.network_list.reset(
+                {
+                    vnet.UUIDString(): NetworkItem(
+                        Network(self.connection, vnet, title), self.window
+                    )
+                    for vnet, title in titles
+                }
+            )
 
         if self.connection.isConnected():
-            self.connection.listNetworks(finish)
+            self.connection.listNetworkTitles(finish)
 
     def buildPoolRows(self):
         """Build the pool sub-rows."""
 
         def finish(vir_pools: list[libvirt.virStoragePool]):
-            self.storage_listbox.remove_all()
-            self.storage_rows.clear()
-            for pool in vir_pools:
-                self.addPool(pool)
+            self.storage_list.reset(
+                {
+                    pool.UUIDString(): PoolItem(
+                        Pool(self.connection, pool), self.window
+                    )
+                    for pool in vir_pools
+                }
+            )
 
         if self.connection.isConnected():
             self.connection.listStoragePools(finish)
@@ -222,14 +388,39 @@ class ConnectionRow(Gtk.ListBoxRow):
     def buildDomainRows(self):
         """Build the domain sub-rows."""
 
-        def finish(vir_domains: list[libvirt.virDomain]):
-            self.domain_listbox.remove_all()
-            self.domain_rows.clear()
-            for dom in vir_domains:
-                self.addDomain(dom)
+        def finish(records: list[tuple[libvirt.virDomain, DomainRecord]]):
+            self.domain_list.reset(
+                {
+                    dom.UUIDString(): DomainItem(
+                        Domain(self.connection, dom, record), self.window
+                    )
+                    for dom, record in records
+                }
+            )
 
         if self.connection.isConnected():
-            self.connection.listDomains(finish)
+            self.connection.listDomainRecords(finish)
+
+    def resyncRows(self):
+        """Add rows for the objects that were defined while reconnecting.
+        Rows of objects that disappeared meanwhile remove themselves."""
+
+        def finishNetworks(titles: list[tuple[libvirt.virNetwork, str]]):
+            for vnet, title in titles:
+                self.addNetwork(vnet, display_name=title)
+
+        def finishPools(vir_pools: list[libvirt.virStoragePool]):
+            for pool in vir_pools:
+                self.addPool(pool)
+
+        def finishDomains(records: list[tuple[libvirt.virDomain, DomainRecord]]):
+            for dom, record in records:
+                self.addDomain(dom, record=record)
+
+        if self.connection.isConnected():
+            self.connection.listNetworkTitles(finishNetworks)
+            self.connection.listStoragePools(finishPools)
+            self.connection.listDomainRecords(finishDomains)
 
     def handleConnectionEvents(self, conn, obj, type_id, event_id, detail_id):
         """Handle general events."""
@@ -246,6 +437,8 @@ class ConnectionRow(Gtk.ListBoxRow):
                 self.buildPoolRows()
                 self.buildDomainRows()
                 self.quick_actions["connect"].set_sensitive(True)
+            elif event_id == CONNECTION_EVENT_RECONNECTED:
+                self.resyncRows()
             elif event_id == CONNECTION_EVENT_CONNECTION_FAILED:
                 self.window.pushToastText(
                     f"Failed to connect to { self.connection.url } ('{ self.connection.name }')"
@@ -260,10 +453,7 @@ class ConnectionRow(Gtk.ListBoxRow):
 
         elif type_id == CALLBACK_TYPE_NETWORK_GENERIC:
             if event_id == NETWORK_EVENT_DELETED:
-                uuid = obj.UUIDString()
-                row = self.network_rows.pop(uuid)
-                self.network_listbox.remove(row)
-                print("removed row")
+                self.network_list.remove(obj.UUIDString())
             elif event_id == NETWORK_EVENT_ADDED:
                 self.addNetwork(obj, open_tab=True)
 
@@ -275,10 +465,7 @@ class ConnectionRow(Gtk.ListBoxRow):
 
         elif type_id == CALLBACK_TYPE_POOL_GENERIC:
             if event_id == POOL_EVENT_DELETED:
-                uuid = obj.UUIDString()
-                row = self.storage_rows.pop(uuid)
-                self.storage_listbox.remove(row)
-                print("removed row")
+                self.storage_list.remove(obj.UUIDString())
             elif event_id == POOL_EVENT_ADDED:
                 self.addPool(obj, open_tab=True)
 
@@ -290,10 +477,7 @@ class ConnectionRow(Gtk.ListBoxRow):
 
         elif type_id == CALLBACK_TYPE_DOMAIN_GENERIC:
             if event_id == DOMAIN_EVENT_DELETED:
-                uuid = obj.UUIDString()
-                row = self.domain_rows.pop(uuid)
-                self.domain_listbox.remove(row)
-                print("removed row")
+                self.domain_list.remove(obj.UUIDString())
             elif event_id == DOMAIN_EVENT_ADDED:
                 self.addDomain(obj, open_tab=True)
 
@@ -333,9 +517,7 @@ class ConnectionRow(Gtk.ListBoxRow):
             self.loading_spinner.set_visible(False)
             self.loading_spinner.stop()
 
-            self.storage_expander.set_visible(True)
-            self.network_expander.set_visible(True)
-            self.domain_expander.set_visible(True)
+            self.__show_lists__ = True
         elif state == CONNECTION_STATE_CONNECTING:
             self.quick_actions["add-dom"].set_visible(False)
             self.quick_actions["add-net"].set_visible(False)
@@ -349,9 +531,19 @@ class ConnectionRow(Gtk.ListBoxRow):
             self.loading_spinner.set_visible(True)
             self.loading_spinner.start()
 
-            self.storage_expander.set_visible(False)
-            self.network_expander.set_visible(False)
-            self.domain_expander.set_visible(False)
+            self.__show_lists__ = False
+        elif state == CONNECTION_STATE_RECONNECTING:
+            # Keep showing the rows, they will be rebound once reconnected
+            self.quick_actions["add-dom"].set_visible(False)
+            self.quick_actions["add-net"].set_visible(False)
+            self.quick_actions["add-pool"].set_visible(False)
+            self.quick_actions["edit-conn"].set_visible(True)
+            self.quick_actions["connect"].set_visible(False)
+            self.quick_actions["connect"].set_sensitive(False)
+
+            self.status_icon.set_visible(False)
+            self.loading_spinner.set_visible(True)
+            self.loading_spinner.start()
         else:
             self.quick_actions["add-dom"].set_visible(False)
             self.quick_actions["add-net"].set_visible(False)
@@ -365,9 +557,9 @@ class ConnectionRow(Gtk.ListBoxRow):
             self.loading_spinner.set_visible(False)
             self.loading_spinner.stop()
 
-            self.storage_expander.set_visible(False)
-            self.network_expander.set_visible(False)
-            self.domain_expander.set_visible(False)
+            self.__show_lists__ = False
+
+        self.updateSections()
 
     def onEditConnClicked(self, _):
         """Show the edit-connection tab."""
@@ -396,37 +588,39 @@ class ConnectionRow(Gtk.ListBoxRow):
         """Try to connect."""
         self.connection.tryConnect()
 
-    def addNetwork(self, network: libvirt.virNetwork, open_tab=False) -> None:
-        """Add a network row, but only if necessary"""
+    def addNetwork(
+        self, network: libvirt.virNetwork, open_tab=False, display_name: str = None
+    ) -> None:
+        """Add a network item, but only if necessary"""
         uuid = network.UUIDString()
-        if uuid not in self.network_rows:
-            net = Network(self.connection, network)
-            row = NetworkRow(net, self.window)
-            self.network_listbox.append(row)
-            self.network_rows[uuid] = row
+        if self.network_list.get(uuid) is None:
+            net = Network(self.connection, network, display_name)
+            item = NetworkItem(net, self.window)
+            self.network_list.add(uuid, item)
             if open_tab:
-                row.onActivate()
+                item.onActivate()
 
     def addPool(self, pool: libvirt.virStoragePool, open_tab=False) -> None:
-        """Add a pool row, but only if necessary"""
+        """Add a pool item, but only if necessary"""
         uuid = pool.UUIDString()
-        if uuid not in self.storage_rows:
+        if self.storage_list.get(uuid) is None:
             p = Pool(self.connection, pool)
-            row = PoolRow(p, self.window)
-            self.storage_listbox.append(row)
-            self.storage_rows[uuid] = row
+            item = PoolItem(p, self.window)
+            self.storage_list.add(uuid, item)
             if open_tab:
-                row.onActivate()
+                item.onActivate()
 
-    def addDomain(self, domain: libvirt.virDomain, open_tab=False) -> None:
-        """Add a pool row, but only if necessary"""
+    def addDomain(
+        self, domain: libvirt.virDomain, open_tab=False, record: DomainRecord = None
+    ) -> None:
+        """Add a domain item, but only if necessary"""
         uuid = domain.UUIDString()
-        if uuid not in self.domain_rows:
-            p = Domain(self.connection, domain)
-            row = DomainRow(p, self.window)
-            self.domain_listbox.append(row)
-            self.domain_rows[uuid] = row
+        item = self.domain_list.get(uuid)
+        if item is None:
+            p = Domain(self.connection, domain, record)
+            item = DomainItem(p, self.window)
+            self.domain_list.add(uuid, item)
             if open_tab:
-                row.onActivate()
+                item.onActivate()
         elif open_tab:
-            self.domain_rows[uuid].onActivate()
+            item.onActivate()
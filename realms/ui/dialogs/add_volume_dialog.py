@@ -77,7 +77,7 @@ class AddVolumeDialog:
         self.name_row = BindableEntryRow(title="Name")
         prefs_group.add(self.name_row)
 
-        volume_formats = self.pool.pool_capabilities.volume_formats
+        volume_formats = self.pool.connection.getPoolCapabilities().volume_formats
         format_types = volume_formats[self.pool.getETree().get("type")]
         if format_types is not None:
             self.format_row = Adw.ComboRow(
@@ -140,7 +140,7 @@ class AddVolumeDialog:
             permissions = ET.SubElement(target, "permissions")
         self.perms_box.connectData(permissions)
 
-        volume_formats = self.pool.pool_capabilities.volume_formats
+        volume_formats = self.pool.connection.getPoolCapabilities().volume_formats
         format_types = volume_formats[self.pool.getETree().get("type")]
         if format_types is not None:
             f = target.find("format")
@@ -187,11 +187,21 @@ class AddVolumeDialog:
 
             if self.__obj__("main-stack").get_visible_child_name() != "xml":
                 failableAsyncJob(
-                    self.pool.addVolume, [self.tree], onFailed, onSucceeded
+                    self.pool.addVolume,
+                    [self.tree],
+                    onFailed,
+                    onSucceeded,
+                    queue=self.pool.connection.url,
                 )
             else:
                 xml = sourceViewGetText(self.xml_view)
-                failableAsyncJob(self.pool.addVolumeXML, [xml], onFailed, onSucceeded)
+                failableAsyncJob(
+                    self.pool.addVolumeXML,
+                    [xml],
+                    onFailed,
+                    onSucceeded,
+                    queue=self.pool.connection.url,
+                )
 
         except Exception as e:
             simpleErrorDialog("Invalid settings", str(e), self.window)
@@ -229,7 +239,7 @@ class AddVolumeDialog:
             sourceViewSetText(self.xml_view, xml)
 
     def __onFormatChanged__(self, *args):
-        volume_formats = self.pool.pool_capabilities.volume_formats
+        volume_formats = self.pool.connection.getPoolCapabilities().volume_formats
         format_types = volume_formats[self.pool.getETree().get("type")]
         selected = self.format_row.get_selected()
 
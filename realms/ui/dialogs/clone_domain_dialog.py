@@ -247,7 +247,9 @@ class CloneDomainDialog:
         self.__obj__("main-stack").set_visible_child_name("spinner-page")
 
         self.dialog.set_can_close(False)
-        failableAsyncJob(self.__cloneDomain__, [], onFail, onDone)
+        failableAsyncJob(
+            self.__cloneDomain__, [], onFail, onDone, queue=self.domain.connection.url
+        )
 
     def __obj__(self, name: str):
         o = self.builder.get_object(name)
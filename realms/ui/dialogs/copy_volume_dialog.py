@@ -0,0 +1,130 @@
+# Realms, a libadwaita libvirt client.
+# Copyright (C) 2025
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from gi.repository import Adw, Gtk
+
+from realms.libvirt_wrap import Pool, Volume, getTransferManager
+from realms.libvirt_wrap.constants import *
+from realms.ui.components import ActionOption, selectDialog
+from realms.ui.components.generic_preferences_row import GenericPreferencesRow
+from realms.ui.components.volume_chooser import VolumeChooser
+
+
+class CopyVolumeDialog:
+    """Dialog to copy a volume into a volume of any connected host."""
+
+    def __init__(self, window: Adw.ApplicationWindow, volume: Volume):
+        self.window = window
+        self.volume = volume
+        self.connections = [c for c in window.getConnections() if c.isConnected()]
+        self.chooser = None
+
+        self.volume.pool.registerCallback(self.onConnectionEvent)
+
+        # Create a Builder
+        self.builder = Gtk.Builder.new_from_resource(
+            "/com/github/marreitin/realms/gtk/copyvol.ui"
+        )
+
+        # Obtain and show the main window
+        self.dialog = self.obj("main-dialog")
+        self.dialog.connect("closed", self.onDialogClosed)
+        self.obj("btn-finish").connect("clicked", self.onCopyClicked)
+
+        self.chooser_row = GenericPreferencesRow()
+        self.obj("target-group").add(self.chooser_row)
+
+        connection_row = self.obj("connection-row")
+        connection_row.set_model(
+            Gtk.StringList(strings=[c.name for c in self.connections])
+        )
+        # Preselect another host, that's what copying is mostly for
+        for i, connection in enumerate(self.connections):
+            if connection != self.volume.pool.connection:
+                connection_row.set_selected(i)
+                break
+        connection_row.connect("notify::selected", self.__onConnectionSelected__)
+        self.__onConnectionSelected__()
+
+        self.dialog.present(self.window)
+
+    def __onConnectionSelected__(self, *_):
+        """Show the pools and volumes of the selected connection."""
+        if self.chooser is not None:
+            self.chooser_row.removeChild(self.chooser)
+            self.chooser = None
+
+        selected = self.obj("connection-row").get_selected()
+        if selected >= len(self.connections):
+            return
+
+        self.chooser = VolumeChooser(
+            self.window, self.connections[selected], lambda: None
+        )
+        self.chooser_row.addChild(self.chooser)
+
+    def onCopyClicked(self, _):
+        if self.chooser is None:
+            return
+        try:
+            vir_pool = self.chooser.getPool()
+            vir_volume = self.chooser.getVolume()
+        except (IndexError, TypeError):
+            self.window.pushToastText("Select a target volume")
+            return
+
+        connection = self.connections[self.obj("connection-row").get_selected()]
+        if (
+            connection == self.volume.pool.connection
+            and vir_volume.key() == self.volume.volume.key()
+        ):
+            self.window.pushToastText("A volume can't be copied into itself")
+            return
+
+        # The target's pool wrapper is only needed for the copy, it doesn't
+        # need any events
+        target = Volume(Pool(connection, vir_pool, subscribe=False), vir_volume)
+
+        def copy():
+            getTransferManager().copy(self.volume, target)
+            self.window.pushToastText(f'Copy of "{ self.volume.getName() }" queued')
+            self.dialog.close()
+
+        dialog = selectDialog(
+            f'Overwrite "{ target.getName() }"?',
+            "The volume's contents will be replaced by the copied volume",
+            [
+                ActionOption(
+                    "Copy",
+                    copy,
+                    appearance=Adw.ResponseAppearance.DESTRUCTIVE,
+                )
+            ],
+        )
+        dialog.present(self.dialog)
+
+    def obj(self, name: str):
+        o = self.builder.get_object(name)
+        if o is None:
+            raise NotImplementedError(f"Object { name } could not be found!")
+        return o
+
+    def onConnectionEvent(self, conn, obj, type_id, event_id, detail_id):
+        if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
+            if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
+                self.dialog.close()
+
+    def onDialogClosed(self, *_):
+        self.volume.pool.unregisterCallback(self.onConnectionEvent)
@@ -86,6 +86,7 @@ class TakeSnapshotDialog:
             [ET.tostring(tree, encoding="unicode")],
             onFail,
             onDone,
+            queue=self.domain.connection.url,
         )
 
     def obj(self, name: str):
@@ -0,0 +1,186 @@
+# Realms, a libadwaita libvirt client.
+# Copyright (C) 2025
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import os
+
+from gi.repository import Adw, Gtk
+
+from realms.helpers import bytesToString
+from realms.libvirt_wrap import (
+    TRANSFER_KIND_DOWNLOAD,
+    TRANSFER_KIND_UPLOAD,
+    TRANSFER_STATE_CANCELLED,
+    TRANSFER_STATE_DONE,
+    TRANSFER_STATE_FAILED,
+    TRANSFER_STATE_PAUSED,
+    TRANSFER_STATE_QUEUED,
+    TRANSFER_STATE_RUNNING,
+    Transfer,
+    getTransferManager,
+)
+from realms.ui.components.common import iconButton
+
+
+class TransferRow(Adw.ActionRow):
+    """Row showing the progress of one transfer."""
+
+    def __init__(self, transfer: Transfer):
+        if transfer.kind == TRANSFER_KIND_DOWNLOAD:
+            subtitle = f"Download - { os.path.basename(transfer.filename) }"
+        elif transfer.kind == TRANSFER_KIND_UPLOAD:
+            subtitle = f"Upload - { os.path.basename(transfer.filename) }"
+        else:
+            target = transfer.target
+            subtitle = f"Copy - { target.getName() } on { target.pool.connection.name }"
+        super().__init__(title=transfer.name, subtitle=subtitle)
+        self.transfer = transfer
+
+        self.progress = Gtk.ProgressBar(
+            valign=Gtk.Align.CENTER, show_text=True, width_request=220
+        )
+        self.add_suffix(self.progress)
+
+        self.cancel_btn = iconButton(
+            "",
+            "cross-large-symbolic",
+            lambda *_: getTransferManager().cancel(self.transfer),
+            css_classes=["flat"],
+            tooltip_text="Cancel",
+            valign=Gtk.Align.CENTER,
+        )
+        self.add_suffix(self.cancel_btn)
+
+        self.resume_btn = iconButton(
+            "",
+            "play-symbolic",
+            lambda *_: getTransferManager().resume(self.transfer),
+            css_classes=["flat"],
+            tooltip_text="Resume",
+            valign=Gtk.Align.CENTER,
+        )
+        self.add_suffix(self.resume_btn)
+
+        self.remove_btn = iconButton(
+            "",
+            "user-trash-symbolic",
+            lambda *_: getTransferManager().remove(self.transfer),
+            css_classes=["flat"],
+            tooltip_text="Remove from list",
+            valign=Gtk.Align.CENTER,
+        )
+        self.add_suffix(self.remove_btn)
+
+        self.update()
+
+    def update(self):
+        """Show the current state of the transfer."""
+        transfer = self.transfer
+        state = transfer.state
+
+        fraction = transfer.current / transfer.total if transfer.total > 0 else 0
+        self.progress.set_fraction(fraction)
+        if state == TRANSFER_STATE_QUEUED:
+            self.progress.set_text("queued")
+        elif state == TRANSFER_STATE_RUNNING:
+            self.progress.set_text(
+                f"{ int(fraction * 100) }% - { bytesToString(transfer.getThroughput()) }/s"
+            )
+        elif state == TRANSFER_STATE_PAUSED:
+            self.progress.set_text(f"paused at { int(fraction * 100) }%")
+        elif state == TRANSFER_STATE_DONE:
+            self.progress.set_fraction(1)
+            self.progress.set_text("done")
+        elif state == TRANSFER_STATE_FAILED:
+            self.progress.set_text("failed")
+        elif state == TRANSFER_STATE_CANCELLED:
+            self.progress.set_text("cancelled")
+
+        self.set_tooltip_text(str(transfer.error) if transfer.error else None)
+
+        self.cancel_btn.set_visible(transfer.isActive())
+        self.resume_btn.set_visible(
+            state in (TRANSFER_STATE_PAUSED, TRANSFER_STATE_FAILED)
+        )
+        self.remove_btn.set_visible(not transfer.isActive())
+
+
+class TransfersDialog:
+    """Lists the transfers of all connections. Transfers keep running
+    when this dialog is closed."""
+
+    def __init__(self, window: Adw.ApplicationWindow):
+        self.window = window
+        self.manager = getTransferManager()
+        self.rows = {}  # Dict from transfer to row
+
+        # Create a Builder
+        self.builder = Gtk.Builder.new_from_resource(
+            "/com/github/marreitin/realms/gtk/transfers.ui"
+        )
+
+        # Obtain and show the main window
+        self.dialog = self.obj("main-dialog")
+        self.dialog.connect("closed", self.onDialogClosed)
+
+        self.obj("btn-clear").connect("clicked", self.onClearClicked)
+        self.obj("transfers-list").set_placeholder(
+            Gtk.Label(label="No transfers", css_classes=["dim-label"], margin_top=24)
+        )
+
+        for transfer in self.manager.transfers:
+            self.onTransferChanged(transfer)
+        self.manager.registerCallback(self.onTransferChanged)
+
+        self.dialog.present(self.window)
+
+    def onTransferChanged(self, transfer: Transfer):
+        """Callback from the transfer manager."""
+        row = self.rows.get(transfer)
+        if transfer not in self.manager.transfers:
+            if row is not None:
+                self.obj("transfers-list").remove(row)
+                del self.rows[transfer]
+        elif row is None:
+            row = TransferRow(transfer)
+            self.rows[transfer] = row
+            self.obj("transfers-list").append(row)
+        else:
+            row.update()
+
+        self.__updateSummary__()
+
+    def __updateSummary__(self):
+        """Show the number of active transfers and their throughput."""
+        active = [t for t in self.manager.transfers if t.isActive()]
+        if not active:
+            self.obj("title").set_subtitle("")
+            return
+        self.obj("title").set_subtitle(
+            f"{ len(active) } active - { bytesToString(self.manager.getThroughput()) }/s"
+        )
+
+    def onClearClicked(self, _):
+        """Remove all transfers that are not active anymore."""
+        for transfer in self.manager.transfers.copy():
+            self.manager.remove(transfer)
+
+    def obj(self, name: str):
+        o = self.builder.get_object(name)
+        if o is None:
+            raise NotImplementedError(f"Object { name } could not be found!")
+        return o
+
+    def onDialogClosed(self, *_):
+        self.manager.unregisterCallback(self.onTransferChanged)
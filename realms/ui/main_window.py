@@ -16,13 +16,14 @@
 from gi.repository import Adw, Gio, GLib, Gtk
 
 from realms.ui.components import iconButton
-from realms.ui.connection_row import ConnectionRow
+from realms.ui.connection_row import ConnectionRow, buildSidebarView
 from realms.ui.tabs import BaseDetailsTab
 from realms.ui.tabs.edit_templates import EditTemplatesTab
 
 from .dialogs.add_conn_dialog import AddConnDialog
+from .dialogs.transfers_dialog import TransfersDialog
 
-(OVERLAY_NONE, OVERLAY_NO_CONN, OVERLAY_NO_TAB) = range(3)
+OVERLAY_NONE, OVERLAY_NO_CONN, OVERLAY_NO_TAB = range(3)
 
 
 class MainWindow(Adw.ApplicationWindow):
@@ -59,13 +60,14 @@ class MainWindow(Adw.ApplicationWindow):
         self.hamburger_button = None
 
         self.sidebar_header = None
-        self.sidebar_list_box = None
+        self.sidebar_list_view = None
+        self.sidebar_store = None  # Store of each connection row's model
         self.hide_sidebar_btn = None
         self.show_sidebar_btn = None
 
         self.overlay_status = OVERLAY_NO_CONN
 
-        self.sidebar_children = {}  # Dict from URL to ListBoxRow
+        self.sidebar_children = {}  # Dict from URL to ConnectionRow
         self.open_tabs = []  # List with open tab pages
 
         self.toast_copy_action = Gio.SimpleAction(
@@ -121,11 +123,8 @@ class MainWindow(Adw.ApplicationWindow):
             scroll = Gtk.ScrolledWindow()
             sidebar_toolbarview.set_content(scroll)
 
-            self.sidebar_list_box = Gtk.ListBox(
-                css_classes=["navigation-sidebar"],
-                selection_mode=Gtk.SelectionMode.NONE,
-            )
-            scroll.set_child(self.sidebar_list_box)
+            self.sidebar_list_view, self.sidebar_store = buildSidebarView(self)
+            scroll.set_child(self.sidebar_list_view)
 
             self.hide_sidebar_btn = iconButton(
                 "", "panel-left-close-symbolic", self.__onToggleSidebarVisibility__
@@ -156,9 +155,16 @@ class MainWindow(Adw.ApplicationWindow):
         edit_templates_action.connect("activate", self.onEditTemplatesClicked)
         self.add_action(edit_templates_action)
 
+        show_transfers_action = Gio.SimpleAction(
+            name="show-transfers", parameter_type=None
+        )
+        show_transfers_action.connect("activate", self.onShowTransfersClicked)
+        self.add_action(show_transfers_action)
+
         menu = Gio.Menu()
         menu.append("Add connection", "win.add-connection")
         menu.append("Edit templates", "win.edit-templates")
+        menu.append("Transfers", "win.show-transfers")
         menu.append("About", "win.open-about")
 
         self.options_popover = Gtk.PopoverMenu(menu_model=menu)
@@ -222,8 +228,7 @@ class MainWindow(Adw.ApplicationWindow):
             raise ValueError("URL already exists")
 
         row = ConnectionRow(conn, self)
-        index = len(self.sidebar_children)
-        self.sidebar_list_box.insert(row, index)
+        self.sidebar_store.append(row.model)
         self.sidebar_children[url] = row
 
         self.overlay_status = OVERLAY_NONE if self.open_tabs else OVERLAY_NO_TAB
@@ -236,7 +241,9 @@ class MainWindow(Adw.ApplicationWindow):
             url (str): The connections URL
         """
         row = self.sidebar_children[url]
-        self.sidebar_list_box.remove(row)
+        found, position = self.sidebar_store.find(row.model)
+        if found:
+            self.sidebar_store.remove(position)
         del self.sidebar_children[url]
 
         if len(self.sidebar_children) == 0:
@@ -265,6 +272,16 @@ class MainWindow(Adw.ApplicationWindow):
         self.sidebar_children[new_url] = self.sidebar_children[old_url]
         del self.sidebar_children[old_url]
 
+    def getConnections(self) -> list:
+        """Get the connections of the sidebar. Only the primary window has
+        a sidebar, so secondary windows ask the primary one.
+
+        Returns:
+            list: Connections
+        """
+        primary = self.get_application().app_windows[0]
+        return [row.connection for row in primary.sidebar_children.values()]
+
     def tabExists(self, uuid: str) -> bool:
         """Check if a tab is already open
 
@@ -404,6 +421,10 @@ class MainWindow(Adw.ApplicationWindow):
             tab_page_content = EditTemplatesTab(self)
             self.addOrShowTab(tab_page_content, "Templates", "star-large-symbolic")
 
+    def onShowTransfersClicked(self, *_):
+        """Open the dialog listing all volume transfers."""
+        TransfersDialog(self)
+
     def onOpenAboutClicked(self, *_):
         """Open the about dialog."""
         about = Adw.AboutDialog(
@@ -13,20 +13,54 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
-from gi.repository import Gtk
+from gi.repository import GObject, Gtk
 
 
-class BaseRow(Gtk.ListBoxRow):
-    """Base class for sidebar-rows for each domain, network and storage pool."""
+class BaseRowItem(GObject.Object):
+    """Lightweight model item of the sidebar lists, one for each domain,
+    network and storage pool. Row widgets only exist for the visible items
+    and get bound to them."""
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.connect("activate", self.onActivate)
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+
+        # Called with self when the sorting title changed
+        self.sort_changed_cb = None
+
+        self.__sorting_title__ = ""
 
     def onActivate(self):
         """Row was clicked"""
         raise NotImplementedError
 
-    def getSortingTitle(self):
-        """Return title by which to sort rows"""
+    def getSortingTitle(self) -> str:
+        """Return title by which to sort rows. It is cached, so that sorting
+        doesn't need to query the wrapped objects."""
+        return self.__sorting_title__
+
+    def setSortingTitle(self, title: str):
+        """Update the title by which to sort rows, i.e. after an event.
+        Only re-sorts this item if the title changed.
+
+        Args:
+            title (str): New title
+        """
+        if title == self.__sorting_title__:
+            return
+        self.__sorting_title__ = title
+        if self.sort_changed_cb is not None:
+            self.sort_changed_cb(self)
+
+
+class BaseRow(Gtk.Box):
+    """Base class for sidebar-rows for each domain, network and storage pool.
+    Rows are recycled by the list view, they show one item at a time."""
+
+    def bind(self, item: BaseRowItem):
+        """Show the given item"""
+        raise NotImplementedError
+
+    def unbind(self):
+        """Stop showing the current item"""
         raise NotImplementedError
@@ -22,7 +22,7 @@ from realms.libvirt_wrap import Domain
 from realms.libvirt_wrap.constants import *
 from realms.ui.tabs import DomainDetailsTab
 
-from .base_row import BaseRow
+from .base_row import BaseRow, BaseRowItem
 
 
 def __onContextStartClicked__(domainRow: any, *_):
@@ -31,6 +31,7 @@ def __onContextStartClicked__(domainRow: any, *_):
         [],
         lambda e: domainRow.window.pushToastText(str(e)),
         lambda r_: None,
+        queue=domainRow.domain.connection.url,
     )
 
 
@@ -40,6 +41,7 @@ def __onContextStopClicked__(domainRow: any, *_):
         [],
         lambda e: domainRow.window.pushToastText(str(e)),
         lambda r_: None,
+        queue=domainRow.domain.connection.url,
     )
 
 
@@ -47,10 +49,42 @@ def __onContextOpenClicked__(domainRow: any, *_):
     show(domainRow.domain, domainRow.window)
 
 
-class DomainRow(BaseRow):
+class DomainItem(BaseRowItem):
+    """Sidebar item of a domain."""
+
     def __init__(self, domain: Domain, window: Adw.ApplicationWindow):
-        super().__init__()
+        super().__init__(window)
         self.domain = domain
+
+        self.setSortingTitle(self.domain.getDisplayName())
+
+        self.domain.registerCallback(self.__onConnectionEvent__)
+
+    def __onConnectionEvent__(self, conn, obj, type_id, event_id, detail_id):
+        if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
+            if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
+                self.domain.unregisterCallback(self.__onConnectionEvent__)
+        elif type_id == CALLBACK_TYPE_DOMAIN_GENERIC:
+            if event_id == DOMAIN_EVENT_DELETED:
+                self.domain.unregisterCallback(self.__onConnectionEvent__)
+        elif type_id == CALLBACK_TYPE_DOMAIN_LIFECYCLE:
+            # Only a new definition can change the title
+            if event_id == libvirt.VIR_DOMAIN_EVENT_DEFINED:
+                self.setSortingTitle(self.domain.getDisplayName())
+
+    def onActivate(self):
+        uuid = self.domain.getUUID()
+        if not self.window.tabExists(uuid):
+            tab_page_content = DomainDetailsTab(self.domain, self.window)
+            self.window.addOrShowTab(
+                tab_page_content, self.domain.getDisplayName(), "computer-symbolic"
+            )
+
+
+class DomainRow(BaseRow):
+    def __init__(self, window: Adw.ApplicationWindow):
+        super().__init__(spacing=6)
+        self.domain = None
         self.window = window
 
         self.title = None
@@ -61,17 +95,11 @@ class DomainRow(BaseRow):
 
         self.__build__()
 
-        self.domain.registerCallback(self.__onConnectionEvent__)
-
     def __build__(self):
-        hbox = Gtk.Box(spacing=6)
-        self.set_child(hbox)
-
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, hexpand=True)
-        hbox.append(vbox)
+        self.append(vbox)
 
         self.title = Gtk.Label(
-            label=self.domain.getDisplayName(),
             halign=Gtk.Align.START,
             vexpand=True,
             css_classes=["caption-heading"],
@@ -88,14 +116,14 @@ class DomainRow(BaseRow):
 
         self.status_icon = Gtk.Image.new_from_icon_name("computer-symbolic")
         self.status_icon.set_size_request(32, -1)
-        hbox.append(self.status_icon)
+        self.append(self.status_icon)
 
         self.__buildContextMenu__()
 
-        self.__setStatus__()
-
     def __buildContextMenu__(self):
         def openPopover(*_):
+            if self.domain is None:
+                return
             menu = Gio.Menu()
             if self.domain.isActive():
                 menu.append("Open", "domain.open")
@@ -138,25 +166,27 @@ class DomainRow(BaseRow):
         elif state == libvirt.VIR_DOMAIN_PMSUSPENDED:
             self.status_icon.set_from_icon_name("computer-grey")
 
-    def onActivate(self):
-        uuid = self.domain.getUUID()
-        if not self.window.tabExists(uuid):
-            tab_page_content = DomainDetailsTab(self.domain, self.window)
-            self.window.addOrShowTab(
-                tab_page_content, self.domain.getDisplayName(), "computer-symbolic"
-            )
+    def bind(self, item: DomainItem):
+        self.domain = item.domain
+        self.domain.registerCallback(self.__onConnectionEvent__)
+        self.__setStatus__()
+
+    def unbind(self):
+        if self.domain is None:
+            return
+        self.domain.unregisterCallback(self.__onConnectionEvent__)
+        self.domain = None
 
     def __onConnectionEvent__(self, conn, obj, type_id, event_id, detail_id):
+        if self.domain is None:
+            return  # Unbound while the event was sent out
         if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
-                self.domain.unregisterCallback(self.__onConnectionEvent__)
+                self.unbind()
                 return
         elif type_id == CALLBACK_TYPE_DOMAIN_GENERIC:
             if event_id == DOMAIN_EVENT_DELETED:
-                self.domain.unregisterCallback(self.__onConnectionEvent__)
+                self.unbind()
                 return
 
         self.__setStatus__()
-
-    def getSortingTitle(self):
-        return self.domain.getDisplayName()
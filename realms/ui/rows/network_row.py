@@ -13,19 +13,54 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import libvirt
 from gi.repository import Adw, Gtk, Pango
 
 from realms.libvirt_wrap import Network
 from realms.libvirt_wrap.constants import *
 from realms.ui.tabs import NetworkDetailsTab
 
-from .base_row import BaseRow
+from .base_row import BaseRow, BaseRowItem
 
 
-class NetworkRow(BaseRow):
+class NetworkItem(BaseRowItem):
+    """Sidebar item of a virtual network."""
+
     def __init__(self, network: Network, window: Adw.ApplicationWindow):
-        super().__init__()
+        super().__init__(window)
         self.network = network
+
+        self.setSortingTitle(self.network.getDisplayName())
+
+        self.network.registerCallback(self.onConnectionEvent)
+
+    def onConnectionEvent(self, conn, obj, type_id, event_id, detail_id):
+        if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
+            if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
+                self.network.unregisterCallback(self.onConnectionEvent)
+        elif type_id == CALLBACK_TYPE_NETWORK_GENERIC:
+            if event_id == NETWORK_EVENT_DELETED:
+                self.network.unregisterCallback(self.onConnectionEvent)
+        elif type_id == CALLBACK_TYPE_NETWORK_LIFECYCLE:
+            # Only a new definition can change the title
+            if event_id == libvirt.VIR_NETWORK_EVENT_DEFINED:
+                self.setSortingTitle(self.network.getDisplayName())
+
+    def onActivate(self):
+        uuid = self.network.getUUID()
+        if not self.window.tabExists(uuid):
+            tab_page_content = NetworkDetailsTab(self.network, self.window)
+            self.window.addOrShowTab(
+                tab_page_content,
+                self.network.getDisplayName(),
+                "network-wired-symbolic",
+            )
+
+
+class NetworkRow(BaseRow):
+    def __init__(self, window: Adw.ApplicationWindow):
+        super().__init__(margin_top=3, margin_bottom=3, spacing=6)
+        self.network = None
         self.window = window
 
         self.title = None
@@ -33,20 +68,11 @@ class NetworkRow(BaseRow):
 
         self.build()
 
-        self.network.registerCallback(self.onConnectionEvent)
-
     def build(self):
-        self.set_activatable(True)
-        self.set_selectable(True)
-
-        outer_box = Gtk.Box(margin_top=3, margin_bottom=3, spacing=6)
-        self.set_child(outer_box)
-
         box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        outer_box.append(box)
+        self.append(box)
 
         self.title = Gtk.Label(
-            label=self.network.getDisplayName(),
             halign=Gtk.Align.START,
             vexpand=True,
             css_classes=["caption-heading"],
@@ -59,26 +85,28 @@ class NetworkRow(BaseRow):
         self.subtitle.set_halign(Gtk.Align.START)
         self.subtitle.set_css_classes(["caption", "dim-label"])
 
+    def bind(self, item: NetworkItem):
+        self.network = item.network
+        self.network.registerCallback(self.onConnectionEvent)
         self.set_status()
 
-    def onActivate(self):
-        uuid = self.network.getUUID()
-        if not self.window.tabExists(uuid):
-            tab_page_content = NetworkDetailsTab(self.network, self.window)
-            self.window.addOrShowTab(
-                tab_page_content,
-                self.network.getDisplayName(),
-                "network-wired-symbolic",
-            )
+    def unbind(self):
+        if self.network is None:
+            return
+        self.network.unregisterCallback(self.onConnectionEvent)
+        self.network = None
 
     def onConnectionEvent(self, conn, obj, type_id, event_id, detail_id):
+        if self.network is None:
+            return  # Unbound while the event was sent out
         if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
-                self.network.unregisterCallback(self.onConnectionEvent)
+                self.unbind()
                 return
         elif type_id == CALLBACK_TYPE_NETWORK_GENERIC:
             if event_id == NETWORK_EVENT_DELETED:
-                self.network.unregisterCallback(self.onConnectionEvent)
+                self.unbind()
+                return
         self.set_status()
 
     def set_status(self):
@@ -87,6 +115,3 @@ class NetworkRow(BaseRow):
             self.subtitle.set_text("up")
         else:
             self.subtitle.set_text("down")
-
-    def getSortingTitle(self):
-        return self.network.getDisplayName()
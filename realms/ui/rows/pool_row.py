@@ -21,19 +21,38 @@ from realms.libvirt_wrap.constants import *
 from realms.ui.dialogs.add_volume_dialog import AddVolumeDialog
 from realms.ui.tabs import PoolDetailsTab
 
-from .base_row import BaseRow
+from .base_row import BaseRow, BaseRowItem
 
 
 def __onContextNewVolClicked__(poolRow: any, *_):
     AddVolumeDialog(poolRow.window, poolRow.pool)
 
 
-class PoolRow(BaseRow):
-    """Sidebar Row for storage pools."""
+class PoolItem(BaseRowItem):
+    """Sidebar item of a storage pool."""
 
     def __init__(self, pool: Pool, window: Adw.ApplicationWindow):
-        super().__init__()
+        super().__init__(window)
         self.pool = pool
+
+        # The name of a pool can't change
+        self.setSortingTitle(self.pool.getDisplayName())
+
+    def onActivate(self):
+        uuid = self.pool.getUUID()
+        if not self.window.tabExists(uuid):
+            tab_page_content = PoolDetailsTab(self.pool, self.window)
+            self.window.addOrShowTab(
+                tab_page_content, self.pool.getDisplayName(), "drive-multidisk-symbolic"
+            )
+
+
+class PoolRow(BaseRow):
+    """Sidebar Row for storage pools."""
+
+    def __init__(self, window: Adw.ApplicationWindow):
+        super().__init__(spacing=6)
+        self.pool = None
         self.window = window
 
         self.usage_task = None
@@ -44,17 +63,11 @@ class PoolRow(BaseRow):
 
         self.__build__()
 
-        self.pool.registerCallback(self.__onConnectionEvent__)
-
     def __build__(self):
-        hbox = Gtk.Box(spacing=6)
-        self.set_child(hbox)
-
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, hexpand=True)
-        hbox.append(vbox)
+        self.append(vbox)
 
         self.title = Gtk.Label(
-            label=self.pool.getDisplayName(),
             halign=Gtk.Align.START,
             vexpand=True,
             css_classes=["caption-heading"],
@@ -70,16 +83,14 @@ class PoolRow(BaseRow):
         vbox.append(self.subtitle)
 
         self.status_label = Gtk.Label(label="50%", justify=Gtk.Justification.RIGHT)
-        hbox.append(self.status_label)
+        self.append(self.status_label)
 
         self.__buildContextMenu__()
 
-        self.__setStatus__()
-
     def __buildContextMenu__(self):
         def openPopover(*_):
-            menu = Gio.Menu()
-            if self.pool.isActive():
+            if self.pool is not None and self.pool.isActive():
+                menu = Gio.Menu()
                 menu.append("New Volume", "pool.volume.new")
 
                 self.popover.set_menu_model(menu)
@@ -97,16 +108,20 @@ class PoolRow(BaseRow):
     def __setStatus__(self):
         self.status_label.set_css_classes([])
 
+        pool = self.pool
+
         def gatherUsage():
-            allocation = self.pool.getAllocation()
-            capacity = self.pool.getCapacity()
+            capacity = pool.getCapacity()
             if capacity == 0:
                 return -1
 
-            filled = self.pool.getAllocation() / self.pool.getCapacity() * 100
+            filled = pool.getAllocation() / capacity * 100
             return filled
 
         def showUsage(filled):
+            if self.pool is not pool:
+                return  # The row shows another pool by now
+
             if filled == -1:
                 self.status_label.set_label("")
             else:
@@ -120,7 +135,9 @@ class PoolRow(BaseRow):
                 self.status_label.set_css_classes(["numeric"])
 
         if self.usage_task is None:
-            self.usage_task = RepeatJob(gatherUsage, [], showUsage, 30)
+            self.usage_task = RepeatJob(
+                gatherUsage, [], showUsage, 30, queue=self.pool.connection.url
+            )
         else:
             self.usage_task.trigger()
 
@@ -129,28 +146,31 @@ class PoolRow(BaseRow):
         else:
             self.subtitle.set_label("inactive")
 
+    def bind(self, item: PoolItem):
+        self.pool = item.pool
+        self.title.set_label(self.pool.getDisplayName())
+        self.status_label.set_label("")
+        self.pool.registerCallback(self.__onConnectionEvent__)
+        self.__setStatus__()
+
+    def unbind(self):
+        if self.pool is None:
+            return
+        if self.usage_task is not None:
+            self.usage_task.stopTask()
+            self.usage_task = None
+        self.pool.unregisterCallback(self.__onConnectionEvent__)
+        self.pool = None
+
     def __onConnectionEvent__(self, conn, obj, type_id, event_id, detail_id):
+        if self.pool is None:
+            return  # Unbound while the event was sent out
         if type_id == CALLBACK_TYPE_CONNECTION_GENERIC:
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
-                self.usage_task.stopTask()
-                self.pool.unregisterCallback(self.__onConnectionEvent__)
+                self.unbind()
                 return
         elif type_id == CALLBACK_TYPE_POOL_GENERIC:
             if event_id == POOL_EVENT_DELETED:
-                self.usage_task.stopTask()
-                self.pool.unregisterCallback(self.__onConnectionEvent__)
+                self.unbind()
         elif type_id == CALLBACK_TYPE_POOL_LIFECYCLE:
             self.__setStatus__()
-
-    # Implement BaseRow
-    def onActivate(self):
-        uuid = self.pool.getUUID()
-        if not self.window.tabExists(uuid):
-            tab_page_content = PoolDetailsTab(self.pool, self.window)
-            self.window.addOrShowTab(
-                tab_page_content, self.pool.getDisplayName(), "drive-multidisk-symbolic"
-            )
-
-    # Implement BaseRow
-    def getSortingTitle(self):
-        return self.pool.getDisplayName()
@@ -13,7 +13,7 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
-def rowSortingFunc(a: any, b: any) -> bool:
+def rowSortingFunc(a: any, b: any) -> int:
     """Define a sorting order for two Listbox-Rows
 
     Args:
@@ -21,6 +21,8 @@ def rowSortingFunc(a: any, b: any) -> bool:
         b (Gtk.ListBoxRow): Row B
 
     Returns:
-        bool: Sorting order definition
+        int: Sorting order definition, negative if a comes first
     """
-    return a.getSortingTitle() > b.getSortingTitle()
+    title_a = a.getSortingTitle()
+    title_b = b.getSortingTitle()
+    return (title_a > title_b) - (title_a < title_b)
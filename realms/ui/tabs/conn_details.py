@@ -116,9 +116,17 @@ class ConnectionDetailsTab(BaseDetailsTab):
             self.title_widget.set_subtitle("connecting...")
             self.connect_btn.set_visible(True)
             self.connect_btn.set_sensitive(False)
-            self.disconnect_btn.set_visible(False)
+            # Cancels the attempt, i.e. one waiting in the startup queue
+            self.disconnect_btn.set_visible(True)
 
             self.stack_switcher.set_reveal(False)
+        elif state == CONNECTION_STATE_RECONNECTING:
+            self.title_widget.set_subtitle("reconnecting...")
+            self.connect_btn.set_visible(False)
+            self.disconnect_btn.set_visible(True)
+
+            # Nothing can be polled until the connection is back
+            self.perf_page.end()
         else:
             self.title_widget.set_subtitle("disconnected")
             self.connect_btn.set_visible(True)
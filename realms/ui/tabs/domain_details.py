@@ -13,6 +13,7 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+import copy
 import xml.etree.ElementTree as ET
 
 import libvirt
@@ -20,7 +21,7 @@ from gi.repository import Adw, Gtk
 
 from realms.helpers import failableAsyncJob
 from realms.helpers.show_domain_video import hasDisplay, show
-from realms.libvirt_wrap import Domain
+from realms.libvirt_wrap import DOMAIN_STATE_EVENTS, Domain
 from realms.libvirt_wrap.constants import *
 from realms.ui.components import (
     ActionOption,
@@ -55,7 +56,8 @@ class DeviceRow(Gtk.ListBoxRow):
     """Preferences row, mostly used for listing all virtual devices. Contains
     an object type for subclasses of BaseDevicePage and an xml-tree for it,
     to show that page upon row selection. For performance reasons, that page
-    will only be built upon selection.
+    will only be created and built upon the first selection, the row itself
+    only caches title and icon.
     Also for performance reasons this row emulates an Adw.ActionRow."""
 
     def __init__(
@@ -66,11 +68,14 @@ class DeviceRow(Gtk.ListBoxRow):
         self.__xml_tree__ = xml_tree
         self.__can_update__ = can_update
         self.__index__ = 0
+        self.__title__ = None
+        self.__icon_name__ = None
         self.__label__ = None
+        self.__icon__ = None
 
-        self.device_page = self.__device_page_type__(
-            self.__parent__, self.__xml_tree__, can_update=self.__can_update__
-        )
+        self.device_page = None
+
+        self.updateDescription()
 
         self.__box__ = Gtk.Box(
             spacing=12, margin_start=12, margin_top=15, margin_bottom=15, margin_end=12
@@ -79,8 +84,8 @@ class DeviceRow(Gtk.ListBoxRow):
 
     def build(self):
         """Build the "action row" """
-        main_icon = Gtk.Image.new_from_icon_name(self.device_page.getIconName())
-        self.__box__.append(main_icon)
+        self.__icon__ = Gtk.Image.new_from_icon_name(self.__icon_name__)
+        self.__box__.append(self.__icon__)
 
         self.__label__ = Gtk.Label(label=self.getTitle())
         self.__box__.append(self.__label__)
@@ -90,12 +95,44 @@ class DeviceRow(Gtk.ListBoxRow):
         open_icon = Gtk.Image.new_from_icon_name("right-symbolic")
         self.__box__.append(open_icon)
 
+    def updateDescription(self):
+        """Read title and icon from the device xml again, i.e. after it
+        was edited. This does not create the page."""
+        page_type = self.__device_page_type__
+        self.__title__ = page_type.titleFromXML(self.__xml_tree__)
+        self.__icon_name__ = page_type.iconNameFromXML(self.__xml_tree__)
+
+        if self.__label__ is not None:
+            self.__label__.set_label(self.getTitle())
+            self.__icon__.set_from_icon_name(self.__icon_name__)
+
     def onActivated(self):
         """Callback from DomainDetailsTab that this device row
         was activated."""
-        self.device_page.buildFull()
+        if self.device_page is None:
+            self.device_page = self.__device_page_type__(
+                self.__parent__, self.__xml_tree__, can_update=self.__can_update__
+            )
+        if self.device_page.nav_page is None:
+            self.device_page.buildFull()
         self.__parent__.showNavPage(self.device_page.nav_page)
 
+    def getXML(self) -> ET.Element:
+        """Get the xml tree of the device."""
+        return self.__xml_tree__
+
+    def getNavPage(self) -> Adw.NavigationPage:
+        """Get the navigation page, or None if it was not built yet."""
+        if self.device_page is None:
+            return None
+        return self.device_page.nav_page
+
+    def setCanUpdate(self, can_update: bool):
+        """Set whether the page offers the update option."""
+        self.__can_update__ = can_update
+        if self.device_page is not None:
+            self.device_page.setCanUpdate(can_update)
+
     def setIndex(self, index: int):
         """Set the index of this device, i.e. hard drive #3"""
         self.__index__ = index
@@ -105,8 +142,24 @@ class DeviceRow(Gtk.ListBoxRow):
     def getTitle(self) -> str:
         """Get the displayed title of this row."""
         if self.__index__ == 0:
-            return self.device_page.getTitle()
-        return self.device_page.getTitle() + " " + str(self.__index__)
+            return self.__title__
+        return self.__title__ + " " + str(self.__index__)
+
+
+def __deviceKey__(device_xml: ET.Element) -> bytes:
+    """Contents of a device element, to find devices that did not change."""
+    device = copy.copy(device_xml)
+    device.tail = None
+    return ET.tostring(device)
+
+
+def __generalKey__(xml_tree: ET.Element) -> bytes:
+    """Contents of the domain xml without its devices."""
+    general = copy.copy(xml_tree)
+    devices = general.find("devices")
+    if devices is not None:
+        general.remove(devices)
+    return ET.tostring(general)
 
 
 class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
@@ -339,23 +392,46 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
         )
 
     def updateData(self, reuse_tree=False) -> None:
-        """Update data bindings, and try to reuse existing rows
-        by just giving them fresh xml data, but not readding them.
+        """Update data bindings. The new xml is diffed against the current
+        tree, only rows of changed devices are rebuilt, inserted or removed.
         """
         if not self.__built__:
             return
 
         if not reuse_tree:
             self.xml_box.setText(self.domain.getXML())
-            self.xml_tree = self.domain.getETree()
+            new_tree = self.domain.getETree()
         else:
             ET.indent(self.xml_tree)
             self.xml_box.setText(ET.tostring(self.xml_tree, "unicode"))
+            new_tree = self.xml_tree
 
         self.title_widget.set_title(self.domain.getDisplayName())
 
         self.autostart = self.domain.getAutostart()
 
+        general_changed = self.xml_tree is None or (
+            new_tree is not self.xml_tree
+            and __generalKey__(new_tree) != __generalKey__(self.xml_tree)
+        )
+
+        kept_pages = self.__updateDeviceRows__(new_tree, general_changed)
+
+        if general_changed:
+            self.__buildGeneralRows__()
+        else:
+            kept_pages.extend(row.getNavPage() for row in self.general_rows)
+
+        # Close the visible page if its device is gone
+        visible_page = self.navigation_view.get_visible_page()
+        if visible_page != self.main_nav_page and visible_page not in kept_pages:
+            self.navigation_view.pop()
+
+        self.apply_row.set_visible(False)
+        self.__definition_changed__ = False
+
+    def __buildGeneralRows__(self):
+        """Rebuild the rows of the pages showing the whole domain."""
         for row in self.general_rows:
             self.general_listbox.remove(row)
         self.general_rows.clear()
@@ -371,42 +447,91 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
             self.general_listbox.append(row)
             self.general_rows.append(row)
 
-        # Virtual devices
+    def __updateDeviceRows__(self, new_tree: ET.Element, general_changed: bool):
+        """Match the device rows to the devices of new_tree. Rows of unchanged
+        devices are kept, their elements are moved into the new tree, so
+        that their pages keep editing the current tree.
+
+        Args:
+            new_tree (ET.Element): Freshly loaded domain xml, or the current tree
+            general_changed (bool): If not, the current root is kept and only
+                its devices are replaced
+
+        Returns:
+            list: Navigation pages of the kept rows
+        """
+        # Rows by their element, and by the contents of their element
+        rows_by_element = {}
+        rows_by_key = {}
         for row in self.device_rows.values():
-            self.devices_listbox.remove(row)
-        self.device_rows.clear()
+            rows_by_element[id(row.getXML())] = row
+            rows_by_key.setdefault(__deviceKey__(row.getXML()), []).append(row)
 
         # Only show the update row in the device page if
         # the domain is active, since otherwise the configuration
         # can be applied regularly.
         domain_is_active = self.domain.isActive()
 
-        device_trees = self.xml_tree.find("devices")
-
-        self.devices_listbox.set_visible(len(device_trees) > 0)
-
-        for device_xml in device_trees:
+        new_devices = new_tree.find("devices")
+        elements = []
+        ordered_rows = []
+        kept_rows = set()
+        for device_xml in new_devices:
             page_type = tagToPage(device_xml.tag)
             if page_type is None:
+                elements.append(device_xml)
                 continue
 
-            row = DeviceRow(self, page_type, device_xml, domain_is_active)
+            row = rows_by_element.get(id(device_xml))
+            if row is None:
+                candidates = rows_by_key.get(__deviceKey__(device_xml), [])
+                while candidates and candidates[0] in kept_rows:
+                    candidates.pop(0)
+                if candidates:
+                    row = candidates.pop(0)
+                    device_xml = row.getXML()
+            if row is not None and row not in kept_rows:
+                kept_rows.add(row)
+                # The domain may have started or stopped since the row was made
+                row.setCanUpdate(domain_is_active)
+            else:
+                row = DeviceRow(self, page_type, device_xml, domain_is_active)
+            elements.append(device_xml)
+            ordered_rows.append(row)
+
+        new_devices[:] = elements
+        if general_changed:
+            self.xml_tree = new_tree
+        elif new_tree is not self.xml_tree:
+            self.xml_tree.find("devices")[:] = elements
+
+        for row in self.device_rows.values():
+            if row not in kept_rows:
+                self.devices_listbox.remove(row)
+
+        # Titles are unique by index, i.e. hard drive #3
+        self.device_rows = {}
+        for position, row in enumerate(ordered_rows):
+            if row not in kept_rows:
+                row.build()
+            else:
+                row.updateDescription()
             index = 0
+            row.setIndex(index)
             while row.getTitle() in self.device_rows:
                 index += 1
                 row.setIndex(index)
             self.device_rows[row.getTitle()] = row
-            row.build()
-            self.devices_listbox.append(row)
 
-        # Update currently visible page if possible, otherwise
-        # close it. TODO
-        visible_page = self.navigation_view.get_visible_page()
-        if visible_page != self.main_nav_page:
-            self.navigation_view.pop()
+            if row.get_parent() is None:
+                self.devices_listbox.insert(row, position)
+            elif row.get_index() != position:
+                self.devices_listbox.remove(row)
+                self.devices_listbox.insert(row, position)
 
-        self.apply_row.set_visible(False)
-        self.__definition_changed__ = False
+        self.devices_listbox.set_visible(len(new_devices) > 0)
+
+        return [row.getNavPage() for row in kept_rows]
 
     def __setStatus__(self) -> None:
         """Update the status description."""
@@ -435,20 +560,20 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
             self.__setApplyWarningVisibility__(True)
 
             for row in self.device_rows.values():
-                row.device_page.setCanUpdate(True)
+                row.setCanUpdate(True)
         elif state == libvirt.VIR_DOMAIN_PAUSED:
             self.resume_btn.set_visible(True)
             self.open_btn.set_visible(hasDisplay(self.xml_tree))
             self.__setApplyWarningVisibility__(True)
 
             for row in self.device_rows.values():
-                row.device_page.setCanUpdate(True)
+                row.setCanUpdate(True)
         else:
             self.start_btn.set_visible(True)
             self.__setApplyWarningVisibility__(False)
 
             for row in self.device_rows.values():
-                row.device_page.setCanUpdate(False)
+                row.setCanUpdate(False)
 
     def showNavPage(self, page: BaseDevicePage):
         """Push a navigation page (for a device)"""
@@ -483,6 +608,8 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
             if event_id == libvirt.VIR_DOMAIN_EVENT_DEFINED:
                 # Has to update, otherwise nothing makes sense anymore.
                 self.updateData()
+            elif event_id in DOMAIN_STATE_EVENTS:
+                pass  # The xml did not change, only the status
             # Only refresh if no changes were made. (It was only a state change event)
             elif not self.__definition_changed__:
                 self.updateData()
@@ -490,6 +617,12 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
                 self.window_ref.window.closeTab(self)
                 return
+            # Events may have been missed while the connection was down
+            if (
+                event_id == CONNECTION_EVENT_RECONNECTED
+                and not self.__definition_changed__
+            ):
+                self.updateData()
         self.__setStatus__()
 
     def __onStartClicked__(self, btn):
@@ -499,6 +632,7 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
             [],
             lambda e: (print(e), self.window_ref.window.pushToastText(str(e))),
             lambda r: btn.set_sensitive(True),
+            queue=self.domain.connection.url,
         )
 
     def __onResumeClicked__(self, btn):
@@ -508,6 +642,7 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
             [],
             lambda e: self.window_ref.window.pushToastText(str(e)),
             lambda r: btn.set_sensitive(True),
+            queue=self.domain.connection.url,
         )
 
     def __onStopClicked__(self, btn):
@@ -518,6 +653,7 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
                 [],
                 lambda e: self.window_ref.window.pushToastText(str(e)),
                 lambda r: self.stop_btn.set_sensitive(True),
+                queue=self.domain.connection.url,
             )
 
         def onKillSelected():
@@ -527,6 +663,7 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
                 [],
                 lambda e: self.window_ref.window.pushToastText(str(e)),
                 lambda r: self.stop_btn.set_sensitive(True),
+                queue=self.domain.connection.url,
             )
             btn.set_sensitive(False)
 
@@ -537,6 +674,7 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
                 [],
                 lambda e: self.window_ref.window.pushToastText(str(e)),
                 lambda r: self.stop_btn.set_sensitive(True),
+                queue=self.domain.connection.url,
             )
 
         dialog = selectDialog(
@@ -565,6 +703,7 @@ class DomainDetailsTab(BaseDetailsTab, DomainPageHost):
             [],
             lambda e: self.window_ref.window.pushToastText(str(e)),
             lambda r: btn.set_sensitive(True),
+            queue=self.domain.connection.url,
         )
 
     def onDeleteClicked(self, btn):
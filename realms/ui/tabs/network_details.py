@@ -331,6 +331,7 @@ class NetworkDetailsTab(BaseDetailsTab):
             [],
             lambda e: self.window_ref.window.pushToastText(str(e)),
             lambda r: self.start_btn.set_sensitive(True),
+            queue=self.network.connection.url,
         )
 
     def __onStopClicked__(self, _):
@@ -341,6 +342,7 @@ class NetworkDetailsTab(BaseDetailsTab):
                 [],
                 lambda e: self.window_ref.window.pushToastText(str(e)),
                 lambda r: self.stop_btn.set_sensitive(True),
+                queue=self.network.connection.url,
             )
 
         dialog = selectDialog(
@@ -53,7 +53,6 @@ class PoolDetailsTab(BaseDetailsTab):
         self.pool_prefs_group = None
 
         # Volumes
-        self.volume_page = None
         self.volume_stack_page = None
         self.volume_group = None
 
@@ -118,7 +117,7 @@ class PoolDetailsTab(BaseDetailsTab):
         fill_group.add(self.fill_progress)
 
         self.pool_prefs_group = PoolPreferencesGroup(
-            self.pool.pool_capabilities,
+            self.pool.connection.getPoolCapabilities(),
             False,
             self.window_ref,
             self.showApply,
@@ -127,12 +126,10 @@ class PoolDetailsTab(BaseDetailsTab):
         self.prefs_page.add(self.pool_prefs_group)
 
         # Volume group
-        self.volume_page = RealmsPreferencesPage()
+        self.volume_group = VolumesGroup(self.pool, self.showApply, self.window_ref)
         self.volume_stack_page = self.stack.add_titled_with_icon(
-            self.volume_page, "volumes", "Volumes", "drive-multidisk-symbolic"
+            self.volume_group, "volumes", "Volumes", "drive-multidisk-symbolic"
         )
-        self.volume_group = VolumesGroup(self.pool, self.showApply, self.window_ref)
-        self.volume_page.add(self.volume_group)
 
         # XML
         self.xml_view = XMLView(self.showApply)
@@ -170,7 +167,9 @@ class PoolDetailsTab(BaseDetailsTab):
             )
 
         if self.usage_task is None:
-            self.usage_task = RepeatJob(gatherUsage, [], showUsage, 30)
+            self.usage_task = RepeatJob(
+                gatherUsage, [], showUsage, 30, queue=self.pool.connection.url
+            )
         else:
             self.usage_task.trigger()
 
@@ -218,6 +217,14 @@ class PoolDetailsTab(BaseDetailsTab):
             if event_id in [CONNECTION_EVENT_DISCONNECTED, CONNECTION_EVENT_DELETED]:
                 self.window_ref.window.closeTab(self)
                 return
+            if event_id == CONNECTION_EVENT_RECONNECTING:
+                # Nothing can be fetched until the connection is back
+                return
+            if event_id == CONNECTION_EVENT_RECONNECTED:
+                # The pool was rebound, but the listed volumes still hold
+                # handles of the lost connection. setStatus lists them again
+                # if the pool is active.
+                self.volume_group.dropVolumes()
 
         self.setStatus()
 
@@ -231,6 +238,7 @@ class PoolDetailsTab(BaseDetailsTab):
             [],
             lambda e: self.window_ref.window.pushToastText(str(e)),
             lambda r: self.start_btn.set_sensitive(True),
+            queue=self.pool.connection.url,
         )
 
     def onStopClicked(self, btn):
@@ -241,6 +249,7 @@ class PoolDetailsTab(BaseDetailsTab):
                 [],
                 lambda e: self.window_ref.window.pushToastText(str(e)),
                 lambda r: self.stop_btn.set_sensitive(True),
+                queue=self.pool.connection.url,
             )
 
         dialog = selectDialog(